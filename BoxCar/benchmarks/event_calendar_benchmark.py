@@ -0,0 +1,69 @@
+"""
+Hold-model benchmark for the future event lists in classes/event_calendar.py.
+
+The calendar is filled with a fixed number of pending events, then each step pops the next event and
+schedules a new one an exponential time later, so the calendar size stays constant. A good future event
+list keeps events/sec roughly flat as the number of pending events grows.
+
+Run from the repository root:
+    python BoxCar/benchmarks/event_calendar_benchmark.py
+"""
+import os
+import sys
+import random
+import time
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from classes.event_calendar import HeapEventCalendar, CalendarQueue
+
+
+class ListEventCalendar:
+    # the original list-backed calendar, kept here as a reference point
+    def __init__(self):
+        self.events = []
+
+    def push(self, event_time, event):
+        index = bisect_right([e['time'] for e in self.events], event_time)
+        self.events.insert(index, event)
+
+    def pop(self):
+        return self.events.pop(0)
+
+
+def hold_model(calendar, pending_events: int, steps: int, seed: int = 0) -> float:
+    rng = random.Random(seed)
+    for _ in range(pending_events):
+        event_time = rng.expovariate(1)
+        calendar.push(event_time, {'time': event_time, 'type': "hold", 'data': None})
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        event = calendar.pop()
+        event_time = event['time'] + rng.expovariate(1)
+        calendar.push(event_time, {'time': event_time, 'type': "hold", 'data': None})
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    calendars = {
+        "list (bisect)": ListEventCalendar,
+        "binary heap": HeapEventCalendar,
+        "calendar queue": CalendarQueue,
+    }
+    sizes = [10, 100, 1_000, 10_000, 100_000]
+    print(f"{'pending events':>15}" + "".join(f"{name:>18}" for name in calendars))
+    for size in sizes:
+        row = f"{size:>15}"
+        for name, calendar_type in calendars.items():
+            if calendar_type is ListEventCalendar and size > 10_000:
+                row += f"{'-':>18}"
+                continue
+            steps = 2_000 if calendar_type is ListEventCalendar else 100_000
+            row += f"{hold_model(calendar_type(), size, steps):>14,.0f} e/s"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
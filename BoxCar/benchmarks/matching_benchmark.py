@@ -0,0 +1,88 @@
+"""
+Greedy versus batch matching benchmark.
+
+Runs the same seeded scenarios with the default greedy matching (each arrival or freed driver takes its
+nearest counterpart) and with BatchDispatcher at a few windows, and reports for each:
+    wall time       seconds to simulate the run, and model events (not batches) processed per second
+    rides           riders matched, and the percentage of riders that abandoned
+    pickup distance total and mean distance driven to pick riders up
+    pickup wait     mean rider wait from joining to pickup (minutes)
+
+Run from the repository root:
+    python BoxCar/benchmarks/matching_benchmark.py
+    python BoxCar/benchmarks/matching_benchmark.py --scenario "driver shortage" --window 1 --window 5
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.factory import create_simulation
+import modules.handler_functions as hf
+from classes.batch_dispatcher import BatchDispatcher
+
+# arrival rates per minute, as in simulation_benchmark.py
+SCENARIOS = {
+    "balanced": {},
+    "driver shortage": {"driver_arrival_rate": 1.0 / 60},
+    "rider shortage": {"rider_arrival_rate": 12.0 / 60},
+}
+SEED = 20240101
+
+
+class PickupMeter:
+    # ride accept handler that adds up the pickup distances before accepting the ride as usual
+    def __init__(self) -> None:
+        self.rides = 0
+        self.distance = 0.0
+
+    def __call__(self, sim, rider, driver) -> None:
+        self.rides += 1
+        self.distance += float(np.linalg.norm(driver.position - rider.origin))
+        hf.execute_ride_accept(sim, rider, driver)
+
+
+def run(parameters: dict, simulation_length: float, seed: int, window) -> dict:
+    dispatcher = None if window is None else BatchDispatcher(window)
+    sim = create_simulation(seed, simulation_length, distribution_parameters=parameters, record_raw_output=False, dispatcher=dispatcher)
+    sim.show_progress = False
+    meter = PickupMeter()
+    sim.register_direct_handler("ride accept", meter)
+    start = time.perf_counter()
+    sim.run(report=False)
+    seconds = time.perf_counter() - start
+    counters = sim.event_counters
+    return {
+        "seconds": seconds,
+        # the batch events themselves are not counted, so throughput is comparable with greedy runs
+        "events_per_second": (sum(counters.values()) - counters.get(BatchDispatcher.event_type, 0)) / seconds,
+        "rides": meter.rides,
+        "abandoned": 100 * counters.get("rider abandon", 0) / max(counters.get("rider join", 0), 1),
+        "pickup_distance": meter.distance,
+        "mean_pickup_distance": meter.distance / max(meter.rides, 1),
+        "pickup_wait": sim.rider_wait_time_pickups.mean,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare greedy and batch matching.")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument("--window", action="append", type=float, help="batch windows in minutes (default: 0.5, 2, 5)")
+    parser.add_argument("--days", type=float, default=7, help="simulated days per run")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    print(f"{'scenario':>16}{'matching':>12}{'seconds':>10}{'events/s':>12}{'rides':>9}{'abandoned':>11}{'pickup dist':>13}{'mean dist':>11}{'pickup wait':>13}")
+    for scenario in args.scenario or list(SCENARIOS):
+        for window in [None, *(args.window or [0.5, 2, 5])]:
+            result = run(SCENARIOS[scenario], args.days * 24 * 60, args.seed, window)
+            matching = "greedy" if window is None else f"batch {window:g}m"
+            print(f"{scenario:>16}{matching:>12}{result['seconds']:>10.2f}{result['events_per_second']:>12,.0f}{result['rides']:>9,}"
+                  f"{result['abandoned']:>10.1f}%{result['pickup_distance']:>13,.0f}{result['mean_pickup_distance']:>11.2f}{result['pickup_wait']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
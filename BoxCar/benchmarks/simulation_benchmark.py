@@ -0,0 +1,189 @@
+"""
+Reproducible benchmark suite for the simulation engine.
+
+Runs the full Simulation headless (no KPI tables, no output files) over a grid of scenarios - arrival-rate
+mixes from Distributions crossed with simulation lengths - each with a fixed seed and in a fresh process,
+and records:
+    throughput      events processed per second of wall-clock time
+    peak RSS        maximum resident set size of the scenario's process (MiB)
+    calendar size   pending events, sampled every `sample_every` events (mean and max)
+    pool sizes      unmatched riders and drivers, sampled the same way (mean and max)
+    event counts    per event type, as a check that runs being compared did the same work
+
+It also times importing the command line entry point (modules.cli) in fresh interpreters, and fails if
+that exceeds the import-time budget or loads a plotting/reporting package, as every replication and
+sweep worker pays this cost before simulating anything.
+
+Results are written as JSON so they can be compared between commits:
+    python BoxCar/benchmarks/simulation_benchmark.py --output before.json
+    (change something)
+    python BoxCar/benchmarks/simulation_benchmark.py --output after.json
+    python BoxCar/benchmarks/simulation_benchmark.py --compare before.json after.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+# arrival rates per minute; balanced is the fitted input model
+SCENARIOS = {
+    "balanced": {},
+    "driver shortage": {"driver_arrival_rate": 1.0 / 60},
+    "rider shortage": {"rider_arrival_rate": 12.0 / 60},
+}
+LENGTHS = {"1 week": 60 * 24 * 7, "4 weeks": 60 * 24 * 28}
+SEED = 20240101
+
+# seconds to import modules.cli in a fresh interpreter (best of `repeats`), numpy being most of it
+IMPORT_BUDGET = 0.3
+# packages only the reports, analyses and replay need; a headless run must not import them
+LAZY_PACKAGES = ("tabulate", "scipy", "matplotlib", "pandas", "pyarrow")
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import modules.cli
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+
+def run_scenario(parameters: dict, simulation_length: float, seed: int, sample_every: int) -> dict:
+    # runs in its own process so that peak RSS belongs to this scenario alone
+    from modules.factory import create_simulation
+    from classes.event import TERMINATION
+
+    sim = create_simulation(seed, simulation_length, distribution_parameters=parameters, record_raw_output=False)
+    sim.show_progress = False
+
+    calendar_sizes, rider_pool_sizes, driver_pool_sizes = [], [], []
+    events = 0
+    start = time.perf_counter()
+    while sim.has_events():
+        terminate = sim.progress_time() == TERMINATION
+        events += 1
+        if events % sample_every == 0:
+            calendar_sizes.append(len(sim.event_calendar))
+            rider_pool_sizes.append(len(sim.unmatched_riders))
+            driver_pool_sizes.append(len(sim.unmatched_drivers))
+        if terminate:
+            break
+    elapsed = time.perf_counter() - start
+
+    def summary(samples):
+        return {"mean": sum(samples) / len(samples) if samples else 0, "max": max(samples, default=0)}
+
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "events_per_second": events / elapsed,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # ru_maxrss is in KiB on Linux
+        "calendar_size": summary(calendar_sizes),
+        "unmatched_riders": summary(rider_pool_sizes),
+        "unmatched_drivers": summary(driver_pool_sizes),
+        "event_counters": dict(sim.event_counters),
+    }
+
+
+def measure_import_time(repeats: int = 5) -> dict:
+    # each measurement is a new interpreter, so nothing is already imported
+    runs = []
+    for _ in range(repeats):
+        probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(src=SRC, lazy=LAZY_PACKAGES)], capture_output=True, text=True, check=True)
+        runs.append(json.loads(probe.stdout))
+    return {"seconds": min(run["seconds"] for run in runs), "loaded": runs[0]["loaded"]}
+
+
+def check_import_budget(import_time: dict, budget: float) -> bool:
+    within = import_time["seconds"] <= budget and not import_time["loaded"]
+    loaded = f", loads {', '.join(import_time['loaded'])}" if import_time["loaded"] else ""
+    print(f"{'import modules.cli':>25}: {import_time['seconds'] * 1000:>10,.0f} ms (budget {budget * 1000:.0f} ms){loaded}"
+          f"{'' if within else '  OVER BUDGET'}")
+    return within
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(scenarios, lengths, seed: int, sample_every: int) -> dict:
+    import_time = measure_import_time()
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for scenario in scenarios:
+        for length in lengths:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_scenario, (SCENARIOS[scenario], LENGTHS[length], seed, sample_every))
+            result.update({"scenario": scenario, "length": length, "parameters": SCENARIOS[scenario], "seed": seed})
+            results.append(result)
+            print(f"{scenario:>16} {length:>8}: {result['events_per_second']:>10,.0f} events/s, "
+                  f"peak RSS {result['peak_rss_mib']:.0f} MiB, calendar max {result['calendar_size']['max']}, "
+                  f"riders max {result['unmatched_riders']['max']}, drivers max {result['unmatched_drivers']['max']}")
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "import_time": import_time,
+        "results": results,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+    print(f"{before['revision']} -> {after['revision']}")
+    if "import_time" in before and "import_time" in after:
+        print(f"{'import modules.cli':>25}: x{after['import_time']['seconds'] / before['import_time']['seconds']:.2f}")
+    previous = {(r["scenario"], r["length"]): r for r in before["results"]}
+    for result in after["results"]:
+        old = previous.get((result["scenario"], result["length"]))
+        if old is None:
+            continue
+        same_work = "" if old["event_counters"] == result["event_counters"] else "  (different event counts)"
+        print(f"{result['scenario']:>16} {result['length']:>8}: "
+              f"throughput x{result['events_per_second'] / old['events_per_second']:.2f}, "
+              f"peak RSS x{result['peak_rss_mib'] / old['peak_rss_mib']:.2f}{same_work}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BoxCar simulation engine.")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument("--length", action="append", choices=list(LENGTHS), help="simulation lengths to run (default: all)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--sample-every", type=int, default=1000, help="events between calendar/pool size samples")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files and exit")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="seconds allowed to import modules.cli")
+    parser.add_argument("--import-only", action="store_true", help="only check the import-time budget")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.import_only:
+        sys.exit(0 if check_import_budget(measure_import_time(), args.import_budget) else 1)
+
+    report = run_suite(args.scenario or list(SCENARIOS), args.length or list(LENGTHS), args.seed, args.sample_every)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if not check_import_budget(report["import_time"], args.import_budget):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
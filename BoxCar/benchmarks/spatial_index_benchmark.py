@@ -0,0 +1,77 @@
+"""
+Nearest-match benchmark for the unmatched pools.
+
+Compares the old linear scan (one np.linalg.norm call per waiting entity, then min) with the GridIndex in
+classes/spatial_index.py at 1k, 10k and 100k waiting entities, and checks that both pick the same entity
+at the same distance. Each step queries the nearest entity to a random point, removes it and adds a new
+one, as a match does in the simulation.
+
+Run from the repository root:
+    python BoxCar/benchmarks/spatial_index_benchmark.py
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from classes.spatial_index import GridIndex
+
+
+class Waiting:
+    def __init__(self, position):
+        self.position = position
+
+
+def linear_nearest(pool, point):
+    distances = [(i, np.linalg.norm(entity.position - point)) for (i, entity) in enumerate(pool)]
+    index, distance = min(distances, key=lambda x: x[1])
+    return pool[index], distance
+
+
+def random_position(rng):
+    return rng.uniform(0, 20, 2)
+
+
+def benchmark(size: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    entities = [Waiting(random_position(rng)) for _ in range(size)]
+    points = [random_position(rng) for _ in range(queries)]
+    replacements = [Waiting(random_position(rng)) for _ in range(queries)]
+
+    pool = list(entities)
+    linear_results = []
+    start = time.perf_counter()
+    for point, replacement in zip(points, replacements):
+        entity, distance = linear_nearest(pool, point)
+        pool.remove(entity)
+        pool.append(replacement)
+        linear_results.append((entity, distance))
+    linear_rate = queries / (time.perf_counter() - start)
+
+    index = GridIndex(lambda entity: entity.position)
+    for entity in entities:
+        index.add(entity)
+    grid_results = []
+    start = time.perf_counter()
+    for point, replacement in zip(points, replacements):
+        entity, distance = index.nearest(point)[0]
+        index.remove(entity)
+        index.add(replacement)
+        grid_results.append((entity, distance))
+    grid_rate = queries / (time.perf_counter() - start)
+
+    identical = all(a[0] is b[0] and a[1] == b[1] for a, b in zip(linear_results, grid_results))
+    return linear_rate, grid_rate, identical
+
+
+def main():
+    print(f"{'waiting':>10}{'linear scan':>20}{'grid index':>20}{'speed-up':>12}{'identical':>12}")
+    for size, queries in [(1_000, 500), (10_000, 100), (100_000, 20)]:
+        linear_rate, grid_rate, identical = benchmark(size, queries)
+        print(f"{size:>10,}{linear_rate:>14,.0f} q/s{grid_rate:>16,.0f} q/s{grid_rate / linear_rate:>11,.0f}x{str(identical):>12}")
+
+
+if __name__ == "__main__":
+    main()
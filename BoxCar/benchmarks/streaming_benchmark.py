@@ -0,0 +1,99 @@
+"""
+Streaming event API benchmark.
+
+Runs the same seeded simulation three ways - run(report=False), consuming sim.iter_events() and consuming
+sim.aiter_events() in an event loop - with a consumer that keeps a running count and mean wait per event
+kind, and reports for each:
+    seconds         wall time of the run
+    events/s        processed events per second
+    peak memory     peak traced Python allocations during the run (MiB), which for the streaming runs
+                    should not grow with the simulated length
+
+Run from the repository root:
+    python BoxCar/benchmarks/streaming_benchmark.py
+    python BoxCar/benchmarks/streaming_benchmark.py --days 28 --maxsize 64
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from modules.factory import create_simulation
+
+SEED = 20240101
+
+
+class KindCounter:
+    # the streaming consumer: events per kind and the mean gap between events of the same kind
+    def __init__(self) -> None:
+        self.counts = {}
+        self.last = {}
+        self.mean_gap = {}
+
+    def __call__(self, record) -> None:
+        n = self.counts.get(record.kind, 0) + 1
+        self.counts[record.kind] = n
+        if record.kind in self.last:
+            gap = record.time - self.last[record.kind]
+            self.mean_gap[record.kind] = self.mean_gap.get(record.kind, 0.0) + (gap - self.mean_gap.get(record.kind, 0.0)) / n
+        self.last[record.kind] = record.time
+
+
+def run_batch(sim) -> int:
+    sim.run(report=False)
+    return sum(sim.event_counts)
+
+
+def run_iter(sim) -> int:
+    consumer = KindCounter()
+    for record in sim.iter_events():
+        consumer(record)
+    return sum(consumer.counts.values())
+
+
+def run_async(sim, maxsize: int) -> int:
+    async def consume() -> int:
+        consumer = KindCounter()
+        async for record in sim.aiter_events(maxsize=maxsize):
+            consumer(record)
+        return sum(consumer.counts.values())
+    return asyncio.run(consume())
+
+
+def measure(mode: str, simulation_length: float, seed: int, maxsize: int) -> dict:
+    sim = create_simulation(seed, simulation_length, record_raw_output=False)
+    sim.show_progress = False
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "run":
+        events = run_batch(sim)
+    elif mode == "iter_events":
+        events = run_iter(sim)
+    else:
+        events = run_async(sim, maxsize)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "events_per_second": events / seconds, "peak_mib": peak / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare run() with the streaming event API.")
+    parser.add_argument("--days", type=float, action="append", help="simulated days per run (default: 7 and 14)")
+    parser.add_argument("--maxsize", type=int, default=1024, help="queue size of aiter_events")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    print(f"{'days':>6}{'mode':>14}{'seconds':>10}{'events/s':>12}{'peak MiB':>10}")
+    for days in args.days or [7, 14]:
+        for mode in ("run", "iter_events", "aiter_events"):
+            result = measure(mode, days * 24 * 60, args.seed, args.maxsize)
+            print(f"{days:>6g}{mode:>14}{result['seconds']:>10.2f}{result['events_per_second']:>12,.0f}{result['peak_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
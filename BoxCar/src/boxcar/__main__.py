@@ -0,0 +1,3 @@
+from modules.cli import main
+
+main()
@@ -0,0 +1,80 @@
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+import numpy.typing as npt
+
+
+class ArrivalStream:
+    """
+    Sorted arrival times of a Poisson process, generated in vectorised blocks instead of one inter-arrival
+    at a time: a block of exponential gaps is scaled by the rate and cumulatively summed onto the last
+    arrival. The simulation merges the stream with its calendar (see Simulation.register_arrival_stream),
+    so arrivals are never scheduled as calendar events.
+
+    With a time-varying `rate_function` (vectorised over an array of times, per minute) the candidates
+    are drawn at `rate`, which must bound the rate function, and thinned: each is kept with probability
+    rate_function(t) / rate. A rate function above `rate` raises ValueError, as thinning would then
+    produce too few arrivals. Arrivals at or after `until` are never produced.
+    """
+    def __init__(self, rng: np.random.Generator, rate: float, block_size: int = 4096, rate_function: Optional[Callable[[npt.NDArray], npt.NDArray]] = None, start: float = 0, until: float = np.inf) -> None:
+        self.rng = rng
+        self.rate = rate
+        self.block_size = block_size
+        self.rate_function = rate_function
+        self.until = until
+        self._last = start  # the last candidate time generated, accepted or not
+        self._times: List[float] = []
+        self._index = 0
+
+    def peek(self) -> float:
+        # time of the next arrival, inf once the stream has ended
+        if self._index == len(self._times):
+            self._refill()
+        return self._times[self._index]
+
+    def pop(self) -> float:
+        time = self.peek()
+        self._index += 1
+        return time
+
+    def _refill(self) -> None:
+        times: npt.NDArray = np.empty(0)
+        while not times.size and self._last < self.until:
+            # cumsum adds the gaps one after another, so the times are the same as accumulating them singly
+            gaps = self.rng.standard_exponential(self.block_size) / self.rate
+            candidates = np.cumsum(np.concatenate(([self._last], gaps)))[1:]
+            self._last = candidates[-1]
+            if self.rate_function is not None:
+                rates = self.rate_function(candidates)
+                if np.any(rates > self.rate):
+                    raise ValueError(f"rate function reaches {np.max(rates)}, above the thinning rate {self.rate}")
+                keep = self.rng.random(self.block_size) * self.rate < rates
+                candidates = candidates[keep]
+            times = candidates[candidates < self.until]
+        # a trailing inf marks the end of the stream
+        self._times = times.tolist() if times.size else [np.inf]
+        self._index = 0
+
+
+class DailyProfile:
+    """
+    Piecewise-constant rate over the day: `base_rate` scaled by one multiplier per period, e.g. 24 hourly
+    multipliers. Vectorised over simulation times in minutes, for use as an ArrivalStream rate_function.
+    """
+    def __init__(self, base_rate: float, multipliers: Sequence[float]) -> None:
+        self.base_rate = base_rate
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.period_length = 24 * 60 / len(self.multipliers)
+
+    @property
+    def max_rate(self) -> float:
+        return self.base_rate * self.multipliers.max()
+
+    def mean_rate(self, until: float) -> float:
+        # average rate over [0, until], i.e. the expected number of arrivals divided by until
+        starts = np.arange(0, until, self.period_length)
+        lengths = np.minimum(starts + self.period_length, until) - starts
+        return float(np.sum(self(starts) * lengths) / until)
+
+    def __call__(self, times: npt.NDArray) -> npt.NDArray:
+        periods = (np.asarray(times) // self.period_length).astype(np.int64) % len(self.multipliers)
+        return self.base_rate * self.multipliers[periods]
@@ -0,0 +1,65 @@
+from typing import Any, List, Tuple
+import numpy as np
+import numpy.typing as npt
+from scipy.optimize import linear_sum_assignment
+from classes.driver import Driver
+from classes.event import RIDE_ACCEPT
+
+
+class BatchDispatcher:
+    """
+    Batch matching, passed to Simulation(dispatcher=...). Instead of matching each arrival or freed driver
+    greedily to its nearest counterpart, riders and idle drivers wait in the unmatched pools and every
+    `window` minutes all of them are matched at once: the pickup distances between every idle driver and
+    waiting rider are computed in one array operation, pairs failing the profit rule of execute_rider_join
+    (fare and earnings below the cost of the pickup and trip) are excluded, and the assignment minimising
+    the total pickup distance of as many feasible pairs as possible is solved with linear_sum_assignment.
+    A "ride accept" event is scheduled for every matched pair at the batch time.
+    """
+    event_type = "batch match"
+
+    def __init__(self, window: float = 1.0) -> None:
+        self.window = window
+        self.batches = 0
+        self.matches = 0
+        self.pickup_distance = 0.0  # total over the pairs matched
+
+    def attach(self, sim: Any) -> None:
+        sim.register_direct_handler(self.event_type, self.match)
+        self.kind = sim.event_kind(self.event_type)
+        sim.schedule(sim.current_time + self.window, self.kind)
+
+    def match(self, sim: Any) -> None:
+        sim.schedule(sim.current_time + self.window, self.kind)
+        if not sim.unmatched_riders or not sim.unmatched_drivers:
+            return
+        self.batches += 1
+        riders: List[Any] = list(sim.unmatched_riders)
+        drivers: List[Any] = list(sim.unmatched_drivers)
+        for driver_index, rider_index, distance in self.assign(sim, riders, drivers):
+            sim.schedule(sim.current_time, RIDE_ACCEPT, (riders[rider_index], drivers[driver_index]))
+            self.matches += 1
+            self.pickup_distance += distance
+
+    @staticmethod
+    def assign(sim: Any, riders: List[Any], drivers: List[Any]) -> List[Tuple[int, int, float]]:
+        # (driver index, rider index, pickup distance) of the matched pairs
+        origins = sim.rider_store.origin[[rider.id for rider in riders]]
+        destinations = sim.rider_store.destination[[rider.id for rider in riders]]
+        positions = sim.driver_store.position[[driver.id for driver in drivers]]
+
+        # drivers x riders pickup distances, and the trip distance of each rider
+        offsets = positions[:, None, :] - origins[None, :, :]
+        pickup: npt.NDArray = np.sqrt(np.einsum("ijk,ijk->ij", offsets, offsets))
+        trip = np.sqrt(np.einsum("ij,ij->i", origins - destinations, origins - destinations))
+        profit = Driver.earnings_per_mile * trip + Driver.initial_fare - Driver.costs_per_mile * (pickup + trip)
+        feasible = profit >= 0
+        if not feasible.any():
+            return []
+
+        # infeasible pairs cost more than any set of feasible pairs, so the most pairs possible are matched
+        # and only then is the pickup distance minimised; any infeasible pairs chosen are dropped
+        penalty = pickup[feasible].sum() + 1
+        rows, columns = linear_sum_assignment(np.where(feasible, pickup, penalty))
+        chosen = feasible[rows, columns]
+        return list(zip(rows[chosen].tolist(), columns[chosen].tolist(), pickup[rows[chosen], columns[chosen]].tolist()))
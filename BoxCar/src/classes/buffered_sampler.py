@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict
+import numpy as np
+import numpy.typing as npt
+
+
+class BufferedSampler:
+    """
+    Hands out random variates one at a time from blocks drawn with a single vectorised call.
+
+    `draw(rng, n)` must return n variates as a 1-D array, or n rows as a 2-D array (e.g. coordinates). When
+    a block runs out the next one is drawn from the same numpy Generator, so a sampler with its own seeded
+    stream produces the same sequence in every run, however its draws are interleaved with other streams.
+    """
+    def __init__(self, draw: Callable[[np.random.Generator, int], npt.NDArray], rng: np.random.Generator, block_size: int = 4096) -> None:
+        self.draw = draw
+        self.rng = rng
+        self.block_size = block_size
+        self._block: list = []
+        self._index = 0
+        # sum and count of the values in the blocks already used up, for the realised mean of the inputs
+        self._used_total: Any = 0.0
+        self._used_count = 0
+
+    def __call__(self) -> Any:
+        index = self._index
+        if index == len(self._block):
+            self._refill()
+            index = 0
+        self._index = index + 1
+        return self._block[index]
+
+    @property
+    def count(self) -> int:
+        # number of values handed out so far
+        return self._used_count + self._index
+
+    def mean(self) -> Any:
+        # mean of the values handed out so far (per column for 2-D draws)
+        total = self._used_total + (np.sum(self._block[:self._index], axis=0) if self._index else 0.0)
+        return total / self.count if self.count else np.nan
+
+    def _refill(self) -> None:
+        if self._block:
+            self._used_total = self._used_total + np.sum(self._block, axis=0)
+            self._used_count += len(self._block)
+        block = self.draw(self.rng, self.block_size)
+        # python floats are much cheaper to hand out and do arithmetic on than numpy scalars
+        self._block = block.tolist() if block.ndim == 1 else list(block)
+        self._index = 0
+
+
+class AntitheticGenerator:
+    """
+    Wraps a numpy Generator so that every variate is the antithetic of the one the wrapped generator
+    would have produced: uniforms u become 1 - u, normals z become -z and exponentials -log(u) become
+    -log(1 - u). A run using wrapped generators is the antithetic twin of a run with the same seed.
+
+    Only the methods the block generators below use are provided. Each block generator is monotone in the
+    uniforms or normals it draws (skew-normal and fitted variates are drawn by inversion for this reason),
+    so every input of the twin run is mirrored.
+    """
+    def __init__(self, rng: np.random.Generator) -> None:
+        self.rng = rng
+
+    def random(self, n: int) -> npt.NDArray:
+        return 1 - self.rng.random(n)
+
+    def uniform(self, low: float, high: float, n: int) -> npt.NDArray:
+        return low + high - self.rng.uniform(low, high, n)
+
+    def standard_normal(self, n: int) -> npt.NDArray:
+        return -self.rng.standard_normal(n)
+
+    def standard_exponential(self, n: int) -> npt.NDArray:
+        # e = -log(u), so the antithetic -log(1 - u) is -log(1 - exp(-e))
+        return -np.log(-np.expm1(-self.rng.standard_exponential(n)))
+
+
+# block generators, kept at module level (with functools.partial for parameters) so samplers can be pickled
+
+def standard_exponential(rng: np.random.Generator, n: int) -> npt.NDArray:
+    return rng.standard_exponential(n)
+
+
+def standard_uniform(rng: np.random.Generator, n: int) -> npt.NDArray:
+    return rng.random(n)
+
+
+def uniform(rng: np.random.Generator, n: int, low: float, high: float) -> npt.NDArray:
+    return rng.uniform(low, high, n)
+
+
+def skewnorm(rng: np.random.Generator, n: int, a: float, loc: float, scale: float) -> npt.NDArray:
+    # by inversion rather than scipy's construction from two normals, which gives the same variate for the
+    # negated normals and so would leave skew-normal inputs unmirrored in an antithetic run
+    from scipy import stats
+    return stats.skewnorm.ppf(rng.random(n), a, loc, scale)
+
+
+def lognorm(rng: np.random.Generator, n: int, s: float, loc: float, scale: float) -> npt.NDArray:
+    return loc + scale * np.exp(s * rng.standard_normal(n))
+
+
+def fitted(rng: np.random.Generator, n: int, family: str, params: Dict[str, float]) -> npt.NDArray:
+    # any scipy.stats family (a fitted input, see modules/input_modelling.py), by inversion so that antithetic
+    # generators give antithetic variates; scipy is only imported when a fitted input is used
+    from scipy import stats
+    return getattr(stats, family).ppf(rng.random(n), **params)
+
+
+def coordinate_pairs(rng: np.random.Generator, n: int, x: Callable[[np.random.Generator, int], npt.NDArray], y: Callable[[np.random.Generator, int], npt.NDArray]) -> npt.NDArray:
+    return np.column_stack((x(rng, n), y(rng, n)))
@@ -1,21 +1,47 @@
 import numpy as np
 import numpy.typing as npt
-from numpy.random import uniform
 import classes.simulation as simulation
+from classes.entity_store import EntityView
 
-class Driver:
+class Driver(EntityView):
     
     busy = "busy"
     idle = "idle"
     leaving = "leaving"
     left = "left"
+    statuses = (busy, idle, leaving, left)
     
     initial_fare = 3
     earnings_per_mile = 2
     costs_per_mile = 0.2
     
+    # numeric state lives in the simulation's driver store (see classes/entity_store.py)
+    fields = {
+        "available_length": (np.float64, ()),
+        "leave_time": (np.float64, ()),
+        "position": (np.float64, (2,)),
+        "pickup": (np.float64, (2,)),
+        "destination": (np.float64, (2,)),
+        "pickup_time": (np.float64, ()),
+        "dropoff_time": (np.float64, ()),
+        "this_ride_first_leg_distance": (np.float64, ()),
+        "this_ride_second_leg_distance": (np.float64, ()),
+        "total_distance": (np.float64, ()),
+        "total_rides": (np.int64, ()),
+        "total_earnings": (np.float64, ()),
+        "this_ride_earnings": (np.float64, ()),
+        "total_costs": (np.float64, ()),
+        "this_ride_costs": (np.float64, ()),
+        "this_ride_idle_time": (np.float64, ()),
+        "status_code": (np.int8, ()),  # index into Driver.statuses
+        "idle_start_time": (np.float64, ()),
+        "total_idle_time": (np.float64, ()),
+    }
+    __slots__ = ("leave_event",)
     
     def __init__(self, sim_instance:simulation, join_time:float)->None:
+        self._bind(sim_instance.driver_store)
+        
         self.available_length:float = sim_instance.distributions["driver available length"]()
         self.leave_time:float = join_time + self.available_length
         
@@ -36,8 +62,18 @@ class Driver:
         self.this_ride_earnings:float = 0
         self.total_costs:float = 0
         self.this_ride_costs:float = 0
+        self.this_ride_idle_time:float = np.nan # idle time before the current ride, NaN if the driver was not idle
         
         self.status:str = self.idle
         self.idle_start_time:float = join_time
         self.total_idle_time:float = 0
         
+        self.leave_event = None # calendar handle for the pending "driver leave" event
+    
+    @property
+    def status(self) -> str:
+        return Driver.statuses[self.status_code]
+    
+    @status.setter
+    def status(self, value: str) -> None:
+        self.status_code = Driver.statuses.index(value)
@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+
+class EntityStore:
+    """
+    Struct-of-arrays storage for one kind of entity. Every field is a preallocated numpy column indexed by
+    an integer entity id; columns double in size when they run out of room, and ids of entities that have
+    finished are reused. Fields are declared as {name: (dtype, shape)}, with shape () for scalars.
+    """
+    def __init__(self, fields: Dict[str, Tuple[Any, Tuple[int, ...]]], capacity: int = 1024) -> None:
+        self.fields = fields
+        self.capacity = capacity
+        for name, (dtype, shape) in fields.items():
+            setattr(self, name, np.zeros((capacity, *shape), dtype=dtype))
+        self._free: List[int] = []
+        self._next_id = 0
+
+    def allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._next_id == self.capacity:
+            self._grow()
+        entity_id = self._next_id
+        self._next_id += 1
+        return entity_id
+
+    def release(self, entity_id: int) -> None:
+        self._free.append(entity_id)
+
+    def _grow(self) -> None:
+        new_capacity = 2 * self.capacity
+        for name, (dtype, shape) in self.fields.items():
+            column = np.zeros((new_capacity, *shape), dtype=dtype)
+            column[:self.capacity] = getattr(self, name)
+            setattr(self, name, column)
+        self.capacity = new_capacity
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # only the rows in use are pickled; __setstate__ pads the columns back out to capacity
+        state = self.__dict__.copy()
+        for name in self.fields:
+            state[name] = state[name][:self._next_id]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        for name, (dtype, shape) in self.fields.items():
+            column = np.zeros((self.capacity, *shape), dtype=dtype)
+            column[:self._next_id] = state[name]
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        # number of live entities
+        return self._next_id - len(self._free)
+
+
+def _column_property(name: str, vector: bool) -> property:
+    if vector:
+        # a view onto the row; assignment copies into the column
+        def get(self):
+            return getattr(self._store, name)[self.id]
+    else:
+        # .item returns a python scalar, which is cheaper to do arithmetic on than a numpy scalar
+        def get(self):
+            return getattr(self._store, name).item(self.id)
+
+    def set(self, value):
+        getattr(self._store, name)[self.id] = value
+    return property(get, set)
+
+
+class EntityView:
+    """
+    Lightweight handle onto one row of an EntityStore. Subclasses declare their numeric state in `fields`,
+    which become properties reading and writing the store's columns, so handlers keep using plain
+    attribute access (rider.origin, driver.total_distance, ...). Anything non-numeric goes in __slots__.
+    """
+    __slots__ = ("_store", "id")
+    fields: Dict[str, Tuple[Any, Tuple[int, ...]]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, (_, shape) in cls.fields.items():
+            if name not in cls.__dict__:
+                setattr(cls, name, _column_property(name, len(shape) > 0))
+
+    def _bind(self, store: EntityStore) -> None:
+        self._store = store
+        self.id = store.allocate()
+
+    def release(self) -> None:
+        # the entity has left the system; its id (and row) will be reused by a new entity
+        self._store.release(self.id)
+
@@ -0,0 +1,34 @@
+from typing import NamedTuple
+
+# Events are plain (time, kind, data) tuples. kind is a small integer indexing the simulation's dispatch
+# table and event counts, and data is the tuple of arguments passed to the handler after the simulation,
+# e.g. (rider, driver) for handler(sim, rider, driver). The built-in kinds are numbered below; event types
+# registered later by name get the next free numbers (see Simulation.event_kind).
+
+RIDER_JOIN, RIDER_ABANDON, DRIVER_JOIN, DRIVER_LEAVE, RIDE_ACCEPT, RIDE_PICKUP, RIDE_COMPLETION, TERMINATION = range(8)
+
+# name of each built-in kind, as used by register_event_handler, add_event and event_counters
+EVENT_TYPES = ("rider join", "rider abandon", "driver join", "driver leave", "ride accept", "ride pickup",
+               "ride completion", "termination")
+
+
+class EventRecord(NamedTuple):
+    # what Simulation.iter_events yields for a processed event. Entities are given by their store ids (-1
+    # when the event has none). An id is a slot in the rider or driver store, not a lasting identity: once
+    # the entity has left and been release()d, a later rider or driver may be given the same id.
+    # A driver still on a trip at their leave time leaves at dropoff, through a second driver leave event.
+    time: float
+    kind: int
+    rider: int
+    driver: int
+
+
+def event_record(event_time: float, kind: int, event_data: tuple) -> EventRecord:
+    if kind <= RIDER_ABANDON:
+        return EventRecord(event_time, kind, event_data[0].id, -1)
+    if kind <= DRIVER_LEAVE:
+        return EventRecord(event_time, kind, -1, event_data[0].id)
+    if kind <= RIDE_COMPLETION:
+        return EventRecord(event_time, kind, event_data[0].id, event_data[1].id)
+    # termination and event types registered later
+    return EventRecord(event_time, kind, -1, -1)
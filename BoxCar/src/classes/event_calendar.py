@@ -0,0 +1,194 @@
+from typing import Any, Iterator, List, Optional
+from bisect import insort
+from heapq import heappush, heappop, heapify, nsmallest
+from itertools import count
+
+
+# Future event lists used by Simulation. Every entry is stored as a [time, seq, event] list, where seq is
+# an insertion counter, so that events scheduled for the same time come out in the order they were added
+# (the same FIFO behaviour bisect_right gave the old list-backed calendar).
+#
+# push returns the entry itself as a handle. Cancelling a handle only blanks its event slot (a tombstone);
+# the entry is discarded when it reaches the head of the calendar, so cancellation costs O(1). Entries are
+# also blanked when they are popped, so cancelling an event that has already happened does nothing.
+
+class HeapEventCalendar:
+    """
+    Binary-heap future event list: O(log n) insert and removal of the next event.
+    """
+    def __init__(self) -> None:
+        self._heap: List[list] = []
+        self._counter = count()
+        self._cancelled = 0
+
+    def push(self, event_time: float, event: Any) -> list:
+        entry = [event_time, next(self._counter), event]
+        heappush(self._heap, entry)
+        return entry
+
+    def _discard_cancelled(self) -> None:
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heappop(heap)
+            self._cancelled -= 1
+
+    def pop(self) -> Any:
+        self._discard_cancelled()
+        entry = heappop(self._heap)
+        event, entry[2] = entry[2], None
+        return event
+
+    def peek(self) -> Any:
+        self._discard_cancelled()
+        return self._heap[0][2]
+
+    def peek_entry(self) -> Optional[list]:
+        # [time, seq, event] of the next event, or None if the calendar is empty
+        self._discard_cancelled()
+        return self._heap[0] if self._heap else None
+
+    def next_sequence(self) -> int:
+        # take a sequence number without scheduling anything, for event sources ordered alongside the calendar
+        return next(self._counter)
+
+    def cancel(self, entry: list) -> None:
+        if entry[2] is None:
+            return
+        entry[2] = None
+        self._cancelled += 1
+        # rebuild once tombstones make up most of the heap so it does not grow without bound
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [pending for pending in self._heap if pending[2] is not None]
+            heapify(self._heap)
+            self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def __bool__(self) -> bool:
+        return len(self._heap) > self._cancelled
+
+    def __iter__(self) -> Iterator[Any]:
+        # pending events in no particular order
+        return (entry[2] for entry in self._heap if entry[2] is not None)
+
+
+class CalendarQueue:
+    """
+    Calendar queue (Brown, 1988): events are hashed into buckets of a fixed width by time, like days in a
+    year, and the queue walks the buckets in order. The number of buckets and their width are re-estimated
+    whenever the number of pending events doubles or halves, giving O(1) amortised insert and removal.
+    """
+    def __init__(self, bucket_count: int = 2, bucket_width: float = 1.0) -> None:
+        self._counter = count()
+        self._size = 0          # stored entries, including cancelled ones
+        self._cancelled = 0
+        self._setup(bucket_count, bucket_width, 0.0)
+
+    def _setup(self, bucket_count: int, bucket_width: float, start_time: float) -> None:
+        self._buckets: List[List[list]] = [[] for _ in range(bucket_count)]
+        self._bucket_count = bucket_count
+        self._bucket_width = bucket_width
+        # absolute index (time / width) of the bucket the last event was taken from
+        self._current_day = int(start_time / bucket_width)
+        self._grow_threshold = 2 * bucket_count
+        self._shrink_threshold = bucket_count // 2 - 2
+
+    def push(self, event_time: float, event: Any) -> list:
+        entry = [event_time, next(self._counter), event]
+        day = int(event_time / self._bucket_width)
+        insort(self._buckets[day % self._bucket_count], entry)
+        # peek may have moved the current day past the time of an event scheduled now, e.g. one due at the
+        # current time; walk from that event's day again so it is not skipped
+        if day < self._current_day:
+            self._current_day = day
+        self._size += 1
+        if self._size > self._grow_threshold:
+            self._resize(2 * self._bucket_count)
+        return entry
+
+    def _find_bucket(self) -> List[list]:
+        # walk one "year" of buckets from the current day; an entry belongs to this day if its own day
+        # number is not in the future
+        width = self._bucket_width
+        day = self._current_day
+        for _ in range(self._bucket_count):
+            bucket = self._buckets[day % self._bucket_count]
+            while bucket and bucket[0][2] is None:
+                del bucket[0]
+                self._size -= 1
+                self._cancelled -= 1
+            if bucket and int(bucket[0][0] / width) <= day:
+                self._current_day = day
+                return bucket
+            day += 1
+        # nothing due within a year (sparse calendar), so jump straight to the earliest entry
+        self._purge_cancelled()
+        bucket = min((b for b in self._buckets if b), key=lambda b: b[0])
+        self._current_day = int(bucket[0][0] / width)
+        return bucket
+
+    def pop(self) -> Any:
+        if self._size == self._cancelled:
+            raise IndexError("pop from an empty calendar")
+        entry = self._find_bucket().pop(0)
+        self._size -= 1
+        if self._size < self._shrink_threshold:
+            self._resize(self._bucket_count // 2)
+        event, entry[2] = entry[2], None
+        return event
+
+    def peek(self) -> Any:
+        if self._size == self._cancelled:
+            raise IndexError("peek into an empty calendar")
+        return self._find_bucket()[0][2]
+
+    def peek_entry(self) -> Optional[list]:
+        if self._size == self._cancelled:
+            return None
+        return self._find_bucket()[0]
+
+    def next_sequence(self) -> int:
+        return next(self._counter)
+
+    def cancel(self, entry: list) -> None:
+        if entry[2] is None:
+            return
+        entry[2] = None
+        self._cancelled += 1
+
+    def _purge_cancelled(self) -> None:
+        for bucket in self._buckets:
+            bucket[:] = [entry for entry in bucket if entry[2] is not None]
+        self._size -= self._cancelled
+        self._cancelled = 0
+
+    def _resize(self, bucket_count: int) -> None:
+        self._purge_cancelled()
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        start_time = self._current_day * self._bucket_width
+        self._setup(max(bucket_count, 2), self._estimate_width(entries), start_time)
+        for entry in entries:
+            insort(self._buckets[int(entry[0] / self._bucket_width) % self._bucket_count], entry)
+
+    def _estimate_width(self, entries: List[list]) -> float:
+        # three times the average separation of the next few events, ignoring unusually large gaps
+        sample = nsmallest(25, entries)
+        gaps = [b[0] - a[0] for a, b in zip(sample, sample[1:])]
+        if not gaps:
+            return self._bucket_width
+        mean_gap = sum(gaps) / len(gaps)
+        typical = [gap for gap in gaps if gap <= 2 * mean_gap]
+        if not typical or sum(typical) == 0:
+            return self._bucket_width
+        return 3 * sum(typical) / len(typical)
+
+    def __len__(self) -> int:
+        return self._size - self._cancelled
+
+    def __bool__(self) -> bool:
+        return self._size > self._cancelled
+
+    def __iter__(self) -> Iterator[Any]:
+        # pending events in no particular order
+        return (entry[2] for bucket in self._buckets for entry in bucket if entry[2] is not None)
@@ -1,9 +1,23 @@
-from typing import Any
+from typing import Any, Callable, Dict
 import modules.handler_functions as hf
 
 class EventHandlers:
     def __init__(self, simulation):
         self.simulation = simulation
+    
+    def direct_handlers(self) -> Dict[str, Callable[..., None]]:
+        # the execute_ functions themselves; Simulation puts these in its dispatch table and calls them as
+        # function(sim, *event_data), skipping the handle_ methods below
+        return {
+            "rider join": hf.execute_rider_join,
+            "rider abandon": hf.execute_rider_abandon,
+            "driver join": hf.execute_driver_join,
+            "driver leave": hf.execute_driver_leave,
+            "ride accept": hf.execute_ride_accept,
+            "ride pickup": hf.execute_ride_pickup,
+            "ride completion": hf.execute_ride_completion,
+            "termination": hf.execute_termination,
+        }
         
     def handle_rider_join(self, event_data: Any):
         hf.execute_rider_join(self.simulation, event_data[0])
@@ -0,0 +1,38 @@
+from typing import Any, AsyncIterator, Optional
+import asyncio
+from classes.event import EventRecord
+
+# asyncio front end of Simulation.iter_events, for consumers such as a live dashboard or an online estimator
+# that run in an event loop. The simulation runs as a producer task that puts records on a bounded queue, so
+# it runs ahead of the consumer by at most `maxsize` records and waits (backpressure) when the consumer
+# falls behind; memory stays constant however long the run. Stages of a pipeline can be chained the same
+# way, each reading one bounded queue and writing the next.
+
+
+async def aiter_events(sim: Any, until: Optional[float] = None, maxsize: int = 1024, batch: int = 256) -> AsyncIterator[EventRecord]:
+    """
+    Yield the EventRecords of sim.iter_events(until) from a bounded queue filled by a producer task. The
+    producer gives way to other tasks every `batch` events even when the queue never fills. Closing the
+    iterator early stops the simulation where it is; an exception in the simulation is raised here.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def produce() -> None:
+        try:
+            for count, record in enumerate(sim.iter_events(until), 1):
+                await queue.put(record)
+                if count % batch == 0:
+                    await asyncio.sleep(0)
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (record := await queue.get()) is not None:
+            yield record
+        # re-raises an exception of the producer
+        await producer
+    finally:
+        producer.cancel()
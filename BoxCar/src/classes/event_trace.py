@@ -0,0 +1,72 @@
+from typing import Any, BinaryIO
+import struct
+import numpy as np
+from classes.event import EVENT_TYPES, RIDER_JOIN, RIDER_ABANDON, DRIVER_JOIN, DRIVER_LEAVE, RIDE_ACCEPT, RIDE_COMPLETION
+
+# Compact binary event trace, used to replay a run as an animation afterwards (modules/replay.py) instead
+# of drawing while the simulation runs. The file is a short header followed by fixed-size records:
+#   time (f8), event kind (u1), rider id (i4), driver id (i4), x0, y0, x1, y1 (f4)
+# Ids are the entities' store ids and are -1 when the event has no rider/driver. Coordinates are only
+# filled in for joins: a rider's origin and destination, or a driver's initial position (x0, y0).
+# Store ids are reused, so a join always starts a new entity in the replay.
+
+MAGIC = b"BOXTRACE1\n"
+EVENT_KINDS = EVENT_TYPES  # the kind byte is the event kind of classes/event.py
+OTHER_KIND = 255  # event types registered later are recorded without ids
+RECORD = struct.Struct("<dBii4f")
+RECORD_DTYPE = np.dtype([("time", "<f8"), ("kind", "u1"), ("rider", "<i4"), ("driver", "<i4"),
+                         ("x0", "<f4"), ("y0", "<f4"), ("x1", "<f4"), ("y1", "<f4")])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+class EventTraceRecorder:
+    """
+    Appends one record per processed event to a trace file, through a fixed-size in-memory buffer.
+    """
+    def __init__(self, path: str, buffer_records: int = 8192) -> None:
+        self.path = path
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(MAGIC)
+        self._buffer = bytearray(RECORD.size * buffer_records)
+        self._offset = 0
+
+    def record(self, event_time: float, kind: int, event_data: Any) -> None:
+        if kind >= len(EVENT_KINDS):
+            kind = OTHER_KIND
+        rider = driver = -1
+        x0 = y0 = x1 = y1 = 0.0
+        if kind == RIDER_JOIN:
+            rider = event_data[0].id
+            x0, y0 = event_data[0].origin
+            x1, y1 = event_data[0].destination
+        elif kind == RIDER_ABANDON:
+            rider = event_data[0].id
+        elif kind == DRIVER_JOIN:
+            driver = event_data[0].id
+            x0, y0 = event_data[0].position
+        elif kind == DRIVER_LEAVE:
+            driver = event_data[0].id
+        elif RIDE_ACCEPT <= kind <= RIDE_COMPLETION:  # ride accept, pickup and completion
+            rider = event_data[0].id
+            driver = event_data[1].id
+        RECORD.pack_into(self._buffer, self._offset, event_time, kind, rider, driver, x0, y0, x1, y1)
+        self._offset += RECORD.size
+        if self._offset == len(self._buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(memoryview(self._buffer)[:self._offset])
+        self._offset = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def read_trace(path: str) -> np.ndarray:
+    # the whole trace as a structured array (memory-mapped, so large traces are read lazily)
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a BoxCar event trace")
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=len(MAGIC))
@@ -1,46 +1,146 @@
-import random
 import numpy as np
 import numpy.typing as npt
-import scipy.stats as stats
+from functools import partial
+from typing import Any, Dict, Tuple, Union
+import json
+from classes.buffered_sampler import BufferedSampler, AntitheticGenerator, standard_exponential, standard_uniform, uniform, skewnorm, lognorm, fitted, coordinate_pairs
+from classes.arrival_stream import ArrivalStream, DailyProfile
 
 class Distributions:
-    def __init__(self, simulation):
+    # one independent random stream per random quantity, in a fixed order so that seeds are reproducible
+    stream_names = ("rider inter-arrival", "driver inter-arrival", "rider patience", "driver available length",
+                    "coordinates", "driver initial coordinates", "rider origin coordinates",
+                    "rider destination coordinates", "actual trip time")
+    
+    # arrival and patience rates (per minute); any of these can be overridden per instance, e.g.
+    # Distributions(sim, seed, driver_arrival_rate=5/60)
+    rider_arrival_rate = 32.01/60
+    driver_arrival_rate = 4.09/60
+    rider_patience_rate = 5/60
+    # optional time-of-day demand and supply: multipliers of the arrival rate for equal periods of the day
+    # (e.g. 24 hourly values), in which case arrivals are generated by thinning
+    rider_arrival_profile = None
+    driver_arrival_profile = None
+    profiles = ("rider_arrival_profile", "driver_arrival_profile")
+    # streams whose distribution a spec can replace (driver available length is in hours)
+    fitted_streams = ("coordinates", "driver initial coordinates", "rider origin coordinates",
+                      "rider destination coordinates", "driver available length")
+    
+    # expected driver available length (hours), of the uniform(5, 8) default or of a fitted distribution
+    driver_available_length_mean = 6.5
+    
+    def __init__(self, simulation, seed=None, block_size:int = 4096, antithetic:bool = False, spec:Union[str, Dict[str, Any], None] = None, **parameters):
+        # spec: fitted input distributions, as written by modules/input_modelling.py (a path or the loaded dict).
+        # Its parameters are overridden by the keyword parameters.
         self.simulation = simulation
+        if isinstance(spec, str):
+            with open(spec) as file:
+                spec = json.load(file)
+        if spec is not None:
+            parameters = {**spec.get("parameters", {}), **parameters}
+        for name, value in parameters.items():
+            if not isinstance(getattr(Distributions, name, None), (int, float)) and name not in self.profiles:
+                raise TypeError(f"Unknown distribution parameter: {name}")
+            setattr(self, name, value)
+        
+        # seed may be an int, None for fresh entropy, or a SeedSequence spawned by a replication runner
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        # the streams' seeds are the children spawn() would give a fresh sequence, made without calling spawn(),
+        # which would change the caller's sequence and so give a second run from it different streams
+        seeds = [np.random.SeedSequence(seed_sequence.entropy, spawn_key=(*seed_sequence.spawn_key, i), pool_size=seed_sequence.pool_size)
+                 for i in range(len(self.stream_names))]
+        rng = {name: np.random.default_rng(stream_seed) for name, stream_seed in zip(self.stream_names, seeds)}
+        # with antithetic=True every stream produces the antithetic variates of the same seed's streams, so
+        # the two runs form an antithetic pair (see modules/replications.py)
+        self.antithetic = antithetic
+        if antithetic:
+            rng = {name: AntitheticGenerator(generator) for name, generator in rng.items()}
+        self.rng = rng
+        self.block_size = block_size
+        
+        self.rider_patience = BufferedSampler(standard_exponential, rng["rider patience"], block_size)
+        self.driver_available_length = BufferedSampler(partial(uniform, low=5, high=8), rng["driver available length"], block_size)
+        self.coordinates = BufferedSampler(
+            partial(coordinate_pairs, x=partial(uniform, low=0, high=20), y=partial(uniform, low=0, high=20)),
+            rng["coordinates"], block_size)
+        self.driver_initial_coordinates = BufferedSampler(
+            partial(coordinate_pairs, x=partial(skewnorm, a=-0.66, loc=11.77, scale=4.77), y=partial(skewnorm, a=-1.86, loc=15.74, scale=6.13)),
+            rng["driver initial coordinates"], block_size)
+        self.rider_origin_coordinates = BufferedSampler(
+            partial(coordinate_pairs, x=partial(skewnorm, a=11.70, loc=0.55, scale=6.89), y=partial(lognorm, s=0.16, loc=-19.07, scale=26.89)),
+            rng["rider origin coordinates"], block_size)
+        self.rider_destination_coordinates = BufferedSampler(
+            partial(coordinate_pairs, x=partial(lognorm, s=0.08, loc=-51.78, scale=60.91), y=partial(skewnorm, a=-1.73, loc=15.70, scale=6.24)),
+            rng["rider destination coordinates"], block_size)
+        self.trip_time_fraction = BufferedSampler(standard_uniform, rng["actual trip time"], block_size)
+        for stream, sampler in (spec or {}).get("samplers", {}).items():
+            if stream not in self.fitted_streams:
+                raise ValueError(f"A spec cannot set the distribution of: {stream}")
+            setattr(self, stream.replace(" ", "_"), BufferedSampler(self._fitted_draw(sampler), rng[stream], block_size))
+            if stream == "driver available length":
+                from scipy import stats
+                self.driver_available_length_mean = float(getattr(stats, sampler["family"]).mean(**sampler["params"]))
         
-    def generate_driver_inter_arrival(self)->float:
-        return random.expovariate(4.09/60)
+    def generate_driver_arrivals(self, start:float = 0, until:float = np.inf)->ArrivalStream:
+        return self._arrival_stream("driver inter-arrival", self.driver_arrival_rate, self.driver_arrival_profile, start, until)
     
     def generate_driver_available_length(self)->float:
-        return 60 * random.uniform(5, 8)
+        return 60 * self.driver_available_length()
     
     def generate_driver_initial_coordinates(self)->npt.ArrayLike:
-        x = stats.skewnorm.rvs(a=-0.66, loc=11.77, scale=4.77)
-        y = stats.skewnorm.rvs(a=-1.86, loc=15.74, scale=6.13)
-        return np.array([x, y])
+        return self.driver_initial_coordinates()
     
     def generate_rider_origin_coordinates(self)->npt.ArrayLike:
-        x = stats.skewnorm.rvs(a=11.70, loc=0.55, scale=6.89)
-        y = stats.lognorm.rvs(s=0.16, loc=-19.07, scale=26.89)
-        return np.array([x, y])
+        return self.rider_origin_coordinates()
     
     def generate_rider_destination_coordinates(self)->npt.ArrayLike:
-        x = stats.lognorm.rvs(s=0.08, loc=-51.78, scale=60.91)
-        y = stats.skewnorm.rvs(a=-1.73, loc=15.70, scale=6.24)
-        return np.array([x, y])
+        return self.rider_destination_coordinates()
     
     def generate_coordinates(self)->npt.ArrayLike:
-        x = random.uniform(0, 20)
-        y = random.uniform(0, 20)
-        return np.array([x, y])
+        return self.coordinates()
     
-    def generate_rider_inter_arrival(self)->float:
-        return random.expovariate(32.01/60)
+    def generate_rider_arrivals(self, start:float = 0, until:float = np.inf)->ArrivalStream:
+        return self._arrival_stream("rider inter-arrival", self.rider_arrival_rate, self.rider_arrival_profile, start, until)
     
     def generate_rider_patience(self)->float:
-        return random.expovariate(5/60)
+        return self.rider_patience() / self.rider_patience_rate
     
     def generate_actual_trip_time(self, distance)->float:
         average_speed = 20
         expected_trip_time = distance / average_speed
-        actual_trip_time = 60 * random.uniform(0.8 * expected_trip_time, 1.2 * expected_trip_time)
-        return actual_trip_time
\ No newline at end of file
+        actual_trip_time = 60 * expected_trip_time * (0.8 + 0.4 * self.trip_time_fraction())
+        return actual_trip_time
+    
+    def input_controls(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Realised mean and known expectation of the main random inputs of the simulation run so far, for use
+        as control variates. Arrivals are measured as arrivals per minute of the run.
+        """
+        length = self.simulation.simulation_length
+        counters = self.simulation.event_counters
+        return {
+            "rider arrivals per minute": (counters.get("rider join", 0) / length, self._mean_rate(self.rider_arrival_rate, self.rider_arrival_profile, length)),
+            "driver arrivals per minute": (counters.get("driver join", 0) / length, self._mean_rate(self.driver_arrival_rate, self.driver_arrival_profile, length)),
+            # the samplers below hand out standard exponential and uniform variates, scaled by the generate_ methods
+            "rider patience": (self.rider_patience.mean(), 1.0),
+            "driver available length": (self.driver_available_length.mean(), self.driver_available_length_mean),
+            "trip time fraction": (self.trip_time_fraction.mean(), 0.5),
+        }
+    
+    @staticmethod
+    def _fitted_draw(sampler:Dict[str, Any]):
+        # a fitted family, or {"x": ..., "y": ...} for a coordinate stream
+        if "family" in sampler:
+            return partial(fitted, family=sampler["family"], params=sampler["params"])
+        return partial(coordinate_pairs, x=Distributions._fitted_draw(sampler["x"]), y=Distributions._fitted_draw(sampler["y"]))
+    
+    @staticmethod
+    def _mean_rate(rate:float, profile, length:float)->float:
+        return rate if profile is None else DailyProfile(rate, profile).mean_rate(length)
+    
+    def _arrival_stream(self, stream_name:str, rate:float, profile, start:float, until:float)->ArrivalStream:
+        if profile is None:
+            return ArrivalStream(self.rng[stream_name], rate, self.block_size, start=start, until=until)
+        rate_function = DailyProfile(rate, profile)
+        # thinned from the profile's busiest period
+        return ArrivalStream(self.rng[stream_name], rate_function.max_rate, self.block_size, rate_function, start, until)
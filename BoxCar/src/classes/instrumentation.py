@@ -0,0 +1,128 @@
+from typing import Any, Callable, Dict, List, Optional
+from time import perf_counter
+import csv
+import json
+import os
+
+
+class _TimedHandler:
+    # wraps one event handler, timing each call; a class rather than a closure so checkpoints can pickle it
+    __slots__ = ("handler", "instrumentation", "event_type", "calls", "seconds")
+
+    def __init__(self, handler: Callable[..., None], instrumentation: "Instrumentation", event_type: str) -> None:
+        self.handler = handler
+        self.instrumentation = instrumentation
+        self.event_type = event_type
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, sim: Any, *event_data: Any) -> None:
+        instrumentation = self.instrumentation
+        if sim.current_time >= instrumentation.next_sample:
+            instrumentation.sample()
+        start = perf_counter()
+        self.handler(sim, *event_data)
+        self.seconds += perf_counter() - start
+        self.calls += 1
+
+
+class Instrumentation:
+    """
+    Opt-in profiling of the event loop, passed to Simulation(instrumentation=...). Every event handler is
+    wrapped to record its wall-clock time per event type, and every `sample_interval` simulated minutes
+    the calendar length, the unmatched pool sizes and the events per second since the last sample are
+    recorded. Without instrumentation the handlers are called directly, so it costs nothing when off.
+
+    The report (see write_report) is JSON, or CSV with the samples in a second file.
+    """
+    def __init__(self, sample_interval: float = 60, report_path: Optional[str] = None) -> None:
+        self.sample_interval = sample_interval
+        self.report_path = report_path
+        self.simulation: Any = None
+        self.handlers: Dict[str, _TimedHandler] = {}
+        self.next_sample = 0.0
+        self.samples: Dict[str, List[float]] = {"time": [], "calendar": [], "unmatched_riders": [], "unmatched_drivers": [], "events_per_second": []}
+        self._start = None
+        self._last_sample_wall = None
+        self._last_sample_events = 0
+        self.wall_time = 0.0
+
+    def attach(self, simulation: Any) -> None:
+        self.simulation = simulation
+        for kind, handler in enumerate(simulation.dispatch):
+            if handler is not None:
+                simulation.dispatch[kind] = self.wrap(simulation.event_types[kind], handler)
+
+    def wrap(self, event_type: str, handler: Callable[..., None]) -> _TimedHandler:
+        timed = _TimedHandler(handler, self, event_type)
+        self.handlers[event_type] = timed
+        return timed
+
+    @property
+    def events(self) -> int:
+        return sum(self.simulation.event_counts)
+
+    def sample(self) -> None:
+        sim = self.simulation
+        now = perf_counter()
+        events = self.events
+        if self._start is None:
+            self._start = now
+        elif now > self._last_sample_wall:
+            self.samples["time"].append(sim.current_time)
+            self.samples["calendar"].append(len(sim.event_calendar))
+            self.samples["unmatched_riders"].append(len(sim.unmatched_riders))
+            self.samples["unmatched_drivers"].append(len(sim.unmatched_drivers))
+            self.samples["events_per_second"].append((events - self._last_sample_events) / (now - self._last_sample_wall))
+        self._last_sample_wall = now
+        self._last_sample_events = events
+        while self.next_sample <= sim.current_time:
+            self.next_sample += self.sample_interval
+
+    def close(self) -> None:
+        # called by Simulation.run at termination
+        if self._start is not None:
+            self.wall_time = perf_counter() - self._start
+        if self.report_path:
+            self.write_report(self.report_path)
+
+    def report(self) -> Dict[str, Any]:
+        events = self.events
+        handler_seconds = sum(timed.seconds for timed in self.handlers.values())
+        handlers = {}
+        for event_type, timed in sorted(self.handlers.items(), key=lambda item: -item[1].seconds):
+            handlers[event_type] = {
+                "handler": getattr(timed.handler, "__qualname__", None) or getattr(getattr(timed.handler, "handler", None), "__qualname__", repr(timed.handler)),
+                "calls": timed.calls,
+                "seconds": timed.seconds,
+                "mean_microseconds": timed.seconds / timed.calls * 1e6 if timed.calls else None,
+                "share_of_wall_time": timed.seconds / self.wall_time if self.wall_time else None,
+            }
+        return {
+            "events": events,
+            "wall_time": self.wall_time,
+            "events_per_second": events / self.wall_time if self.wall_time else None,
+            # time outside the handlers: popping and merging event sources, tracing, checkpoints, ...
+            "engine_seconds": self.wall_time - handler_seconds,
+            "handlers": handlers,
+            "samples": self.samples,
+        }
+
+    def write_report(self, path: str) -> None:
+        # path ending in .csv: handler table in path and samples in <path stem>_samples.csv; otherwise JSON
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        report = self.report()
+        if not path.endswith(".csv"):
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+            return
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["event_type", "handler", "calls", "seconds", "mean_microseconds", "share_of_wall_time"])
+            for event_type, stats in report["handlers"].items():
+                writer.writerow([event_type, *stats.values()])
+            writer.writerow(["(engine)", "", report["events"], report["engine_seconds"], "", report["engine_seconds"] / self.wall_time if self.wall_time else ""])
+        with open(path[:-len(".csv")] + "_samples.csv", "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.samples.keys())
+            writer.writerows(zip(*self.samples.values()))
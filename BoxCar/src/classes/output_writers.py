@@ -0,0 +1,207 @@
+from typing import Any, Dict, List, Tuple
+from abc import ABC, abstractmethod
+import glob
+import importlib.util
+import os
+import numpy as np
+import numpy.typing as npt
+
+# Columnar output. Instead of one CSV per metric, the simulation writes two typed tables while it runs:
+#   trips   - one row per completed trip (written at ride completion)
+#   drivers - one row per driver that has left (written at driver leave)
+# Rows are buffered and written in chunks, so memory does not grow with the length of the run.
+
+TRIP_COLUMNS: List[Tuple[str, Any]] = [
+    ("join_time", np.float64),               # when the rider joined (minutes)
+    ("assignment_wait", np.float64),         # rider wait until a driver accepted (minutes)
+    ("pickup_wait", np.float64),             # rider wait until pickup, incl. assignment (minutes)
+    ("dropoff_wait", np.float64),            # rider time until dropoff, incl. pickup (minutes)
+    ("direct_time_to_dropoff", np.float64),  # pickup to dropoff (minutes)
+    ("pickup_to_drive_ratio", np.float64),   # time to reach the rider / time to drive them
+    ("trip_time", np.float64),               # both legs (minutes)
+    ("trip_distance", np.float64),           # both legs (miles)
+    ("earnings", np.float64),
+    ("cost", np.float64),
+    ("profit", np.float64),
+    ("driver_idle_time", np.float64),        # driver idle time before accepting, NaN if the driver was not idle
+]
+
+DRIVER_COLUMNS: List[Tuple[str, Any]] = [
+    ("leave_time", np.float64),
+    ("total_time", np.float64),              # available length (minutes)
+    ("total_idle_time", np.float64),
+    ("idle_percentage", np.float64),         # fraction of the available length spent idle
+    ("total_rides", np.int64),
+    ("total_distance", np.float64),
+    ("total_earnings", np.float64),
+    ("total_costs", np.float64),
+    ("total_profit", np.float64),
+]
+
+TABLES: Dict[str, List[Tuple[str, Any]]] = {"trips": TRIP_COLUMNS, "drivers": DRIVER_COLUMNS}
+
+
+class ColumnarWriter(ABC):
+    """
+    Base class for the output backends: buffers rows per table and hands each full chunk to _write_chunk
+    as a dict of typed numpy columns.
+    """
+    def __init__(self, output_dir: str, chunk_size: int = 65536) -> None:
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self._rows: Dict[str, List[tuple]] = {table: [] for table in TABLES}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write_trip(self, current_time: float, rider, driver) -> None:
+        # called at ride completion, before the driver's per-ride totals are reset
+        self._append("trips", (
+            rider.join_time,
+            rider.assignment_time,
+            rider.pickup_time,
+            current_time - rider.join_time,
+            rider.second_leg_time,
+            rider.first_leg_time / rider.second_leg_time,
+            rider.first_leg_time + rider.second_leg_time,
+            driver.this_ride_first_leg_distance + driver.this_ride_second_leg_distance,
+            driver.this_ride_earnings,
+            driver.this_ride_costs,
+            driver.this_ride_earnings - driver.this_ride_costs,
+            driver.this_ride_idle_time,
+        ))
+
+    def write_driver(self, current_time: float, driver) -> None:
+        self._append("drivers", (
+            current_time,
+            driver.available_length,
+            driver.total_idle_time,
+            driver.total_idle_time / driver.available_length,
+            driver.total_rides,
+            driver.total_distance,
+            driver.total_earnings,
+            driver.total_costs,
+            driver.total_earnings - driver.total_costs,
+        ))
+
+    def _append(self, table: str, row: tuple) -> None:
+        rows = self._rows[table]
+        rows.append(row)
+        if len(rows) >= self.chunk_size:
+            self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        rows = self._rows[table]
+        if not rows:
+            return
+        values = list(zip(*rows))
+        columns = {name: np.array(values[i], dtype=dtype) for i, (name, dtype) in enumerate(TABLES[table])}
+        self._rows[table] = []
+        self._write_chunk(table, columns)
+
+    @abstractmethod
+    def _write_chunk(self, table: str, columns: Dict[str, npt.NDArray]) -> None:
+        # write one chunk of a table, as {column name: numpy array}
+        ...
+
+    def flush(self) -> None:
+        # write out the buffered rows of every table, e.g. before a checkpoint
+        for table in TABLES:
+            self._flush(table)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class NpzWriter(ColumnarWriter):
+    """
+    Writes each chunk as an uncompressed <table>-<chunk>.npz file. Needs nothing beyond numpy.
+    """
+    def __init__(self, output_dir: str, chunk_size: int = 65536) -> None:
+        super().__init__(output_dir, chunk_size)
+        self._chunks = {table: 0 for table in TABLES}
+
+    def _write_chunk(self, table: str, columns: Dict[str, npt.NDArray]) -> None:
+        np.savez(os.path.join(self.output_dir, f"{table}-{self._chunks[table]:05d}.npz"), **columns)
+        self._chunks[table] += 1
+
+
+class ArrowWriter(ColumnarWriter):
+    """
+    Writes <table>.arrow files in the Arrow IPC file format, one record batch per chunk. The files can be
+    memory-mapped and read without copying (see load_output). Requires pyarrow.
+    """
+    def __init__(self, output_dir: str, chunk_size: int = 65536) -> None:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        super().__init__(output_dir, chunk_size)
+        self._pa = pa
+        self._writers = {}
+        for table, columns in TABLES.items():
+            schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in columns])
+            self._writers[table] = ipc.new_file(os.path.join(output_dir, f"{table}.arrow"), schema)
+
+    def _write_chunk(self, table: str, columns: Dict[str, npt.NDArray]) -> None:
+        self._writers[table].write_batch(self._pa.record_batch(list(columns.values()), names=list(columns)))
+
+    def close(self) -> None:
+        super().close()
+        for writer in self._writers.values():
+            writer.close()
+
+
+class ParquetWriter(ColumnarWriter):
+    """
+    Writes <table>.parquet files, one row group per chunk. Requires pyarrow.
+    """
+    def __init__(self, output_dir: str, chunk_size: int = 65536) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        super().__init__(output_dir, chunk_size)
+        self._pa = pa
+        self._writers = {}
+        for table, columns in TABLES.items():
+            schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in columns])
+            self._writers[table] = pq.ParquetWriter(os.path.join(output_dir, f"{table}.parquet"), schema)
+
+    def _write_chunk(self, table: str, columns: Dict[str, npt.NDArray]) -> None:
+        self._writers[table].write_table(self._pa.table(columns))
+
+    def close(self) -> None:
+        super().close()
+        for writer in self._writers.values():
+            writer.close()
+
+
+WRITERS = {"npz": NpzWriter, "arrow": ArrowWriter, "parquet": ParquetWriter}
+
+
+def create_output_writer(output_dir: str, output_format: str = "auto", chunk_size: int = 65536) -> ColumnarWriter:
+    # "auto" picks Arrow IPC when pyarrow is installed and falls back to npz; pyarrow is only imported by the
+    # arrow writer itself
+    if output_format == "auto":
+        output_format = "arrow" if importlib.util.find_spec("pyarrow") is not None else "npz"
+    return WRITERS[output_format](output_dir, chunk_size)
+
+
+def load_output(output_dir: str) -> Dict[str, Any]:
+    """
+    Load the trips and drivers tables written by any of the writers above.
+
+    Arrow files are memory-mapped, so columns are read lazily and without copying; Parquet files are read
+    with memory mapping. Both come back as pyarrow Tables (use .to_pandas() for a DataFrame). npz chunks
+    come back as {column: numpy array}.
+    """
+    tables = {}
+    for table in TABLES:
+        arrow_path = os.path.join(output_dir, f"{table}.arrow")
+        parquet_path = os.path.join(output_dir, f"{table}.parquet")
+        if os.path.exists(arrow_path):
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+            tables[table] = ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+        elif os.path.exists(parquet_path):
+            import pyarrow.parquet as pq
+            tables[table] = pq.read_table(parquet_path, memory_map=True)
+        else:
+            chunks = [np.load(path) for path in sorted(glob.glob(os.path.join(output_dir, f"{table}-*.npz")))]
+            tables[table] = {name: np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype) for name, dtype in TABLES[table]}
+    return tables
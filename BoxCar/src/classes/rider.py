@@ -1,11 +1,28 @@
 import numpy as np
 import numpy.typing as npt
-from numpy.random import uniform
 import classes.simulation as simulation
+from classes.entity_store import EntityView
 
-class Rider:
+class Rider(EntityView):
+    
+    # numeric state lives in the simulation's rider store (see classes/entity_store.py)
+    fields = {
+        "origin": (np.float64, (2,)),
+        "destination": (np.float64, (2,)),
+        "abandonment_time": (np.float64, ()),
+        "assigned": (np.bool_, ()),
+        "picked_up": (np.bool_, ()),
+        "join_time": (np.float64, ()),
+        "assignment_time": (np.float64, ()),
+        "pickup_time": (np.float64, ()),
+        "first_leg_time": (np.float64, ()),
+        "second_leg_time": (np.float64, ()),
+    }
+    __slots__ = ()
     
     def __init__(self, sim_instance:simulation, join_time:float):
+        self._bind(sim_instance.rider_store)
+        
         self.origin:npt.ArrayLike = sim_instance.distributions["rider origin coordinates"]()
         self.destination:npt.ArrayLike = sim_instance.distributions["rider destination coordinates"]()
         
@@ -19,5 +36,5 @@ class Rider:
         self.assignment_time:float = np.inf
         self.pickup_time:float = np.inf
         
+        self.first_leg_time:float = np.inf
         self.second_leg_time:float = np.inf
-        
@@ -0,0 +1,118 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+import numpy.typing as npt
+
+
+def mser_truncation(observations: npt.ArrayLike, batch_size: int = 5) -> Optional[int]:
+    """
+    MSER-5 warm-up detection: the observations are averaged in batches of `batch_size` and the truncation
+    point d (in batches) minimising the marginal standard error sum((Z[d:] - mean(Z[d:]))^2) / (m - d)^2 is
+    chosen. Returns the number of observations to discard, or None if the minimum falls in the second half
+    of the series, i.e. the run is not yet long enough to tell where the warm-up ends.
+    """
+    observations = np.asarray(observations, dtype=float)
+    m = len(observations) // batch_size
+    if m < 4:
+        return None
+    batches = observations[:m * batch_size].reshape(m, batch_size).mean(axis=1)
+    # sums and sums of squares of Z[d:] for every d at once
+    suffix_sum = np.cumsum(batches[::-1])[::-1]
+    suffix_square_sum = np.cumsum(batches[::-1] ** 2)[::-1]
+    remaining = np.arange(m, 0, -1)
+    mser = (suffix_square_sum - suffix_sum ** 2 / remaining) / remaining ** 2
+    d = int(np.argmin(mser[:m // 2 + 1]))
+    if d >= m // 2:
+        return None
+    return d * batch_size
+
+
+class SequentialStopping:
+    """
+    Stops a single long run once the chosen KPIs are estimated precisely enough.
+
+    Every `period` simulated minutes the mean of each KPI's new observations (e.g. pickup waits of riders
+    picked up that hour) is recorded, with the end of the period; a period without new observations is
+    folded into the next one. The warm-up of each series is found with MSER-5 and discarded, the
+    rest is split into `batches` batch means, and when the confidence interval half width of every KPI is
+    within `target` of its mean, the simulation is told to terminate at the current time.
+
+    KPIs are named by their Simulation attribute and may be lists or StreamingSummary accumulators.
+    """
+    def __init__(self, kpis: Sequence[str] = ("rider_wait_time_pickups", "driver_total_idle_percentages"), target: float = 0.05,
+                 confidence: float = 0.95, period: float = 60, batches: int = 20, min_observations: int = 200) -> None:
+        self.kpis = kpis
+        self.target = target
+        self.confidence = confidence
+        self.period = period
+        self.batches = batches
+        self.min_observations = min_observations
+        self.next_check = period
+        self.observations: Dict[str, list] = {kpi: [] for kpi in kpis}
+        self.observation_times: Dict[str, list] = {kpi: [] for kpi in kpis}  # end of the period of each observation
+        self._seen: Dict[str, Tuple[int, float]] = {kpi: (0, 0.0) for kpi in kpis}
+        self.warm_up: Dict[str, Optional[float]] = {kpi: None for kpi in kpis}  # warm-up length (minutes)
+        self.estimates: Dict[str, Tuple[float, float]] = {}                      # kpi -> (mean, half width)
+        self.stopped_at: Optional[float] = None
+
+    def check(self, sim: Any) -> bool:
+        # record the observations since the last check, then stop the run if every KPI is precise enough
+        while self.next_check <= sim.current_time:
+            self.next_check += self.period
+        period_end = self.next_check - self.period
+        for kpi in self.kpis:
+            seen_count, seen_total = self._seen[kpi]
+            count, total = _count_and_total(getattr(sim, kpi), seen_count, seen_total)
+            if count > seen_count:
+                self.observations[kpi].append((total - seen_total) / (count - seen_count))
+                self.observation_times[kpi].append(period_end)
+            self._seen[kpi] = (count, total)
+
+        for kpi in self.kpis:
+            if not self._estimate(kpi):
+                return False
+        self.stopped_at = sim.current_time
+        sim.terminate_at(sim.current_time)
+        return True
+
+    def _estimate(self, kpi: str) -> bool:
+        # batch means after truncating the warm-up; true once the relative half width reaches the target
+        observations = self.observations[kpi]
+        truncation = mser_truncation(observations)
+        if truncation is None:
+            return False
+        # the warm-up ends with the period of the last discarded observation
+        self.warm_up[kpi] = self.observation_times[kpi][truncation - 1] if truncation else 0.0
+        steady = np.array(observations[truncation:])
+        if len(steady) < max(self.min_observations, self.batches):
+            return False
+        batch_size = len(steady) // self.batches
+        # the earliest observations left over after forming equal batches are dropped
+        batch_means = steady[len(steady) - batch_size * self.batches:].reshape(self.batches, batch_size).mean(axis=1)
+        mean = batch_means.mean()
+        from scipy import stats
+        half_width = stats.t.ppf((1 + self.confidence) / 2, self.batches - 1) * batch_means.std(ddof=1) / np.sqrt(self.batches)
+        self.estimates[kpi] = (mean, half_width)
+        return half_width <= self.target * abs(mean)
+
+    def print_summary(self) -> None:
+        from tabulate import tabulate
+        headers = ["KPI", "Warm-up (hours)", "Mean", f"{self.confidence * 100:.0f}% CI half width", "Relative half width"]
+        data = []
+        for kpi in self.kpis:
+            warm_up = "-" if self.warm_up[kpi] is None else f"{self.warm_up[kpi] / 60:.0f}"
+            if kpi in self.estimates:
+                mean, half_width = self.estimates[kpi]
+                data.append([kpi, warm_up, f"{mean:.4g}", f"{half_width:.4g}", f"{half_width / abs(mean) * 100:.1f}%"])
+            else:
+                data.append([kpi, warm_up, "-", "-", "-"])
+        stopped = "target not reached" if self.stopped_at is None else f"stopped at {self.stopped_at / 60:.0f} hours"
+        print(f"\nSequential stopping ({stopped}), batch means over {self.batches} batches after warm-up:")
+        print(tabulate(data, headers=headers, tablefmt="grid"))
+
+
+def _count_and_total(series: Any, seen_count: int, seen_total: float) -> Tuple[int, float]:
+    # number and sum of the observations in a KPI list or StreamingSummary; for lists only the values
+    # added since the last check are summed
+    if isinstance(series, list):
+        return len(series), seen_total + float(np.sum(series[seen_count:]))
+    return len(series), series.total
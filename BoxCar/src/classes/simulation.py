@@ -1,78 +1,111 @@
-from typing import Callable, List, Dict, Any
-from bisect import bisect_right
+from typing import AsyncIterator, Callable, List, Dict, Any, Iterator, Optional
 from classes.rider import Rider
 from classes.driver import Driver
-import time
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import numpy.typing as npt
+from classes.event_calendar import HeapEventCalendar
+from classes.spatial_index import GridIndex
+from classes.waiting_pool import WaitingPool
+from classes.streaming_stats import StreamingSummary
+from classes.entity_store import EntityStore
+from classes.event import EVENT_TYPES, RIDER_ABANDON, TERMINATION, EventRecord, event_record
+from operator import attrgetter
+from types import MethodType
+import pickle
+import random
 import numpy as np
-from tabulate import tabulate
-import csv
 import os
 
+# default directory of the output files and checkpoints, BoxCar/output whatever the working directory
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "output")
 
 
-print("simulation.py loaded successfully")
-
 class Simulation:
-    def __init__(self, handlers, distributions: Any = None):
-        
-        self.plot:bool = False
-        if self.plot:
-            plt.ion()
-            self.fig, self.ax = plt.subplots()
-            self.ax.set_xlim(0, 20)
-            self.ax.set_ylim(0, 20)
-            self.lines: Dict[Driver, Dict[str, plt.Line2D]] = {}
-            self.driver_points: Dict[Driver, Dict[str, npt.ArrayLike]] = {}
-            self.rider_points: Dict[Rider, Dict[str, mpl.collections.PathCollection]] = {}
+    def __init__(self, handlers, distributions: Any = None, event_calendar: Any = None, simulation_length: float = 60 * 8766, record_raw_output: bool = True, output_writer: Any = None, trace: Any = None, checkpoint_interval: float = None, checkpoint_path: str = os.path.join(OUTPUT_DIR, "checkpoint.pkl"), stopping_rule: Any = None, instrumentation: Any = None, state_statistics: Any = None, dispatcher: Any = None):
         
-        self.simulation_sleep_time = 0
-        self.simulation_length = 60 * 8766 # Termination time (minutes)
+        self.show_progress: bool = True
+        self.simulation_length = simulation_length # Termination time (minutes)
         self.current_time = 0               # Keep tracks of simulation clock
         
-        self.event_calendar: List[Dict[str, Any]] = [] # Event calendar is initialized as empty
+        # Event calendar is initialized as empty. Any future event list with push/pop/peek can be plugged in, e.g. CalendarQueue
+        self.event_calendar = event_calendar if event_calendar is not None else HeapEventCalendar()
         self.distributions: Dict[str, Callable[[Any], None]] = {}
-        self.event_handlers: Dict[str, Callable[[Any], None]] = {} # The event_handlers list will associate each event with the modules/functions necessary to execute that event. This list is empty and designed to be dynamic to flexibility add or remove event types.
-        self.unmatched_riders: List[Rider] = []
-        self.unmatched_drivers: List[Driver] = []
+        # Events are (time, kind, data) tuples (see classes/event.py). The dispatch table holds the handler of
+        # each event kind, called as handler(sim, *data); event types registered by name later get new kinds.
+        self.event_types: List[str] = list(EVENT_TYPES)
+        self.event_kinds: Dict[str, int] = {event_type: kind for kind, event_type in enumerate(EVENT_TYPES)}
+        self.dispatch: List[Optional[Callable[..., None]]] = [None] * len(EVENT_TYPES)
+        # riders' and drivers' numeric state is kept column-wise in these stores, addressed by entity id
+        self.rider_store = EntityStore(Rider.fields)
+        self.driver_store = EntityStore(Driver.fields)
+        # unmatched pools are spatial indexes keyed by where the rider is waiting and where the driver is parked
+        # waiting riders also carry their patience deadline; expirations are taken from the pool rather than
+        # scheduled as "rider abandon" calendar events (see pop_event)
+        self.unmatched_riders: WaitingPool = WaitingPool(attrgetter('origin'), attrgetter('abandonment_time'), self.event_calendar.next_sequence)
+        self.unmatched_drivers: GridIndex = GridIndex(attrgetter('position'))
+        
+        # metrics to ensure that the distributions are correct, per event kind (see event_counters for names)
+        self.event_counts: List[int] = [0] * len(EVENT_TYPES)
         
-        # metrics to ensure that the distributions are correct
-        self.event_counters: Dict[str, int] = {}
+        # KPIs. With record_raw_output every observation is kept in a list (needed for saveToCSV); otherwise
+        # each KPI is a StreamingSummary that only keeps the statistics printKPIsTable reports, in flat memory
+        self.record_raw_output = record_raw_output
+        new_series = list if record_raw_output else StreamingSummary
         
         # KPIs - riders
-        self.rider_wait_time_assignments = []
-        self.rider_wait_time_pickups = []
-        self.rider_wait_time_dropoffs = []
-        self.rider_direct_time_to_dropoffs = []
-        self.rider_pickup_to_drive_ratios = []
+        self.rider_wait_time_assignments = new_series()
+        self.rider_wait_time_pickups = new_series()
+        self.rider_wait_time_dropoffs = new_series()
+        self.rider_direct_time_to_dropoffs = new_series()
+        self.rider_pickup_to_drive_ratios = new_series()
+        
+        self.driver_total_rides = new_series()
+        
+        self.driver_total_idle_times = new_series()
+        self.driver_single_idle_times = new_series()
+        self.driver_total_idle_percentages = new_series()
         
-        self.driver_total_rides = []
+        self.driver_total_times = new_series()
+        self.driver_single_trip_times = new_series()
         
-        self.driver_total_idle_times = []
-        self.driver_single_idle_times = []
-        self.driver_total_idle_percentages = []
+        self.driver_total_distance = new_series()
+        self.driver_single_trip_distances = new_series()
         
-        self.driver_total_times = []
-        self.driver_single_trip_times = []
+        self.driver_total_costs = new_series()
+        self.driver_single_trip_costs = new_series()
         
-        self.driver_total_distance = []
-        self.driver_single_trip_distances = []
+        self.driver_total_earnings = new_series()
+        self.driver_single_trip_earnings = new_series()
         
-        self.driver_total_costs = []
-        self.driver_single_trip_costs = []
+        self.driver_total_profit = new_series()
+        self.driver_single_trip_profit = new_series()
         
-        self.driver_total_earnings = []
-        self.driver_single_trip_earnings = []
+        # optional time-weighted averages of queue lengths and driver utilisation, updated as the clock moves
+        # on (see classes/state_statistics.py); StateStatistics(snapshot_interval=...) also keeps a time series
+        self.state_statistics = state_statistics
         
-        self.driver_total_profit = []
-        self.driver_single_trip_profit = []
+        # optional columnar output (see classes/output_writers.py), written in chunks as trips complete and drivers leave
+        self.output_writer = output_writer
+        # optional event trace (see classes/event_trace.py), replayed as an animation by modules/replay.py
+        self.trace = trace
+        # optional checkpoints every checkpoint_interval simulated minutes (see save_checkpoint)
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_path = checkpoint_path
+        self.next_checkpoint_time = checkpoint_interval if checkpoint_interval else np.inf
+        # optional rule that ends the run early once the KPIs are precise enough, e.g. SequentialStopping
+        # (see classes/sequential_stopping.py); it is checked every stopping_rule.next_check minutes
+        self.stopping_rule = stopping_rule
+        # the progress bar is printed by run() every tenth of the run
+        self.next_progress_time = self.simulation_length / 10
+        # optional profiling of the handlers and sampling of queue sizes (see classes/instrumentation.py);
+        # it wraps the handlers as they are registered
+        self.instrumentation = instrumentation
+        # optional batch matching (see classes/batch_dispatcher.py); without it each arrival and freed
+        # driver is matched greedily when its event is handled
+        self.dispatcher = dispatcher
         
         
+        # the object the distributions are drawn from, e.g. for its input_controls
+        self.input_distributions = distributions
         if distributions:
-            self.register_distribution("rider inter-arrival", distributions.generate_rider_inter_arrival)
-            self.register_distribution("driver inter-arrival", distributions.generate_driver_inter_arrival)
             self.register_distribution("rider patience", distributions.generate_rider_patience)
             self.register_distribution("driver available length", distributions.generate_driver_available_length)
             # self.register_distribution("coordinates", distributions.generate_coordinates)
@@ -81,7 +114,10 @@ class Simulation:
             self.register_distribution("rider destination coordinates", distributions.generate_rider_destination_coordinates)
             self.register_distribution("actual trip time", distributions.generate_actual_trip_time)
         
-        if handlers:
+        if handlers and hasattr(handlers, "direct_handlers"):
+            for event_type, handler in handlers.direct_handlers().items():
+                self.register_direct_handler(event_type, handler)
+        elif handlers:
             self.register_event_handler("rider join", handlers.handle_rider_join)
             self.register_event_handler("rider abandon", handlers.handle_rider_abandon)
             self.register_event_handler("driver join", handlers.handle_driver_join)
@@ -90,108 +126,290 @@ class Simulation:
             self.register_event_handler("ride pickup", handlers.handle_ride_pickup)
             self.register_event_handler("ride completion", handlers.handle_ride_completion)
             self.register_event_handler("termination", handlers.handle_termination)
+        if instrumentation is not None:
+            instrumentation.attach(self)
+        if dispatcher is not None:
+            dispatcher.attach(self)
+        
+        # arrivals come from pre-generated streams merged with the calendar (see pop_event); riders and
+        # drivers are only created when they arrive
+        self.arrival_streams: List[list] = []
+        if distributions:
+            self.register_arrival_stream("rider join", distributions.generate_rider_arrivals(self.current_time, self.simulation_length), Rider)
+            self.register_arrival_stream("driver join", distributions.generate_driver_arrivals(self.current_time, self.simulation_length), Driver)
+        self.termination_event = self.schedule(self.simulation_length, TERMINATION)
         
-        first_rider_join_time = self.current_time + self.distributions["rider inter-arrival"]()
-        first_rider = Rider(self, first_rider_join_time)
-        first_driver_join_time = self.current_time + self.distributions["driver inter-arrival"]()
-        first_driver = Driver(self, first_driver_join_time)
-        self.add_event(first_rider_join_time, "rider join", [first_rider])
-        self.add_event(first_driver_join_time, "driver join", [first_driver])
-        self.add_event(self.simulation_length, "termination", None)
         
+    def add_event(self, event_time:float, event_type: str, event_data: Any = None)->Any:
+        # returns a handle that can be passed to cancel_event; event_data is the sequence of handler arguments
+        return self.schedule(event_time, self.event_kind(event_type), () if event_data is None else event_data)
+    
+    def schedule(self, event_time: float, kind: int, event_data: tuple = ()) -> Any:
+        # add_event for callers that already know the event kind, e.g. the handlers
+        return self.event_calendar.push(event_time, (event_time, kind, event_data))
+    
+    def event_kind(self, event_type: str) -> int:
+        # the kind of a named event type, registering a new kind for a new type
+        kind = self.event_kinds.get(event_type)
+        if kind is None:
+            kind = self.event_kinds[event_type] = len(self.event_types)
+            self.event_types.append(event_type)
+            self.dispatch.append(None)
+            self.event_counts.append(0)
+        return kind
+    
+    @property
+    def event_counters(self) -> Dict[str, int]:
+        # {event type: number processed} for the event types that have occurred
+        return {event_type: count for event_type, count in zip(self.event_types, self.event_counts) if count}
+    
+    def cancel_event(self, handle: Any) -> None:
+        # the cancelled event stays in the calendar as a tombstone and is skipped when it reaches the front
+        if handle is not None:
+            self.event_calendar.cancel(handle)
         
-    def add_event(self, event_time:float, event_type: str, event_data: Any = None)->None:
-        event = {'time': event_time, 'type': event_type, 'data': event_data}
-        index = bisect_right([e['time'] for e in self.event_calendar], event_time)
-        self.event_calendar.insert(index, event)
+    def terminate_at(self, termination_time: float) -> None:
+        # move the termination event, e.g. to end the run early
+        self.cancel_event(self.termination_event)
+        self.simulation_length = termination_time
+        self.termination_event = self.schedule(termination_time, TERMINATION)
+    
+    def register_arrival_stream(self, event_type: str, stream: Any, entity: Callable[[Any, float], Any]) -> None:
+        # stream has peek()/pop() of sorted arrival times (inf when exhausted); each arrival becomes an
+        # event_type event whose data is (entity(sim, time),)
+        self.arrival_streams.append([stream, self.event_kind(event_type), entity])
+    
+    def _next_source(self) -> Any:
+        # where the next event comes from: None for the calendar, the waiting pool for a rider running out of
+        # patience, or an arrival stream. The calendar wins ties with arrivals, and the waiting pool is
+        # ordered with the calendar by (time, seq) as its deadlines take calendar sequence numbers
+        head = self.event_calendar.peek_entry()
+        time, seq = (head[0], head[1]) if head is not None else (np.inf, -1)
+        source = None
+        deadline = self.unmatched_riders.next_deadline()
+        if deadline is not None and (deadline[0], deadline[1]) < (time, seq):
+            time, source = deadline[0], self.unmatched_riders
+        for arrivals in self.arrival_streams:
+            arrival_time = arrivals[0].peek()
+            if arrival_time < time:
+                time, source = arrival_time, arrivals
+        return source
+    
+    def has_events(self) -> bool:
+        return (bool(self.event_calendar) or self.unmatched_riders.next_deadline() is not None
+                or any(arrivals[0].peek() < np.inf for arrivals in self.arrival_streams))
+    
+    def peek_event(self) -> tuple:
+        # the data of an arrival is not known until it is popped, as the arriving entity is only created then
+        source = self._next_source()
+        if source is None:
+            return self.event_calendar.peek()
+        if source is self.unmatched_riders:
+            deadline, _, rider = source.next_deadline()
+            return (deadline, RIDER_ABANDON, (rider,))
+        return (source[0].peek(), source[1], None)
+    
+    def pop_event(self) -> tuple:
+        source = self._next_source()
+        if source is None:
+            return self.event_calendar.pop()
+        if source is self.unmatched_riders:
+            deadline, _, rider = source.pop_deadline()
+            return (deadline, RIDER_ABANDON, (rider,))
+        stream, kind, entity = source
+        arrival_time = stream.pop()
+        return (arrival_time, kind, (entity(self, arrival_time),))
         
     def register_distribution(self, random_quantity: str, handler: Callable[[Any], None]):
         self.distributions[random_quantity] = handler
         
         
     def register_event_handler(self, event_type: str, handler: Callable[[Any], None]) -> None:
-        # This function allows us to dynamically add event types to the list.
-        self.event_handlers[event_type] = handler
+        # This function allows us to dynamically add event types to the list. The handler is called with the
+        # event data, handler(event_data)
+        self.register_direct_handler(event_type, EventDataHandler(handler))
+    
+    def register_direct_handler(self, event_type: str, handler: Callable[..., None]) -> None:
+        # handler is called as handler(sim, *event_data), straight from the dispatch table
+        kind = self.event_kind(event_type)
+        if self.instrumentation is not None and self.instrumentation.simulation is self:
+            handler = self.instrumentation.wrap(event_type, handler)
+        self.dispatch[kind] = handler
         
-    def progress_time(self) -> None:
-        if not self.event_calendar:
+    def progress_time(self) -> Optional[int]:
+        # process the next event and return its kind
+        if not self.has_events():
             print("No more events to process.")
-            return
+            return None
 
-        # print important details in event calendar
-        # print("\n", [(event['time'], event['type']) for event in self.event_calendar])
+        event_time, kind, event_data = self.pop_event()
+        self.process_event(event_time, kind, event_data)
+        return kind
 
-        next_event = self.event_calendar.pop(0)
-        previous_time = self.current_time
-        self.current_time = next_event['time']
-        event_type = next_event['type']
-        event_data = next_event['data']
+    def process_event(self, event_time: float, kind: int, event_data: tuple) -> None:
+        if self.state_statistics is not None:
+            self.state_statistics.advance(self, event_time)
+        self.current_time = event_time
         
         # event counter to double check random distribution validity
-        self.event_counters[event_type] = self.event_counters.get(event_type, 0) + 1
-        #remove oldest abandon point if there are more than 10
-        if self.plot:
-            min_point = None
-            abandoned_points = [rider for rider in self.rider_points.keys() if 'abandon' in self.rider_points[rider]]
-            if len(abandoned_points) > 10:
-                min_point = min(abandoned_points, key=lambda rider: self.rider_points[rider]['time'])
-                        
-                self.rider_points[min_point]['abandon'].remove()
-                del self.rider_points[min_point]
-                self.fig.canvas.draw()
-                self.fig.canvas.flush_events()
-
-            min_point = None
-            leaving_points = [driver for driver in self.driver_points.keys() if driver.status == Driver.left]
-            if len(leaving_points) > 10:
-                min_point = min(leaving_points, key=lambda driver: self.driver_points[driver]['time'])
-                        
-                self.driver_points[min_point]['position'].remove()
-                del self.driver_points[min_point]
-                self.fig.canvas.draw()
-                self.fig.canvas.flush_events()
+        self.event_counts[kind] += 1
+        if self.trace is not None:
+            self.trace.record(event_time, kind, event_data)
         
         #-----update metrics here-----#
         
-        time.sleep(self.simulation_sleep_time)
-        # print(f"Processing event @ {self.current_time:.2f}:\t {event_type}")
-        # Calculate and display the loading bar
-        progress = self.current_time / self.simulation_length
-        if int(previous_time / self.simulation_length * 10) < int(progress * 10):
-            bar_length = 10
-            block = int(round(bar_length * progress))
-            loading_bar = "#" * block + "-" * (bar_length - block)
-            print(f"\rProgress: [{loading_bar}] {progress * 100:.2f}%", end="")
-
-        if event_type in self.event_handlers:
-            self.event_handlers[event_type](event_data)
+        handler = self.dispatch[kind]
+        if handler is not None:
+            handler(self, *event_data)
         else:
-            print(f"No handler registered for event type: {event_type}")
+            print(f"No handler registered for event type: {self.event_types[kind]}")
+            
             
+    def run_until(self, until: float) -> bool:
+        # process the events due before `until`; returns False once the termination event has been processed
+        while self.has_events():
+            if self.peek_event()[0] >= until:
+                return True
+            if self.progress_time() == TERMINATION:
+                return False
+        return False
             
-    def run(self) -> None:
+    def run(self, report: bool = True) -> None:
         """
         Run the simulation until all events are processed or a 'termination' event is encountered.
+        With report=False the KPI tables and CSV files are skipped, e.g. when running replications.
         """
         # print(self.event_calendar)
-        terminate_sim = 0
-        while self.event_calendar:
-            next_event = self.event_calendar[0]  # Peek at the next event
-            if next_event['type'] == "termination":
-                terminate_sim = 1
-            self.progress_time()
-            if terminate_sim == 1:
-                if self.plot: plt.show(block=True)
-                
-                self.printKPIsTable()
+        while self.has_events():
+            terminated = self.progress_time() == TERMINATION
+            self._after_event(terminated)
+            if terminated:
+                self._finish(report)
+                return
+        print("No more event to execute!")
+
+    def iter_events(self, until: Optional[float] = None) -> Iterator[EventRecord]:
+        """
+        Run the simulation one event at a time, yielding an EventRecord (see classes/event.py) for each
+        processed event. The simulation only advances as the records are consumed, so a slow consumer holds
+        it back and nothing is buffered. Stops before the first event at or after `until`, if given (call
+        again to carry on), or after the termination event, closing the run as run(report=False) would;
+        once the run has terminated there is nothing more to yield.
+        """
+        if self.event_counts[TERMINATION]:
+            return
+        while self.has_events():
+            if until is not None and self.peek_event()[0] >= until:
+                return
+            event = self.pop_event()
+            self.process_event(*event)
+            terminated = event[1] == TERMINATION
+            self._after_event(terminated)
+            if terminated:
+                # closed before the record is handed out, as a consumer may stop at it without asking for more
+                self._finish(report=False)
+                yield event_record(*event)
+                return
+            yield event_record(*event)
+
+    def aiter_events(self, until: Optional[float] = None, maxsize: int = 1024) -> AsyncIterator[EventRecord]:
+        # asyncio variant of iter_events, through a bounded queue (see classes/event_stream.py)
+        from classes.event_stream import aiter_events
+        return aiter_events(self, until, maxsize)
+
+    def _after_event(self, terminated: bool) -> None:
+        # stopping rule, progress bar and checkpoints, due after each event
+        if self.stopping_rule is not None and self.current_time >= self.stopping_rule.next_check and not terminated:
+            self.stopping_rule.check(self)
+        if self.current_time >= self.next_progress_time:
+            self.print_progress()
+        if self.current_time >= self.next_checkpoint_time and not terminated:
+            while self.next_checkpoint_time <= self.current_time:
+                self.next_checkpoint_time += self.checkpoint_interval
+            self.save_checkpoint(self.checkpoint_path)
+
+    def _finish(self, report: bool) -> None:
+        # after the termination event: close the outputs and, with report, print the KPIs and save the CSVs
+        if self.trace is not None:
+            self.trace.close()
+        if self.instrumentation is not None:
+            self.instrumentation.close()
+        if self.output_writer is not None:
+            self.output_writer.close()
+        if report:
+            self.printKPIsTable()
+            if self.stopping_rule is not None:
+                self.stopping_rule.print_summary()
+            if self.output_writer is None:
                 self.saveToCSV()
-                
-                break
-        if terminate_sim == 0:
-            print("No more event to execute!")
             
-    def saveToCSV(self):
-        output_dir = "BoxCar/output"
+    def print_progress(self) -> None:
+        # loading bar, called every tenth of the run
+        progress = min(self.current_time / self.simulation_length, 1)
+        while self.next_progress_time <= self.current_time:
+            self.next_progress_time += self.simulation_length / 10
+        if self.show_progress:
+            bar_length = 10
+            block = int(round(bar_length * progress))
+            loading_bar = "#" * block + "-" * (bar_length - block)
+            print(f"\rProgress: [{loading_bar}] {progress * 100:.2f}%", end="")
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # distributions are bound methods of the Distributions object, and the dispatch table holds functions
+        # and bound methods such as BatchDispatcher.match; methods are stored as (object, method name) so the
+        # checkpoint holds the objects themselves
+        state["distributions"] = {name: _unbind(handler) for name, handler in self.distributions.items()}
+        state["dispatch"] = [_unbind(handler) for handler in self.dispatch]
+        # open files cannot be pickled; a resumed run is given its own writer and trace (see load_checkpoint)
+        state["output_writer"] = None
+        state["trace"] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.distributions = {name: _rebind(handler) for name, handler in self.distributions.items()}
+        self.dispatch = [_rebind(handler) for handler in self.dispatch]
+    
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Write the full simulation state to path: calendar, waiting pools, live riders and drivers, KPIs,
+        event counters, arrival streams and the state of every random generator, including the global
+        random and numpy ones. Buffered output and trace records are flushed first, as the writer and the
+        trace themselves are not part of the checkpoint.
+        """
+        if self.trace is not None:
+            self.trace.flush()
+        if self.output_writer is not None:
+            self.output_writer.flush()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        checkpoint = {"simulation": self, "random": random.getstate(), "numpy": np.random.get_state()}
+        # write to a temporary file first, so a run killed mid-write leaves the previous checkpoint intact
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    
+    @staticmethod
+    def load_checkpoint(path: str, output_writer: Any = None, trace: Any = None) -> "Simulation":
+        """
+        Restore a simulation written by save_checkpoint; run() then continues exactly where it left off.
+        Rows and trace records from before the checkpoint stay where the original run wrote them, so give
+        the resumed run its own output directory and trace file.
+        """
+        with open(path, "rb") as file:
+            checkpoint = pickle.load(file)
+        random.setstate(checkpoint["random"])
+        np.random.set_state(checkpoint["numpy"])
+        sim = checkpoint["simulation"]
+        sim.output_writer = output_writer
+        sim.trace = trace
+        return sim
+            
+    def saveToCSV(self, output_dir: str = OUTPUT_DIR):
+        import csv
+        if not self.record_raw_output:
+            print("\nRaw output was not recorded (record_raw_output=False), no CSV files written.")
+            return
         os.makedirs(output_dir, exist_ok=True)
 
         def save_to_csv(filename, headers, data):
@@ -223,58 +441,78 @@ class Simulation:
         save_to_csv("rider_direct_time_to_dropoffs.csv", ["Rider Direct Time To Dropoffs"], [[time] for time in self.rider_direct_time_to_dropoffs])
         save_to_csv("rider_pickup_to_drive_ratios.csv", ["Rider Pickup To Drive Ratios"], [[ratio] for ratio in self.rider_pickup_to_drive_ratios])
 
-    def printKPIsTable(self):
-        def five_number_summary(data):
+    def collect_KPIs(self) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Summarise the KPIs as {table: {metric: [min, Q1, mean, Q3, max]}}, with None where a statistic does not apply.
+        """
+        def five_number_summary(data, scale=1):
             if not data:
                 return [0, 0, 0, 0, 0]
+            if isinstance(data, StreamingSummary):
+                return [data.min * scale, data.quantile(0.25) * scale, data.mean * scale, data.quantile(0.75) * scale, data.max * scale]
             return [
-                np.min(data),
-                np.percentile(data, 25),
-                np.mean(data),
-                np.percentile(data, 75),
-                np.max(data)
+                np.min(data) * scale,
+                np.percentile(data, 25) * scale,
+                np.mean(data) * scale,
+                np.percentile(data, 75) * scale,
+                np.max(data) * scale
             ]
 
-        # Prepare data for the rider KPIs table
-        headers_rider = ["Metric", "Min", "Q1", "Mean", "Q3", "Max"]
-        data_rider = [
-            ["Average abandonments per hour", "-", "-", f"{self.event_counters['rider abandon'] / (self.simulation_length / 60):.2f}", "-", "-"],
-            ["Rider assignment wait time (minutes)", *map(lambda x: f"{x:.2f}", five_number_summary(self.rider_wait_time_assignments))],
-            ["Rider pickup wait time (minutes) (incl. assignment time)", *map(lambda x: f"{x:.2f}", five_number_summary(self.rider_wait_time_pickups))],
-            ["Rider dropoff wait time (minutes) (incl. pickup time)", *map(lambda x: f"{x:.2f}", five_number_summary(self.rider_wait_time_dropoffs))],
-            ["Time directly to dropoff (minutes) (w/o pickup time)", *map(lambda x: f"{x:.2f}", five_number_summary(self.rider_direct_time_to_dropoffs))],
-            ["Rider ratio of pickup to drive time (%)", *map(lambda x: f"{x * 100:.2f}", five_number_summary(self.rider_pickup_to_drive_ratios))]
-        ]
+        rider = {
+            "Average abandonments per hour": [None, None, self.event_counters.get('rider abandon', 0) / (self.simulation_length / 60), None, None],
+            "Rider assignment wait time (minutes)": five_number_summary(self.rider_wait_time_assignments),
+            "Rider pickup wait time (minutes) (incl. assignment time)": five_number_summary(self.rider_wait_time_pickups),
+            "Rider dropoff wait time (minutes) (incl. pickup time)": five_number_summary(self.rider_wait_time_dropoffs),
+            "Time directly to dropoff (minutes) (w/o pickup time)": five_number_summary(self.rider_direct_time_to_dropoffs),
+            "Rider ratio of pickup to drive time (%)": five_number_summary(self.rider_pickup_to_drive_ratios, 100)
+        }
+        driver = {
+            "Driver idle percentage (%)": five_number_summary(self.driver_total_idle_percentages, 100),
+            "Equivalent Driver idle time per 5 hour day (minutes)": five_number_summary(self.driver_total_idle_percentages, 5 * 60),
+            "Equivalent Driver idle time per 8 hour day (minutes)": five_number_summary(self.driver_total_idle_percentages, 8 * 60),
+            "Number of rides per driver": five_number_summary(self.driver_total_rides),
+            "Distance driven per driver (miles)": five_number_summary(self.driver_total_distance),
+            "Earnings per driver (£)": five_number_summary(self.driver_total_earnings),
+            "Costs per driver (£)": five_number_summary(self.driver_total_costs),
+            "Profit per driver (£)": five_number_summary(self.driver_total_profit)
+        }
+        single_trip = {
+            "Single trip earnings (£)": five_number_summary(self.driver_single_trip_earnings),
+            "Single trip cost (£)": five_number_summary(self.driver_single_trip_costs),
+            "Single trip profit (£)": five_number_summary(self.driver_single_trip_profit),
+            "Single trip time (minutes)": five_number_summary(self.driver_single_trip_times),
+            "Single trip distance (miles)": five_number_summary(self.driver_single_trip_distances),
+            "Single idle time (minutes)": five_number_summary(self.driver_single_idle_times)
+        }
+        kpis = {"Rider": rider, "Driver": driver, "Single Trip": single_trip}
+        if self.state_statistics is not None:
+            kpis["System State"] = self.state_statistics.summary()
+        return kpis
+
+    def printKPIsTable(self):
+        # tabulate is only needed for reports, so it is not imported by headless runs
+        from tabulate import tabulate
+        headers = ["Metric", "Min", "Q1", "Mean", "Q3", "Max"]
+        for table, metrics in self.collect_KPIs().items():
+            data = [[metric, *map(lambda x: "-" if x is None else f"{x:.2f}", values)] for metric, values in metrics.items()]
+            print(f"\n{table} Key Performance Indicators (KPIs):")
+            print(tabulate(data, headers=headers, tablefmt="grid"))
+
+
+def _unbind(handler: Callable) -> Any:
+    return (handler.__self__, handler.__name__) if isinstance(handler, MethodType) else handler
+
 
-        print("\nRider Key Performance Indicators (KPIs):")
-        print(tabulate(data_rider, headers=headers_rider, tablefmt="grid"))
+def _rebind(handler: Any) -> Callable:
+    return getattr(*handler) if isinstance(handler, tuple) else handler
 
-        # Prepare data for the driver KPIs table
-        headers_driver = ["Metric", "Min", "Q1", "Mean", "Q3", "Max"]
-        data_driver = [
-            ["Driver idle percentage (%)", *map(lambda x: f"{x * 100:.2f}", five_number_summary(self.driver_total_idle_percentages))],
-            ["Equivalent Driver idle time per 5 hour day (minutes)", *map(lambda x: f"{x * 5 * 60:.2f}", five_number_summary(self.driver_total_idle_percentages))],
-            ["Equivalent Driver idle time per 8 hour day (minutes)", *map(lambda x: f"{x * 8 * 60:.2f}", five_number_summary(self.driver_total_idle_percentages))],
-            ["Number of rides per driver", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_total_rides))],
-            ["Distance driven per driver (miles)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_total_distance))],
-            ["Earnings per driver (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_total_earnings))],
-            ["Costs per driver (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_total_costs))],
-            ["Profit per driver (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_total_profit))]
-        ]
 
-        print("\nDriver Key Performance Indicators (KPIs):")
-        print(tabulate(data_driver, headers=headers_driver, tablefmt="grid"))
+class EventDataHandler:
+    # adapts a handler(event_data), as registered with register_event_handler, to the dispatch table
+    __slots__ = ("handler",)
 
-        # Prepare data for the single trip KPIs table
-        headers_single_trip = ["Metric", "Min", "Q1", "Mean", "Q3", "Max"]
-        data_single_trip = [
-            ["Single trip earnings (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_trip_earnings))],
-            ["Single trip cost (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_trip_costs))],
-            ["Single trip profit (£)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_trip_profit))],
-            ["Single trip time (minutes)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_trip_times))],
-            ["Single trip distance (miles)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_trip_distances))],
-            ["Single idle time (minutes)", *map(lambda x: f"{x:.2f}", five_number_summary(self.driver_single_idle_times))]
-        ]
+    def __init__(self, handler: Callable[[Any], None]) -> None:
+        self.handler = handler
 
-        print("\nSingle Trip Key Performance Indicators (KPIs):")
-        print(tabulate(data_single_trip, headers=headers_single_trip, tablefmt="grid"))
+    def __call__(self, sim: Any, *event_data: Any) -> None:
+        self.handler(event_data)
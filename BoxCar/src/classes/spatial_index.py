@@ -0,0 +1,108 @@
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from itertools import count
+from heapq import nsmallest
+import math
+import numpy as np
+import numpy.typing as npt
+
+
+class GridIndex:
+    """
+    Dynamic spatial index over the square service area, used for the unmatched rider and driver pools.
+
+    Items are bucketed into a uniform grid of cells by the position returned by `key` (read once, when the
+    item is added). Nearest-neighbour queries search rings of cells outwards from the query point and stop
+    once no unsearched cell can hold anything closer. Results match a linear scan with np.linalg.norm over
+    the items in insertion order: distances are the np.linalg.norm values, and equal distances are won by
+    the item that was added first, as min() over the old lists did.
+    """
+    # below this many items a plain scan is cheaper than walking the grid
+    scan_threshold = 32
+    # candidates this close to the best distance are re-measured with np.linalg.norm to settle near-ties
+    tie_tolerance = 1e-9
+
+    def __init__(self, key: Callable[[Any], npt.ArrayLike], area_size: float = 20, cells_per_side: int = 20) -> None:
+        self.key = key
+        self._cells_per_side = cells_per_side
+        self._cell_size = area_size / cells_per_side
+        self._cells: List[Dict[Any, Tuple[int, float, float, npt.ArrayLike]]] = [{} for _ in range(cells_per_side * cells_per_side)]
+        self._items: Dict[Any, int] = {}  # item -> cell number, kept in insertion order
+        self._counter = count()
+
+    def _cell_coordinates(self, x: float, y: float) -> Tuple[int, int]:
+        last = self._cells_per_side - 1
+        column = min(max(int(x / self._cell_size), 0), last)
+        row = min(max(int(y / self._cell_size), 0), last)
+        return column, row
+
+    def add(self, item: Any) -> None:
+        # keep a copy, as the key may be a view onto storage that is reused once the item has left
+        position = np.array(self.key(item), dtype=float)
+        x, y = float(position[0]), float(position[1])
+        column, row = self._cell_coordinates(x, y)
+        cell = row * self._cells_per_side + column
+        self._cells[cell][item] = (next(self._counter), x, y, position)
+        self._items[item] = cell
+
+    def remove(self, item: Any) -> None:
+        cell = self._items.pop(item)
+        del self._cells[cell][item]
+
+    def nearest(self, point: npt.ArrayLike, k: int = 1) -> List[Tuple[Any, float]]:
+        """
+        Return up to k (item, distance) pairs, closest first.
+        """
+        if not self._items:
+            return []
+        x, y = float(point[0]), float(point[1])
+        if len(self._items) <= self.scan_threshold:
+            candidates = []
+            for item, cell in self._items.items():
+                entry = self._cells[cell][item]
+                candidates.append((math.sqrt((entry[1] - x) ** 2 + (entry[2] - y) ** 2), item, entry))
+            return self._closest(candidates, point, k)
+
+        n = self._cells_per_side
+        home_column, home_row = self._cell_coordinates(x, y)
+        candidates = []
+        radius = 0
+        while radius < n:
+            for row in range(max(home_row - radius, 0), min(home_row + radius, n - 1) + 1):
+                # inside the ring only the two end columns are new; the top and bottom rows are new in full
+                on_edge = row == home_row - radius or row == home_row + radius
+                columns = range(home_column - radius, home_column + radius + 1) if on_edge else (home_column - radius, home_column + radius)
+                for column in columns:
+                    if column < 0 or column >= n:
+                        continue
+                    for item, entry in self._cells[row * n + column].items():
+                        candidates.append((math.sqrt((entry[1] - x) ** 2 + (entry[2] - y) ** 2), item, entry))
+            # every cell outside the rings searched so far is at least radius cells away from the point
+            if len(candidates) >= k:
+                kth_distance = nsmallest(k, (candidate[0] for candidate in candidates))[-1]
+                if kth_distance + self.tie_tolerance < radius * self._cell_size:
+                    break
+            radius += 1
+        return self._closest(candidates, point, k)
+
+    def _closest(self, candidates: list, point: npt.ArrayLike, k: int) -> List[Tuple[Any, float]]:
+        if not candidates:
+            return []
+        candidates.sort(key=lambda candidate: candidate[0])
+        cutoff = candidates[min(k, len(candidates)) - 1][0] + self.tie_tolerance
+        # re-measure everything that could be in the top k exactly as the linear scan did, then order by
+        # distance and insertion order
+        exact = [(np.linalg.norm(entry[3] - point), entry[0], item) for distance, item, entry in candidates if distance <= cutoff]
+        exact.sort(key=lambda candidate: (candidate[0], candidate[1]))
+        return [(item, distance) for distance, _, item in exact[:k]]
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import numpy.typing as npt
+from classes.event import DRIVER_JOIN, DRIVER_LEAVE
+
+
+class StateStatistics:
+    """
+    Time-weighted statistics of the system state, kept incrementally: every time the clock moves on, the
+    state held since the last event is added to its time integral, so time averages cost O(1) per event
+    and O(1) memory. The state is read from the simulation just before each event is handled.
+
+    With a snapshot_interval, the state is also recorded every snapshot_interval minutes into a
+    preallocated ring buffer of `capacity` rows, keeping the most recent part of the state time series.
+    """
+    variables: Tuple[str, ...] = ("waiting riders", "idle drivers", "busy drivers", "drivers on duty")
+
+    def __init__(self, snapshot_interval: Optional[float] = None, capacity: int = 8766) -> None:
+        self.start_time = 0.0
+        self.last_time = 0.0
+        self.integrals = [0.0] * len(self.variables)
+        self.snapshot_interval = snapshot_interval
+        self.next_snapshot = 0.0 if snapshot_interval else np.inf
+        # columns: time, then one per variable
+        self._snapshots = np.empty((capacity, len(self.variables) + 1)) if snapshot_interval else None
+        self._snapshot_count = 0
+
+    @staticmethod
+    def state(sim: Any) -> Tuple[int, int, int, int]:
+        # drivers on duty have joined and not yet left (busy drivers' leave events are counted at dropoff)
+        waiting = len(sim.unmatched_riders)
+        idle = len(sim.unmatched_drivers)
+        counts = sim.event_counts
+        on_duty = counts[DRIVER_JOIN] - counts[DRIVER_LEAVE]
+        return waiting, idle, on_duty - idle, on_duty
+
+    def advance(self, sim: Any, time: float) -> None:
+        # called with the time of the next event, before it is counted and handled; the state is read inline
+        # rather than through state() as this runs for every event
+        elapsed = time - self.last_time
+        if elapsed <= 0:
+            return
+        waiting = len(sim.unmatched_riders)
+        idle = len(sim.unmatched_drivers)
+        counts = sim.event_counts
+        on_duty = counts[DRIVER_JOIN] - counts[DRIVER_LEAVE]
+        integrals = self.integrals
+        integrals[0] += waiting * elapsed
+        integrals[1] += idle * elapsed
+        integrals[2] += (on_duty - idle) * elapsed
+        integrals[3] += on_duty * elapsed
+        while self.next_snapshot <= time:
+            row = self._snapshots[self._snapshot_count % len(self._snapshots)]
+            row[0] = self.next_snapshot
+            row[1:] = (waiting, idle, on_duty - idle, on_duty)
+            self._snapshot_count += 1
+            self.next_snapshot += self.snapshot_interval
+        self.last_time = time
+
+    def time_averages(self) -> Dict[str, float]:
+        duration = self.last_time - self.start_time
+        return {name: integral / duration if duration > 0 else np.nan for name, integral in zip(self.variables, self.integrals)}
+
+    @property
+    def utilisation(self) -> float:
+        # share of on-duty driver time spent busy
+        averages = self.time_averages()
+        return averages["busy drivers"] / averages["drivers on duty"] if averages["drivers on duty"] else np.nan
+
+    def snapshots(self) -> npt.NDArray:
+        # the recorded snapshots in time order (at most `capacity` of the most recent), one row per snapshot
+        if self._snapshots is None:
+            return np.empty((0, len(self.variables) + 1))
+        capacity = len(self._snapshots)
+        if self._snapshot_count <= capacity:
+            return self._snapshots[:self._snapshot_count].copy()
+        start = self._snapshot_count % capacity
+        return np.concatenate((self._snapshots[start:], self._snapshots[:start]))
+
+    def summary(self) -> Dict[str, List[Any]]:
+        # {variable: [None, None, time average, None, None]}, in the layout of Simulation.collect_KPIs
+        summary: Dict[str, List[Any]] = {}
+        for name, average in self.time_averages().items():
+            summary[f"Time-average {name}"] = [None, None, average, None, None]
+        summary["Driver utilisation (%)"] = [None, None, self.utilisation * 100, None, None]
+        return summary
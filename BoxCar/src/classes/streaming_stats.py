@@ -0,0 +1,162 @@
+from typing import Iterable, List
+import numpy as np
+import numpy.typing as npt
+
+
+class RunningStatistics:
+    """
+    Count, mean, variance, min and max in O(1) memory. Observations are added in batches using Chan et al.'s
+    pairwise update, which is also how two accumulators are merged.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: npt.ArrayLike) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        batch_mean = values.mean()
+        self._combine(values.size, batch_mean, np.sum((values - batch_mean) ** 2), values.min(), values.max())
+
+    def merge(self, other: "RunningStatistics") -> None:
+        if other.count:
+            self._combine(other.count, other.mean, other._m2, other.min, other.max)
+
+    def _combine(self, count: int, mean: float, m2: float, minimum: float, maximum: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def variance(self) -> float:
+        # sample variance
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (Dunning's merging t-digest). Observations are kept as weighted centroids,
+    small near the tails and larger near the median, so the number of centroids stays around the
+    compression parameter however many observations are added.
+    """
+    def __init__(self, compression: float = 200) -> None:
+        self.compression = compression
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return self._weights.sum()
+
+    def update(self, values: npt.ArrayLike) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate((self._means, values)), np.concatenate((self._weights, np.ones(values.size))))
+
+    def merge(self, other: "TDigest") -> None:
+        if other._weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate((self._means, other._means)), np.concatenate((self._weights, other._weights)))
+
+    def _compress(self, means: npt.NDArray, weights: npt.NDArray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # position of each point on the k1 scale k(q) = compression / (2 pi) * asin(2q - 1); points whose
+        # midpoints fall within the same unit of k are merged into one centroid
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(cluster, prepend=-1))
+        merged_weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / merged_weights
+        self._weights = merged_weights
+
+    def quantile(self, q: float) -> float:
+        if not self._weights.size:
+            return np.nan
+        total = self._weights.sum()
+        centres = np.cumsum(self._weights) - self._weights / 2
+        return float(np.interp(q * total, np.concatenate(([0], centres, [total])), np.concatenate(([self.min], self._means, [self.max]))))
+
+
+class StreamingSummary:
+    """
+    Drop-in replacement for the KPI lists in Simulation when raw output is not needed. append() only
+    buffers the value; every `batch_size` values the buffer is folded into a RunningStatistics and a
+    TDigest, so memory stays flat however long the run is.
+    """
+    batch_size = 1024
+
+    def __init__(self, compression: float = 200) -> None:
+        self.statistics = RunningStatistics()
+        self.digest = TDigest(compression)
+        self._buffer: List[float] = []
+
+    def append(self, value: float) -> None:
+        self._buffer.append(value)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.append(value)
+
+    def _flush(self) -> None:
+        if self._buffer:
+            values = np.array(self._buffer, dtype=float)
+            self._buffer = []
+            self.statistics.update(values)
+            self.digest.update(values)
+
+    def merge(self, other: "StreamingSummary") -> None:
+        self._flush()
+        other._flush()
+        self.statistics.merge(other.statistics)
+        self.digest.merge(other.digest)
+
+    def __len__(self) -> int:
+        return self.statistics.count + len(self._buffer)
+
+    @property
+    def mean(self) -> float:
+        self._flush()
+        return self.statistics.mean
+
+    @property
+    def total(self) -> float:
+        # sum of all observations
+        return self.statistics.mean * self.statistics.count + sum(self._buffer)
+
+    @property
+    def variance(self) -> float:
+        self._flush()
+        return self.statistics.variance
+
+    @property
+    def min(self) -> float:
+        self._flush()
+        return self.statistics.min
+
+    @property
+    def max(self) -> float:
+        self._flush()
+        return self.statistics.max
+
+    def quantile(self, q: float) -> float:
+        self._flush()
+        return self.digest.quantile(q)
@@ -0,0 +1,38 @@
+from typing import Any, Callable, List, Optional
+from heapq import heappush, heappop
+import numpy.typing as npt
+from classes.spatial_index import GridIndex
+
+
+class WaitingPool(GridIndex):
+    """
+    Pool of waiting riders: the spatial index of GridIndex plus an index of patience deadlines.
+
+    Instead of a "rider abandon" calendar event per waiting rider, each rider's deadline goes into a heap
+    ordered like the calendar, by (time, seq), with seq taken from the calendar's own counter at the
+    moment the rider is added, so expirations interleave with calendar events exactly as abandon events
+    did. Riders removed from the pool (matched) leave their heap entry behind; it is skipped when it
+    reaches the front.
+    """
+    def __init__(self, key: Callable[[Any], npt.ArrayLike], deadline: Callable[[Any], float], sequence: Callable[[], int], **kwargs) -> None:
+        super().__init__(key, **kwargs)
+        self.deadline = deadline
+        self.sequence = sequence
+        self._deadlines: List[list] = []
+
+    def add(self, item: Any) -> None:
+        super().add(item)
+        heappush(self._deadlines, [self.deadline(item), self.sequence(), item])
+
+    def next_deadline(self) -> Optional[list]:
+        # [time, seq, item] of the earliest deadline of an item still waiting, or None
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][2] not in self:
+            heappop(deadlines)
+        return deadlines[0] if deadlines else None
+
+    def pop_deadline(self) -> list:
+        # removes the deadline from the index; the item itself stays in the pool until it is removed
+        entry = self.next_deadline()
+        heappop(self._deadlines)
+        return entry
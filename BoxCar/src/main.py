@@ -1,19 +1,14 @@
-
-from classes.simulation import Simulation
-# from classes.generate_random import Distributions
-from classes.generate_random_alternative import Distributions
-from classes.event_handlers import EventHandlers
+from modules.factory import create_simulation
+from classes.output_writers import create_output_writer
+from classes.state_statistics import StateStatistics
+from classes.simulation import OUTPUT_DIR
 
 
 
 def main():
-    handlers = EventHandlers(None)
-    distributions = Distributions(None)
-    
-    sim = Simulation(handlers, distributions)
-    
-    handlers.simulation = sim
-    distributions.simulation = sim
+    # KPIs are summarised on the fly and the raw trip and driver tables are written as columnar files;
+    # time-averaged queue lengths and driver utilisation are reported alongside them
+    sim = create_simulation(record_raw_output=False, output_writer=create_output_writer(OUTPUT_DIR), state_statistics=StateStatistics())
     
     sim.run()
     
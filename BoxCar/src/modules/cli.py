@@ -0,0 +1,69 @@
+from typing import List, Optional
+import argparse
+import importlib
+import json
+import os
+import sys
+import numpy as np
+from modules.factory import create_simulation
+from classes.output_writers import WRITERS, create_output_writer
+from classes.state_statistics import StateStatistics
+from classes.simulation import OUTPUT_DIR
+
+# Command line entry point, python -m boxcar <command> (from BoxCar/src). `run` runs one simulation; the
+# other commands hand their arguments to the main() of the existing tools. Plotting and reporting packages
+# (tabulate, scipy, matplotlib) are only imported by the code that uses them, so a headless run starts
+# with little more than numpy loaded.
+
+# command -> module whose main() it runs
+TOOLS = {"replications": "modules.replications", "sweep": "modules.sweep", "replay": "modules.replay",
+         "input-modelling": "modules.input_modelling"}
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.seed is None:
+        # the seed is printed so the run can be repeated
+        args.seed = np.random.SeedSequence().entropy
+        print(f"No seed given, using {args.seed}")
+    dispatcher = None
+    if args.batch_window is not None:
+        # imported here as it needs scipy
+        from classes.batch_dispatcher import BatchDispatcher
+        dispatcher = BatchDispatcher(args.batch_window)
+    distribution_parameters = None if args.input_spec is None else {"spec": args.input_spec}
+    sim = create_simulation(args.seed, args.length, distribution_parameters, record_raw_output=False, state_statistics=StateStatistics(),
+                            output_writer=create_output_writer(args.output_dir, args.format),
+                            checkpoint_path=os.path.join(args.output_dir, "checkpoint.pkl"), dispatcher=dispatcher)
+    if not args.headless:
+        sim.run()
+        return
+    # headless: no progress bar and no tables, the KPIs go to a JSON file next to the output tables
+    sim.show_progress = False
+    sim.run(report=False)
+    kpis = {table: {metric: [None if value is None else float(value) for value in values] for metric, values in metrics.items()}
+            for table, metrics in sim.collect_KPIs().items()}
+    with open(os.path.join(args.output_dir, "kpis.json"), "w") as file:
+        json.dump({"seed": args.seed, "length": args.length, "kpis": kpis, "event_counters": sim.event_counters}, file, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOLS:
+        sys.argv = [f"boxcar {argv[0]}", *argv[1:]]
+        importlib.import_module(TOOLS[argv[0]]).main()
+        return
+
+    parser = argparse.ArgumentParser(prog="boxcar", description="BoxCar ride-hailing simulation.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run one simulation")
+    run_parser.add_argument("--length", type=float, default=60 * 8766, help="simulation length (minutes)")
+    run_parser.add_argument("--seed", type=int, default=None)
+    run_parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory of the trip and driver tables (default: BoxCar/output)")
+    run_parser.add_argument("--format", default="auto", choices=["auto", *WRITERS], help="format of the output tables")
+    run_parser.add_argument("--batch-window", type=float, default=None, metavar="MINUTES", help="match riders and drivers in batches every MINUTES instead of greedily")
+    run_parser.add_argument("--input-spec", default=None, metavar="SPEC", help="fitted input distributions written by python -m boxcar input-modelling")
+    run_parser.add_argument("--headless", action="store_true", help="no progress bar or KPI tables; KPIs are written to kpis.json in the output directory")
+    for command, module in TOOLS.items():
+        commands.add_parser(command, help=f"see python -m boxcar {command} --help ({module})")
+    args = parser.parse_args(argv)
+    run(args)
@@ -0,0 +1,18 @@
+from typing import Any, Dict, Optional
+from classes.simulation import Simulation
+from classes.generate_random_alternative import Distributions
+from classes.event_handlers import EventHandlers
+
+
+def create_simulation(seed: Any = None, simulation_length: float = 60 * 8766, distribution_parameters: Optional[Dict[str, float]] = None, **options) -> Simulation:
+    # wire the handlers and distributions to a new simulation, as main() does;
+    # distribution_parameters override the Distributions rates (e.g. driver_arrival_rate), and
+    # options are passed on to Simulation (e.g. event_calendar)
+    handlers = EventHandlers(None)
+    distributions = Distributions(None, seed=seed, **(distribution_parameters or {}))
+    
+    sim = Simulation(handlers, distributions, simulation_length=simulation_length, **options)
+    
+    handlers.simulation = sim
+    distributions.simulation = sim
+    return sim
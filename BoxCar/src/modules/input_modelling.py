@@ -0,0 +1,167 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+import numpy.typing as npt
+from classes.simulation import OUTPUT_DIR
+
+# Input modelling: fit candidate distribution families to columns of observed data, test each fit with the
+# chi-square goodness-of-fit test of the input analysis notebook, and write the best fits as a distribution
+# spec that Distributions loads directly (Distributions(sim, seed, spec="fitted.json")).
+#
+# Every (column, family) fit runs in a process pool, and its result is cached on disk under a hash of the
+# column's values, the family and the test settings, so refitting after adding a column or a family only
+# computes the new fits.
+
+FAMILIES = ("norm", "expon", "weibull_min", "uniform", "lognorm", "skewnorm")
+# Distributions rates that can be estimated from a column of inter-arrival times or patience times
+RATES = ("rider_arrival_rate", "driver_arrival_rate", "rider_patience_rate")
+
+
+def chi_square_test(data: npt.ArrayLike, cdf: Callable[[npt.NDArray], npt.NDArray], fitted_parameters: int = 0,
+                    alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Chi-square goodness-of-fit test with k = n // 5 equal-width bins [a_i, a_i+1) between the smallest and
+    largest observation, as in Distribution Analysis/Input Analysis. Bins are counted with one searchsorted
+    over the sorted data instead of a mask per bin. The degrees of freedom are k - 1 - fitted_parameters.
+    """
+    from scipy import stats
+    data = np.sort(np.asarray(data, dtype=float))
+    n = len(data)
+    k = max(n // 5, 2)
+    bin_edges = np.linspace(data[0], data[-1], k + 1)
+    o = np.diff(np.searchsorted(data, bin_edges, side="left")).astype(float)
+    p = np.diff(cdf(bin_edges))
+    e = n * p
+    with np.errstate(divide="ignore", invalid="ignore"):
+        test_statistic = float(np.sum((o - e) ** 2 / e))
+    dof = max(k - 1 - fitted_parameters, 1)
+    return {"D": test_statistic, "chi_square": float(stats.chi2.ppf(1 - alpha, dof)), "k": k, "dof": dof,
+            "p_value": float(stats.chi2.sf(test_statistic, dof)), "p": p, "E": e, "O": o}
+
+
+def fit_family(data: npt.NDArray, family: str, alpha: float = 0.05) -> Dict[str, Any]:
+    # maximum likelihood fit of one scipy.stats family, with its chi-square test and AIC; runs in a worker process
+    from scipy import stats
+    distribution = getattr(stats, family)
+    with np.errstate(all="ignore"):
+        values = distribution.fit(data)
+    names = (distribution.shapes.split(", ") if distribution.shapes else []) + ["loc", "scale"]
+    params = {name: float(value) for name, value in zip(names, values)}
+    test = chi_square_test(data, lambda x: distribution.cdf(x, **params), len(params), alpha)
+    log_likelihood = float(np.sum(distribution.logpdf(data, **params)))
+    return {"family": family, "params": params, "D": test["D"], "chi_square": test["chi_square"], "dof": test["dof"],
+            "p_value": test["p_value"], "rejected": bool(test["D"] > test["chi_square"]),
+            "aic": 2 * len(params) - 2 * log_likelihood}
+
+
+def cache_key(data: npt.NDArray, family: str, alpha: float) -> str:
+    digest = hashlib.sha256(np.ascontiguousarray(data, dtype="<f8").tobytes())
+    digest.update(json.dumps({"family": family, "alpha": alpha}).encode())
+    return digest.hexdigest()
+
+
+def fit_columns(columns: Dict[str, npt.ArrayLike], families: Sequence[str] = FAMILIES, alpha: float = 0.05,
+                processes: Optional[int] = None, cache_dir: str = os.path.join(OUTPUT_DIR, "fit_cache")) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fit every family to every column and return, per column, the fits ordered from best to worst by AIC.
+    Missing values are dropped. Cached fits are loaded instead of recomputed.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data = {}
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=float)
+        data[name] = values[~np.isnan(values)]
+    cells = [(name, family) for name in data for family in families]
+    paths = {cell: os.path.join(cache_dir, cache_key(data[cell[0]], cell[1], alpha) + ".json") for cell in cells}
+    fits: Dict[tuple, Dict[str, Any]] = {}
+    missing = []
+    for cell in cells:
+        if os.path.exists(paths[cell]):
+            with open(paths[cell]) as file:
+                fits[cell] = json.load(file)
+        else:
+            missing.append(cell)
+    print(f"{len(cells) - len(missing)} of {len(cells)} fits cached, fitting {len(missing)}")
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {pool.submit(fit_family, data[name], family, alpha): (name, family) for name, family in missing}
+            for future in as_completed(futures):
+                cell = futures[future]
+                fits[cell] = future.result()
+                with open(paths[cell] + ".tmp", "w") as file:
+                    json.dump(fits[cell], file)
+                os.replace(paths[cell] + ".tmp", paths[cell])
+    return {name: sorted((fits[name, family] for family in families), key=lambda fit: fit["aic"]) for name in data}
+
+
+def build_spec(fits: Dict[str, List[Dict[str, Any]]], quantities: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Distribution spec of the best fit of each column, for Distributions. `quantities` maps each column to
+    the random quantity it models: a stream name such as "driver available length", "<stream>.x" /
+    "<stream>.y" for one coordinate of a coordinate stream such as "rider origin coordinates", or a rate
+    such as "rider_arrival_rate" for a column of inter-arrival times (in minutes), which is set to one over
+    their mean under the exponential fit.
+    """
+    samplers: Dict[str, Any] = {}
+    parameters: Dict[str, float] = {}
+    for column, quantity in quantities.items():
+        if quantity in RATES:
+            exponential = next(fit for fit in fits[column] if fit["family"] == "expon")
+            parameters[quantity] = 1 / (exponential["params"]["loc"] + exponential["params"]["scale"])
+            continue
+        best = fits[column][0]
+        entry = {"family": best["family"], "params": best["params"], "column": column, "p_value": best["p_value"]}
+        stream, _, axis = quantity.partition(".")
+        if axis:
+            samplers.setdefault(stream, {})[axis] = entry
+        else:
+            samplers[stream] = entry
+    return {"parameters": parameters, "samplers": samplers}
+
+
+def read_columns(path: str) -> Dict[str, npt.NDArray]:
+    # numeric columns of a CSV or Excel file; imported here as only this needs pandas
+    import pandas as pd
+    frame = pd.read_csv(path) if path.endswith(".csv") else pd.read_excel(path)
+    return {str(name): column.to_numpy(dtype=float) for name, column in frame.select_dtypes("number").items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit input distributions to data and write a distribution spec for Distributions.")
+    parser.add_argument("data", help="CSV or Excel file with one column of observations per random quantity")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUMN=QUANTITY",
+                        help='column and the quantity it models, e.g. "Origin X=rider origin coordinates.x"')
+    parser.add_argument("--family", action="append", help=f"candidate scipy.stats families (default: {', '.join(FAMILIES)})")
+    parser.add_argument("--alpha", type=float, default=0.05, help="significance level of the chi-square tests")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cache-dir", default=os.path.join(OUTPUT_DIR, "fit_cache"))
+    parser.add_argument("--output", default=None, help="spec file to write (JSON)")
+    args = parser.parse_args()
+
+    quantities = dict(item.split("=", 1) for item in args.map)
+    columns = read_columns(args.data)
+    if quantities:
+        columns = {name: columns[name] for name in quantities}
+    families = args.family or FAMILIES
+    if any(quantity in RATES for quantity in quantities.values()) and "expon" not in families:
+        families = [*families, "expon"]
+    fits = fit_columns(columns, families, args.alpha, args.processes, args.cache_dir)
+    for column, column_fits in fits.items():
+        print(f"\n{column}")
+        for fit in column_fits:
+            params = ", ".join(f"{name}={value:.4g}" for name, value in fit["params"].items())
+            print(f"  {fit['family']:<12}AIC {fit['aic']:>12.1f}   D {fit['D']:>10.2f} (critical {fit['chi_square']:.2f})"
+                  f"{'  rejected' if fit['rejected'] else ''}   {params}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(build_spec(fits, quantities), file, indent=2)
+        print(f"\nSpec written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
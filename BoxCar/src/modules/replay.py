@@ -0,0 +1,166 @@
+from typing import Any, Dict, Optional
+from collections import deque
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+from classes.event import RIDER_JOIN, RIDER_ABANDON, DRIVER_JOIN, DRIVER_LEAVE, RIDE_ACCEPT, RIDE_PICKUP, RIDE_COMPLETION, TERMINATION
+from classes.event_trace import read_trace
+
+# Offline renderer for event traces written by classes/event_trace.EventTraceRecorder. It rebuilds the
+# same picture the simulation used to draw live: waiting riders in red, abandoned riders in light grey,
+# idle drivers in blue, drivers on a trip in light blue with pink lines to the pickup and destination,
+# and drivers that have left (or are about to) in black. Only the last 10 abandoned riders and departed
+# drivers are kept on screen.
+
+
+class ReplayState:
+    def __init__(self) -> None:
+        self.riders: Dict[int, Dict[str, Any]] = {}   # rider id -> origin, destination
+        self.waiting: Dict[int, np.ndarray] = {}       # rider id -> origin, for riders without a driver
+        self.drivers: Dict[int, Dict[str, Any]] = {}   # driver id -> position, colour, trip
+        self.abandoned = deque(maxlen=10)
+        self.departed = deque(maxlen=10)
+        self.terminated = False
+
+    def apply(self, record: np.void) -> None:
+        kind, rider_id, driver_id = int(record["kind"]), int(record["rider"]), int(record["driver"])
+        if kind == RIDER_JOIN:
+            origin = np.array([record["x0"], record["y0"]])
+            self.riders[rider_id] = {"origin": origin, "destination": np.array([record["x1"], record["y1"]])}
+            self.waiting[rider_id] = origin
+        elif kind == RIDER_ABANDON:
+            if self.waiting.pop(rider_id, None) is not None:
+                self.abandoned.append(self.riders.pop(rider_id)["origin"])
+        elif kind == DRIVER_JOIN:
+            self.drivers[driver_id] = {"position": np.array([record["x0"], record["y0"]]), "colour": "blue", "trip": None, "leaving": False}
+        elif kind == DRIVER_LEAVE:
+            driver = self.drivers.get(driver_id)
+            if driver is None:
+                return
+            if driver["trip"] is not None and not driver["leaving"]:
+                # still has a passenger: they leave after the dropoff
+                driver["leaving"] = True
+                driver["colour"] = "black"
+            else:
+                self.departed.append(self.drivers.pop(driver_id)["position"])
+        elif kind == RIDE_ACCEPT:
+            self.waiting.pop(rider_id, None)
+            driver = self.drivers[driver_id]
+            driver["trip"] = {"rider": self.riders[rider_id], "picked_up": False}
+            if not driver["leaving"]:
+                driver["colour"] = "lightblue"
+        elif kind == RIDE_PICKUP:
+            driver = self.drivers[driver_id]
+            driver["position"] = self.riders[rider_id]["origin"]
+            driver["trip"]["picked_up"] = True
+        elif kind == RIDE_COMPLETION:
+            driver = self.drivers[driver_id]
+            driver["position"] = self.riders.pop(rider_id)["destination"]
+            driver["trip"] = None
+            if not driver["leaving"]:
+                driver["colour"] = "blue"
+        elif kind == TERMINATION:
+            self.terminated = True
+
+
+class Replay:
+    """
+    Animates a trace at `speed` simulated minutes per second of animation.
+    """
+    def __init__(self, path: str, speed: float = 60, fps: int = 20) -> None:
+        self.records = read_trace(path)
+        self.speed = speed
+        self.fps = fps
+        self.state = ReplayState()
+        self._next_record = 0
+
+        self.fig, self.ax = plt.subplots()
+        self.ax.set_xlim(0, 20)
+        self.ax.set_ylim(0, 20)
+        self.solid_lines = LineCollection([], colors="pink", linewidths=0.5, zorder=1)
+        self.dotted_lines = LineCollection([], colors="pink", linewidths=0.5, linestyles="dotted", zorder=1)
+        self.ax.add_collection(self.solid_lines)
+        self.ax.add_collection(self.dotted_lines)
+        empty = np.empty((0, 2))
+        self.abandoned = self.ax.scatter(empty[:, 0], empty[:, 1], c="lightgray")
+        self.waiting = self.ax.scatter(empty[:, 0], empty[:, 1], c="r")
+        self.departed = self.ax.scatter(empty[:, 0], empty[:, 1], c="k")
+        self.pickups = self.ax.scatter(empty[:, 0], empty[:, 1], c="pink", zorder=2)
+        self.destinations = self.ax.scatter(empty[:, 0], empty[:, 1], c="pink", marker="x", zorder=2)
+        self.drivers = self.ax.scatter(empty[:, 0], empty[:, 1], zorder=2)
+        self.title = self.ax.set_title("")
+
+    def frame_count(self) -> int:
+        if not len(self.records):
+            return 0
+        return int(np.ceil(self.records["time"][-1] / self.speed * self.fps)) + 1
+
+    def advance(self, until: float) -> None:
+        records = self.records
+        while self._next_record < len(records) and records[self._next_record]["time"] <= until:
+            self.state.apply(records[self._next_record])
+            self._next_record += 1
+
+    def draw(self, frame: int) -> list:
+        current_time = frame * self.speed / self.fps
+        self.advance(current_time)
+        state = self.state
+
+        def offsets(points):
+            return np.array(list(points)).reshape(-1, 2)
+
+        self.waiting.set_offsets(offsets(state.waiting.values()))
+        self.abandoned.set_offsets(offsets(state.abandoned))
+        self.departed.set_offsets(offsets(state.departed))
+
+        drivers = list(state.drivers.values())
+        self.drivers.set_offsets(offsets(driver["position"] for driver in drivers))
+        self.drivers.set_color([driver["colour"] for driver in drivers])
+
+        solid, dotted, pickups, destinations = [], [], [], []
+        for driver in drivers:
+            trip = driver["trip"]
+            if trip is None:
+                continue
+            rider = trip["rider"]
+            destinations.append(rider["destination"])
+            if trip["picked_up"]:
+                solid.append([rider["origin"], rider["destination"]])
+            else:
+                pickups.append(rider["origin"])
+                solid.append([driver["position"], rider["origin"]])
+                dotted.append([rider["origin"], rider["destination"]])
+        self.solid_lines.set_segments(solid)
+        self.dotted_lines.set_segments(dotted)
+        self.pickups.set_offsets(offsets(pickups))
+        self.destinations.set_offsets(offsets(destinations))
+
+        if state.terminated:
+            for spine in self.ax.spines.values():
+                spine.set_color("red")
+        self.title.set_text(f"t = {current_time:.0f} min")
+        return [self.solid_lines, self.dotted_lines, self.abandoned, self.waiting, self.departed, self.pickups, self.destinations, self.drivers, self.title]
+
+    def animate(self, save_path: Optional[str] = None) -> FuncAnimation:
+        animation = FuncAnimation(self.fig, self.draw, frames=self.frame_count(), interval=1000 / self.fps, repeat=False)
+        if save_path:
+            animation.save(save_path, fps=self.fps)
+        else:
+            plt.show()
+        return animation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a BoxCar event trace as an animation.")
+    parser.add_argument("trace", help="trace file written by EventTraceRecorder")
+    parser.add_argument("--speed", type=float, default=60, help="simulated minutes per second of animation")
+    parser.add_argument("--fps", type=int, default=20)
+    parser.add_argument("--save", default=None, help="write the animation to this file (e.g. .mp4 or .gif) instead of showing it")
+    args = parser.parse_args()
+    Replay(args.trace, args.speed, args.fps).animate(args.save)
+
+
+if __name__ == "__main__":
+    main()
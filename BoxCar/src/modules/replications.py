@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import numpy as np
+from modules.factory import create_simulation
+
+# Independent replications: each replication is a full Simulation run with its own random streams, spawned
+# from one SeedSequence, and the KPI summaries from Simulation.collect_KPIs are combined across
+# replications into means with t-based confidence intervals.
+#
+# Two variance reduction techniques cut the number of replications needed for a given interval width:
+#   antithetic pairs  - each seed is run twice, the second time with every random input mirrored
+#                       (Distributions(antithetic=True)), and the pair's average counts as one observation
+#   control variates  - each KPI is regressed on the realised means of random inputs whose expectations are
+#                       known (Distributions.input_controls), and the fitted intercept is the estimate
+# Common random numbers across scenarios come from replication i using the same seed in every scenario
+# (see modules/sweep.py).
+
+# inputs used as control variates by default; each control costs a degree of freedom
+CONTROLS = ("rider arrivals per minute", "driver arrivals per minute", "rider patience")
+
+
+def run_replication(seed: np.random.SeedSequence, simulation_length: float, antithetic: bool = False) -> Dict[str, Any]:
+    # only the summaries are needed, so keep KPIs as streaming accumulators rather than lists
+    sim = create_simulation(seed, simulation_length, {"antithetic": antithetic}, record_raw_output=False)
+    sim.show_progress = False
+    sim.run(report=False)
+    return {"kpis": sim.collect_KPIs(), "controls": sim.input_distributions.input_controls()}
+
+
+def run_replications(replications: int, seed: Any = None, simulation_length: float = 60 * 8766, processes: Optional[int] = None, antithetic: bool = False) -> List[Dict[str, Any]]:
+    """
+    Run independent replications across a process pool (one worker per core by default). With antithetic,
+    `replications` (even, at least 2) runs are made as replications / 2 antithetic pairs and one averaged
+    result is returned per pair.
+    """
+    if not antithetic:
+        seeds = np.random.SeedSequence(seed).spawn(replications)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return list(pool.map(run_replication, seeds, [simulation_length] * replications))
+    if replications < 2 or replications % 2:
+        raise ValueError(f"antithetic replications are run in pairs, so need an even number of at least 2 (got {replications})")
+    pairs = replications // 2
+    seeds = np.random.SeedSequence(seed).spawn(pairs)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(run_replication, seeds * 2, [simulation_length] * 2 * pairs, [False] * pairs + [True] * pairs))
+    return [average_results(result, twin) for result, twin in zip(results[:pairs], results[pairs:])]
+
+
+def average_results(result: Dict[str, Any], twin: Dict[str, Any]) -> Dict[str, Any]:
+    # the average of an antithetic pair, KPI by KPI and control by control
+    def average(a, b):
+        return None if a is None or b is None else (a + b) / 2
+    kpis = {table: {metric: [average(a, b) for a, b in zip(values, twin["kpis"][table][metric])] for metric, values in metrics.items()}
+            for table, metrics in result["kpis"].items()}
+    controls = {name: (average(realised, twin["controls"][name][0]), expected) for name, (realised, expected) in result["controls"].items()}
+    return {"kpis": kpis, "controls": controls}
+
+
+def summarise_replications(results: List[Dict[str, Any]], confidence: float = 0.95, controls: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Combine per-replication KPIs into {table: {metric: [(mean, half width), ...]}} over the five statistics.
+    With controls, the estimates are control-variate estimates using those inputs (see CONTROLS).
+    """
+    if controls:
+        realised = np.array([[result["controls"][name][0] for name in controls] for result in results], dtype=float)
+        expected = np.array([results[0]["controls"][name][1] for name in controls], dtype=float)
+    summary: Dict[str, Dict[str, List[Any]]] = {}
+    for table, metrics in results[0]["kpis"].items():
+        summary[table] = {}
+        for metric, values in metrics.items():
+            summary[table][metric] = []
+            for i, value in enumerate(values):
+                samples = [result["kpis"][table][metric][i] for result in results]
+                if None in samples:
+                    summary[table][metric].append(None)
+                    continue
+                samples = np.array(samples, dtype=float)
+                if controls:
+                    summary[table][metric].append(control_variate_interval(samples, realised, expected, confidence))
+                else:
+                    summary[table][metric].append(confidence_interval(samples, confidence))
+    return summary
+
+
+def confidence_interval(samples: np.ndarray, confidence: float = 0.95) -> tuple:
+    # returns (mean, half width) of the t-based confidence interval for the mean of the samples
+    n = len(samples)
+    mean = np.mean(samples)
+    if n < 2:
+        return mean, np.inf
+    from scipy import stats
+    half_width = stats.t.ppf((1 + confidence) / 2, n - 1) * np.std(samples, ddof=1) / np.sqrt(n)
+    return mean, half_width
+
+
+def control_variate_interval(samples: np.ndarray, controls: np.ndarray, expected: np.ndarray, confidence: float = 0.95) -> tuple:
+    """
+    (estimate, half width) of the control-variate estimator: the samples are regressed on the deviations
+    of the controls (one column per control) from their known expectations, and the intercept is the
+    estimate. Falls back to the plain interval when there are too few samples to fit the controls.
+    """
+    n, q = controls.shape
+    if n < q + 3:
+        return confidence_interval(samples, confidence)
+    design = np.column_stack((np.ones(n), controls - expected))
+    coefficients, *_ = np.linalg.lstsq(design, samples, rcond=None)
+    residuals = samples - design @ coefficients
+    degrees_of_freedom = n - q - 1
+    variance = residuals @ residuals / degrees_of_freedom * np.linalg.pinv(design.T @ design)[0, 0]
+    from scipy import stats
+    return coefficients[0], stats.t.ppf((1 + confidence) / 2, degrees_of_freedom) * np.sqrt(variance)
+
+
+def print_replications_table(summary: Dict[str, Dict[str, List[Any]]], replications: int, confidence: float = 0.95) -> None:
+    from tabulate import tabulate
+    headers = ["Metric", "Min", "Q1", "Mean", "Q3", "Max"]
+    for table, metrics in summary.items():
+        data = [[metric, *map(lambda x: "-" if x is None else f"{x[0]:.2f} ± {x[1]:.2f}", values)] for metric, values in metrics.items()]
+        print(f"\n{table} Key Performance Indicators (KPIs), mean ± {confidence * 100:.0f}% CI half width over {replications} replications:")
+        print(tabulate(data, headers=headers, tablefmt="grid"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run independent replications of the BoxCar simulation.")
+    parser.add_argument("-n", "--replications", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--length", type=float, default=60 * 8766, help="simulation length (minutes)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--antithetic", action="store_true", help="run the replications as antithetic pairs")
+    parser.add_argument("--control-variates", action="store_true", help=f"use control variates ({', '.join(CONTROLS)})")
+    args = parser.parse_args()
+    if args.antithetic and (args.replications < 2 or args.replications % 2):
+        parser.error("--antithetic runs the replications in pairs, so needs an even number of at least 2")
+
+    results = run_replications(args.replications, args.seed, args.length, args.processes, args.antithetic)
+    summary = summarise_replications(results, args.confidence, CONTROLS if args.control_variates else None)
+    print_replications_table(summary, len(results), args.confidence)
+
+
+if __name__ == "__main__":
+    main()
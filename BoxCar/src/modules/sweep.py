@@ -0,0 +1,217 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+from modules.factory import create_simulation
+from modules.replications import confidence_interval
+from classes.simulation import OUTPUT_DIR
+from classes.driver import Driver
+from classes.generate_random_alternative import Distributions
+
+# Parameter sweeps: every scenario (one set of parameter values) is run for a number of replications
+# across a process pool, and each (scenario, replication) result is cached on disk under a hash of the
+# parameters, the seed, the simulation length and the source code. Re-running a sweep that overlaps an
+# earlier one only computes the missing cells, and any change to the code invalidates the whole cache.
+#
+# Replication i of every scenario uses the same random streams (common random numbers), so differences
+# between scenarios are not swamped by sampling noise.
+
+# sweepable parameters and the class they live on; Driver constants are set on the class in the worker
+# process, Distributions rates (per minute) are passed as distribution parameters
+PARAMETERS: Dict[str, type] = {
+    "initial_fare": Driver,
+    "earnings_per_mile": Driver,
+    "costs_per_mile": Driver,
+    "rider_arrival_rate": Distributions,
+    "driver_arrival_rate": Distributions,
+    "rider_patience_rate": Distributions,
+}
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def grid_design(levels: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    # every combination of the given levels
+    names = list(levels)
+    return [dict(zip(names, values)) for values in itertools.product(*(levels[name] for name in names))]
+
+
+def latin_hypercube_design(bounds: Dict[str, Tuple[float, float]], samples: int, seed: Any = None) -> List[Dict[str, float]]:
+    # `samples` scenarios spread over the box given by {parameter: (low, high)}, one per row and column stratum
+    from scipy.stats import qmc
+    names = list(bounds)
+    unit = qmc.LatinHypercube(d=len(names), seed=seed).random(samples)
+    points = qmc.scale(unit, [bounds[name][0] for name in names], [bounds[name][1] for name in names])
+    return [dict(zip(names, map(float, point))) for point in points]
+
+
+def code_version() -> str:
+    # hash of every source file, so results computed by a different version of the model are not reused
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(SOURCE_DIR, "**", "*.py"), recursive=True)):
+        digest.update(os.path.relpath(path, SOURCE_DIR).encode())
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def cache_key(parameters: Dict[str, float], seed: int, replication: int, simulation_length: float, version: str) -> str:
+    key = {"parameters": sorted(parameters.items()), "seed": seed, "replication": replication, "length": simulation_length, "version": version}
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def run_scenario(parameters: Dict[str, float], seed: int, replication: int, simulation_length: float) -> Dict[str, Any]:
+    """
+    One replication of one scenario. Runs in a worker process: Driver constants are changed for the run and
+    restored afterwards, as the worker goes on to run other scenarios.
+    """
+    for name in parameters:
+        if name not in PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter: {name}")
+    driver_parameters = {name: value for name, value in parameters.items() if PARAMETERS[name] is Driver}
+    distribution_parameters = {name: value for name, value in parameters.items() if PARAMETERS[name] is Distributions}
+    defaults = {name: getattr(Driver, name) for name in driver_parameters}
+    try:
+        for name, value in driver_parameters.items():
+            setattr(Driver, name, value)
+        # replication i gets the i-th stream spawned from the sweep seed, in every scenario
+        replication_seed = np.random.SeedSequence(seed, spawn_key=(replication,))
+        sim = create_simulation(replication_seed, simulation_length, distribution_parameters, record_raw_output=False)
+        sim.show_progress = False
+        sim.run(report=False)
+    finally:
+        for name, value in defaults.items():
+            setattr(Driver, name, value)
+    kpis = {table: {metric: [None if value is None else float(value) for value in values] for metric, values in metrics.items()}
+            for table, metrics in sim.collect_KPIs().items()}
+    return {"parameters": parameters, "replication": replication, "kpis": kpis, "event_counters": dict(sim.event_counters)}
+
+
+def run_sweep(design: List[Dict[str, float]], replications: int, seed: Optional[int] = None, simulation_length: float = 60 * 8766,
+              processes: Optional[int] = None, cache_dir: str = os.path.join(OUTPUT_DIR, "sweep_cache")) -> List[Dict[str, Any]]:
+    """
+    Run every scenario in the design for the given number of replications and return one result per
+    (scenario, replication), in design order. Cached results are loaded instead of rerun.
+    """
+    if seed is None:
+        # results are only reusable if the seed is known
+        seed = np.random.SeedSequence().entropy
+        print(f"No seed given, using {seed}")
+    os.makedirs(cache_dir, exist_ok=True)
+    version = code_version()
+
+    cells = [(parameters, replication) for parameters in design for replication in range(replications)]
+    paths = [os.path.join(cache_dir, cache_key(parameters, seed, replication, simulation_length, version) + ".json") for parameters, replication in cells]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(cells)
+    missing = []
+    for i, path in enumerate(paths):
+        if os.path.exists(path):
+            with open(path) as file:
+                results[i] = json.load(file)
+        else:
+            missing.append(i)
+    print(f"{len(cells) - len(missing)} of {len(cells)} runs cached, running {len(missing)}")
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {pool.submit(run_scenario, cells[i][0], seed, cells[i][1], simulation_length): i for i in missing}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                # each result is written as soon as it is ready, so an interrupted sweep keeps what it finished
+                with open(paths[i] + ".tmp", "w") as file:
+                    json.dump(results[i], file)
+                os.replace(paths[i] + ".tmp", paths[i])
+    return results
+
+
+def summarise_sweep(results: List[Dict[str, Any]], metrics: Sequence[Tuple[str, str]], confidence: float = 0.95) -> List[Dict[str, Any]]:
+    """
+    Per scenario, the mean and confidence interval half width over replications of the mean of each
+    (table, metric) in `metrics`, plus the percentage of riders that abandoned.
+    """
+    scenarios: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        scenarios.setdefault(json.dumps(result["parameters"], sort_keys=True), []).append(result)
+    summary = []
+    for runs in scenarios.values():
+        row: Dict[str, Any] = {"parameters": runs[0]["parameters"], "replications": len(runs)}
+        for table, metric in metrics:
+            means = [run["kpis"][table][metric][2] for run in runs]
+            row[metric] = None if None in means else confidence_interval(np.array(means), confidence)
+        abandoned = np.array([100 * run["event_counters"].get("rider abandon", 0) / max(run["event_counters"].get("rider join", 0), 1) for run in runs])
+        row["Riders abandoning (%)"] = confidence_interval(abandoned, confidence)
+        summary.append(row)
+    return summary
+
+
+def print_sweep_table(summary: List[Dict[str, Any]], confidence: float = 0.95) -> None:
+    from tabulate import tabulate
+    names = list(summary[0]["parameters"])
+    statistics = [column for column in summary[0] if column not in ("parameters", "replications")]
+    data = [[*(row["parameters"][name] for name in names), *map(lambda x: "-" if x is None else f"{x[0]:.2f} ± {x[1]:.2f}", (row[column] for column in statistics))]
+            for row in summary]
+    print(f"\nMean ± {confidence * 100:.0f}% CI half width over {summary[0]['replications']} replications:")
+    print(tabulate(data, headers=[*names, *statistics], tablefmt="grid"))
+
+
+DEFAULT_METRICS = [
+    ("Rider", "Rider pickup wait time (minutes) (incl. assignment time)"),
+    ("Driver", "Driver idle percentage (%)"),
+    ("Driver", "Profit per driver (£)"),
+]
+
+
+def parse_levels(specs: List[str]) -> Dict[str, List[float]]:
+    # "name=v1,v2,..." -> {name: [v1, v2, ...]}
+    levels = {}
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        levels[name] = [float(value) for value in values.split(",")]
+    return levels
+
+
+def parse_bounds(specs: List[str]) -> Dict[str, Tuple[float, float]]:
+    # "name=low:high" -> {name: (low, high)}
+    bounds = {}
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        low, high = values.split(":")
+        bounds[name] = (float(low), float(high))
+    return bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep BoxCar parameters over a grid or Latin hypercube design.",
+                                     epilog=f"Parameters: {', '.join(PARAMETERS)}. Rates are per minute.")
+    design = parser.add_mutually_exclusive_group(required=True)
+    design.add_argument("--grid", nargs="+", metavar="NAME=V1,V2,...", help="levels of each parameter; every combination is run")
+    design.add_argument("--lhs", nargs="+", metavar="NAME=LOW:HIGH", help="ranges of each parameter for a Latin hypercube design")
+    parser.add_argument("--samples", type=int, default=10, help="number of scenarios in a Latin hypercube design")
+    parser.add_argument("-n", "--replications", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the replications (and of the Latin hypercube)")
+    parser.add_argument("--length", type=float, default=60 * 8766, help="simulation length (minutes)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=os.path.join(OUTPUT_DIR, "sweep_cache"))
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    if args.grid:
+        scenarios = grid_design(parse_levels(args.grid))
+    else:
+        scenarios = latin_hypercube_design(parse_bounds(args.lhs), args.samples, args.seed)
+    for name in scenarios[0]:
+        if name not in PARAMETERS:
+            parser.error(f"unknown parameter {name}, choose from {', '.join(PARAMETERS)}")
+
+    results = run_sweep(scenarios, args.replications, args.seed, args.length, args.processes, args.cache_dir)
+    print_sweep_table(summarise_sweep(results, DEFAULT_METRICS, args.confidence), args.confidence)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the simulation is imported as classes.x / modules.x from BoxCar/src, as main.py runs it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# classes.simulation first: classes.rider and classes.driver import it back
+import classes.simulation  # noqa: E402,F401
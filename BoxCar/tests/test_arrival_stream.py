@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from classes.arrival_stream import ArrivalStream, DailyProfile
+
+
+def test_stream_is_a_sorted_poisson_process():
+    stream = ArrivalStream(np.random.default_rng(1), rate=2.0, block_size=64, until=5000)
+    times = []
+    while stream.peek() < np.inf:
+        times.append(stream.pop())
+    assert np.all(np.diff(times) >= 0) and times[-1] < 5000
+    assert len(times) == pytest.approx(10000, rel=0.05)
+    assert np.mean(np.diff(times)) == pytest.approx(0.5, rel=0.05)
+    assert stream.pop() == np.inf
+
+
+def test_thinning_follows_the_profile():
+    profile = DailyProfile(1.0, [0.5, 2.0, 1.0, 0.0])
+    stream = ArrivalStream(np.random.default_rng(2), profile.max_rate, 1024, profile, until=60 * 24 * 200)
+    times = []
+    while stream.peek() < np.inf:
+        times.append(stream.pop())
+    periods = (np.asarray(times) // profile.period_length).astype(int) % 4
+    counts = np.bincount(periods, minlength=4) / (200 * profile.period_length)
+    assert counts == pytest.approx([0.5, 2.0, 1.0, 0.0], abs=0.03)
+    assert len(times) / (60 * 24 * 200) == pytest.approx(profile.mean_rate(60 * 24 * 200), rel=0.02)
+
+
+def test_rate_must_bound_the_profile():
+    profile = DailyProfile(1.0, [0.5, 2.0])
+    stream = ArrivalStream(np.random.default_rng(3), 1.5, 256, profile)
+    with pytest.raises(ValueError):
+        # the second half of the day is over the bound
+        while stream.pop() < 24 * 60:
+            pass
+    # a higher bound than needed only thins more candidates away
+    stream = ArrivalStream(np.random.default_rng(3), 4.0, 256, profile, until=60 * 24 * 100)
+    times = []
+    while stream.peek() < np.inf:
+        times.append(stream.pop())
+    assert len(times) / (60 * 24 * 100) == pytest.approx(1.25, rel=0.03)
+
+
+class Arrival:
+    def __init__(self, sim, time):
+        self.time = time
+
+
+class FixedStream:
+    def __init__(self, times):
+        self.times = list(times) + [np.inf]
+
+    def peek(self):
+        return self.times[0]
+
+    def pop(self):
+        return self.times.pop(0)
+
+
+def test_arrivals_merge_with_the_calendar():
+    from classes.simulation import Simulation
+    sim = Simulation(None, simulation_length=10)
+    log = []
+    sim.register_direct_handler("ping", lambda sim, name: log.append((sim.current_time, name)))
+    sim.register_direct_handler("arrival", lambda sim, arrival: log.append((sim.current_time, "arrival")))
+    sim.register_arrival_stream("arrival", FixedStream([1.0, 2.0, 3.0, 12.0]), Arrival)
+    sim.add_event(2.0, "ping", ("tie",))
+    sim.add_event(2.5, "ping", ("between",))
+    assert sim.peek_event()[:2] == (1.0, sim.event_kind("arrival"))
+    sim.run(report=False)
+    # the calendar wins ties; nothing after the termination event is processed
+    assert log == [(1.0, "arrival"), (2.0, "tie"), (2.0, "arrival"), (2.5, "between"), (3.0, "arrival")]
+
+
+def test_simulation_arrival_rates():
+    from modules.factory import create_simulation
+    sim = create_simulation(14, 28 * 24 * 60, record_raw_output=False)
+    sim.show_progress = False
+    sim.run(report=False)
+    distributions = sim.input_distributions
+    for event_type, rate in (("rider join", distributions.rider_arrival_rate), ("driver join", distributions.driver_arrival_rate)):
+        expected = rate * sim.simulation_length
+        assert abs(sim.event_counters[event_type] - expected) < 4 * np.sqrt(expected)
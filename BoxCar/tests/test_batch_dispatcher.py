@@ -0,0 +1,70 @@
+from itertools import permutations
+import numpy as np
+import pytest
+from classes.batch_dispatcher import BatchDispatcher
+from classes.driver import Driver
+from classes.event import RIDE_ACCEPT
+from modules.factory import create_simulation
+
+
+class Store:
+    def __init__(self, **columns):
+        for name, values in columns.items():
+            setattr(self, name, np.asarray(values, dtype=float))
+
+
+class Row:
+    def __init__(self, id):
+        self.id = id
+
+
+def brute_force(origins, destinations, positions):
+    # over every assignment of drivers to riders: most feasible pairs, then least total pickup distance
+    best = None
+    riders, drivers = len(origins), len(positions)
+    for order in permutations(range(max(riders, drivers))):
+        pairs = []
+        for driver, rider in enumerate(order[:drivers]):
+            if rider >= riders:
+                continue
+            pickup = np.linalg.norm(positions[driver] - origins[rider])
+            trip = np.linalg.norm(origins[rider] - destinations[rider])
+            if Driver.earnings_per_mile * trip + Driver.initial_fare - Driver.costs_per_mile * (pickup + trip) >= 0:
+                pairs.append(pickup)
+        key = (-len(pairs), sum(pairs))
+        if best is None or key < best:
+            best = key
+    return -best[0], best[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_assignment_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    riders, drivers = rng.integers(1, 6), rng.integers(1, 6)
+    # a wide area so that some pickups are not worth making
+    sim = type("Sim", (), {})()
+    sim.rider_store = Store(origin=rng.uniform(0, 80, (riders, 2)), destination=rng.uniform(0, 80, (riders, 2)))
+    sim.driver_store = Store(position=rng.uniform(0, 80, (drivers, 2)))
+    pairs = BatchDispatcher.assign(sim, [Row(i) for i in range(riders)], [Row(i) for i in range(drivers)])
+    assert len({driver for driver, _, _ in pairs}) == len({rider for _, rider, _ in pairs}) == len(pairs)
+    count, total = brute_force(sim.rider_store.origin, sim.rider_store.destination, sim.driver_store.position)
+    assert len(pairs) == count
+    assert sum(distance for _, _, distance in pairs) == pytest.approx(total)
+
+
+def test_riders_are_matched_at_batch_times():
+    dispatcher = BatchDispatcher(window=5.0)
+    sim = create_simulation(25, 3 * 24 * 60, record_raw_output=False, dispatcher=dispatcher)
+    sim.show_progress = False
+    accept = sim.dispatch[RIDE_ACCEPT]
+    matched = set()
+
+    def checked(sim, rider, driver):
+        assert sim.current_time % 5.0 == pytest.approx(0) or sim.current_time % 5.0 == pytest.approx(5.0)
+        assert rider.join_time not in matched
+        matched.add(rider.join_time)
+        accept(sim, rider, driver)
+    sim.dispatch[RIDE_ACCEPT] = checked
+    sim.run(report=False)
+    assert dispatcher.matches == sim.event_counters["ride accept"] == len(matched)
+    assert 0 < dispatcher.batches <= 3 * 24 * 60 / 5
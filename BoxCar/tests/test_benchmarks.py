@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import simulation_benchmark  # noqa: E402
+
+
+def test_scenario_reports_the_work_done():
+    result = simulation_benchmark.run_scenario({}, 24 * 60, simulation_benchmark.SEED, sample_every=100)
+    assert result["events"] > 0 and result["events_per_second"] > 0
+    assert result["calendar_size"]["max"] >= result["calendar_size"]["mean"] > 0
+    # the same seed does the same work, which --compare relies on
+    again = simulation_benchmark.run_scenario({}, 24 * 60, simulation_benchmark.SEED, sample_every=100)
+    assert again["event_counters"] == result["event_counters"]
+
+
+def test_headless_import_loads_no_reporting_package():
+    import_time = simulation_benchmark.measure_import_time(repeats=1)
+    assert import_time["loaded"] == []
+
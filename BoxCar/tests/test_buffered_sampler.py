@@ -0,0 +1,68 @@
+from functools import partial
+import pickle
+import numpy as np
+import pytest
+from scipy import stats
+from classes.buffered_sampler import BufferedSampler, AntitheticGenerator, skewnorm, lognorm, uniform, coordinate_pairs
+from classes.generate_random_alternative import Distributions
+
+
+def test_sequence_does_not_depend_on_block_size():
+    small = BufferedSampler(partial(uniform, low=0, high=1), np.random.default_rng(3), block_size=7)
+    large = BufferedSampler(partial(uniform, low=0, high=1), np.random.default_rng(3), block_size=1000)
+    values = [small() for _ in range(100)]
+    assert values == [large() for _ in range(100)]
+    assert values == np.random.default_rng(3).uniform(0, 1, 100).tolist()
+    assert small.count == 100
+
+
+def test_streams_do_not_depend_on_interleaving():
+    a, b = Distributions(None, seed=9), Distributions(None, seed=9)
+    patience = [a.generate_rider_patience() for _ in range(5000)]
+    origins = [a.generate_rider_origin_coordinates() for _ in range(5000)]
+    interleaved = [(b.generate_rider_origin_coordinates(), b.generate_rider_patience()) for _ in range(5000)]
+    assert patience == [p for _, p in interleaved]
+    assert np.array_equal(origins, [o for o, _ in interleaved])
+
+
+def test_pickled_sampler_carries_on_where_it_was():
+    sampler = BufferedSampler(partial(uniform, low=0, high=1), np.random.default_rng(4), block_size=16)
+    [sampler() for _ in range(10)]
+    copy = pickle.loads(pickle.dumps(sampler))
+    assert [sampler() for _ in range(40)] == [copy() for _ in range(40)]
+    assert copy.mean() == pytest.approx(np.mean(np.random.default_rng(4).uniform(0, 1, 50)))
+
+
+@pytest.mark.parametrize("draw, distribution", [
+    (partial(skewnorm, a=11.70, loc=0.55, scale=6.89), stats.skewnorm(11.70, 0.55, 6.89)),
+    (partial(skewnorm, a=-1.86, loc=15.74, scale=6.13), stats.skewnorm(-1.86, 15.74, 6.13)),
+    (partial(lognorm, s=0.16, loc=-19.07, scale=26.89), stats.lognorm(0.16, -19.07, 26.89)),
+])
+def test_block_generators_follow_scipy(draw, distribution):
+    sample = draw(np.random.default_rng(5), 20000)
+    assert stats.kstest(sample, distribution.cdf).pvalue > 0.001
+
+
+def test_antithetic_generator():
+    rng, twin = np.random.default_rng(6), AntitheticGenerator(np.random.default_rng(6))
+    assert np.allclose(rng.random(100) + twin.random(100), 1)
+    assert np.allclose(rng.standard_normal(100), -twin.standard_normal(100))
+    e, antithetic = rng.standard_exponential(100), twin.standard_exponential(100)
+    assert np.allclose(np.exp(-e) + np.exp(-antithetic), 1)
+
+
+@pytest.mark.parametrize("draw, distribution", [
+    (partial(skewnorm, a=11.70, loc=0.55, scale=6.89), stats.skewnorm(11.70, 0.55, 6.89)),
+    (partial(lognorm, s=0.16, loc=-19.07, scale=26.89), stats.lognorm(0.16, -19.07, 26.89)),
+])
+def test_antithetic_variates_are_mirrored(draw, distribution):
+    # the twin's variates are at the mirrored quantiles, so the pair is negatively correlated
+    sample, twin = draw(np.random.default_rng(8), 5000), draw(AntitheticGenerator(np.random.default_rng(8)), 5000)
+    assert np.allclose(distribution.cdf(sample) + distribution.cdf(twin), 1)
+    assert np.corrcoef(sample, twin)[0, 1] < -0.5
+
+
+def test_coordinate_pairs_are_rows():
+    points = coordinate_pairs(np.random.default_rng(7), 10, partial(uniform, low=0, high=1), partial(uniform, low=5, high=6))
+    assert points.shape == (10, 2)
+    assert (points[:, 0] < 1).all() and (points[:, 1] >= 5).all()
@@ -0,0 +1,56 @@
+import pytest
+from classes.simulation import Simulation
+from classes.batch_dispatcher import BatchDispatcher
+from classes.instrumentation import Instrumentation
+from modules.factory import create_simulation
+
+LENGTH = 4 * 24 * 60
+
+
+def finished(sim):
+    sim.show_progress = False
+    sim.run(report=False)
+    return sim.event_counts, sim.collect_KPIs()
+
+
+# options are made per simulation, as the dispatcher and the instrumentation belong to one run
+@pytest.mark.parametrize("options", [
+    lambda: {},
+    lambda: {"record_raw_output": True},
+    lambda: {"dispatcher": BatchDispatcher(window=2.0)},
+    lambda: {"instrumentation": Instrumentation(sample_interval=120)},
+], ids=["streaming", "raw", "batch dispatcher", "instrumentation"])
+def test_resumed_run_gives_the_same_result(tmp_path, options):
+    path = str(tmp_path / "checkpoint.pkl")
+    expected = finished(create_simulation(15, LENGTH, **{"record_raw_output": False, **options()}))
+
+    sim = create_simulation(15, LENGTH, **{"record_raw_output": False, **options()})
+    sim.show_progress = False
+    sim.run_until(LENGTH / 3)
+    sim.save_checkpoint(path)
+    # the original carries on from the checkpoint unaffected
+    assert finished(sim) == expected
+    assert finished(Simulation.load_checkpoint(path)) == expected
+
+
+def test_periodic_checkpoints(tmp_path):
+    path = str(tmp_path / "periodic.pkl")
+    expected = finished(create_simulation(16, LENGTH, record_raw_output=False))
+    sim = create_simulation(16, LENGTH, record_raw_output=False, checkpoint_interval=LENGTH / 4, checkpoint_path=path)
+    finished(sim)
+    resumed = Simulation.load_checkpoint(path)
+    assert 3 * LENGTH / 4 <= resumed.current_time < LENGTH
+    assert finished(resumed) == expected
+
+
+def test_dispatch_table_keeps_the_dispatcher(tmp_path):
+    path = str(tmp_path / "dispatcher.pkl")
+    sim = create_simulation(17, LENGTH, record_raw_output=False, dispatcher=BatchDispatcher(window=2.0))
+    sim.run_until(LENGTH / 2)
+    sim.save_checkpoint(path)
+    resumed = Simulation.load_checkpoint(path)
+    match = resumed.dispatch[resumed.event_kind(BatchDispatcher.event_type)]
+    assert match.__self__ is resumed.dispatcher
+    batches = resumed.dispatcher.batches
+    finished(resumed)
+    assert resumed.dispatcher.batches > batches
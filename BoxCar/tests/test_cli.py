@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from modules import cli
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def test_headless_run_writes_kpis_and_tables(tmp_path):
+    cli.main(["run", "--headless", "--length", "1440", "--seed", "3", "--output-dir", str(tmp_path), "--format", "npz"])
+    result = json.loads((tmp_path / "kpis.json").read_text())
+    assert result["seed"] == 3 and result["length"] == 1440
+    assert result["event_counters"]["termination"] == 1
+    assert "Rider" in result["kpis"] and "Time-average waiting riders" in result["kpis"]["System State"]
+    assert list(tmp_path.glob("trips-*.npz")) and list(tmp_path.glob("drivers-*.npz"))
+
+
+def test_same_seed_same_kpis(tmp_path):
+    for name in ("a", "b"):
+        cli.main(["run", "--headless", "--length", "1440", "--seed", "4", "--output-dir", str(tmp_path / name), "--format", "npz"])
+    assert (tmp_path / "a" / "kpis.json").read_text() == (tmp_path / "b" / "kpis.json").read_text()
+
+
+def test_tools_get_their_own_arguments(capsys):
+    with pytest.raises(SystemExit) as exit:
+        cli.main(["replications", "--help"])
+    assert exit.value.code == 0
+    assert "boxcar replications" in capsys.readouterr().out
+
+
+def test_python_dash_m_boxcar(tmp_path):
+    completed = subprocess.run([sys.executable, "-m", "boxcar", "run", "--headless", "--length", "600", "--seed", "5",
+                                "--output-dir", str(tmp_path), "--format", "npz"], cwd=SRC, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    assert (tmp_path / "kpis.json").exists()
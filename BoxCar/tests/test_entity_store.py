@@ -0,0 +1,45 @@
+import pickle
+import numpy as np
+from classes.entity_store import EntityStore, EntityView
+
+
+class Point(EntityView):
+    fields = {"position": (np.float64, (2,)), "count": (np.int64, ()), "flag": (np.bool_, ())}
+    __slots__ = ("note",)
+
+    def __init__(self, store, x, y):
+        self._bind(store)
+        self.position = (x, y)
+        self.count = 0
+        self.flag = False
+
+
+def test_views_read_and_write_the_columns():
+    store = EntityStore(Point.fields, capacity=2)
+    points = [Point(store, i, -i) for i in range(5)]
+    assert store.capacity == 8 and len(store) == 5
+    points[3].count += 4
+    points[3].position[1] = 7.0
+    assert store.count[3] == 4 and isinstance(points[3].count, int)
+    assert np.array_equal(points[3].position, (3, 7))
+    assert np.array_equal(store.position[:5, 0], np.arange(5))
+
+
+def test_released_ids_are_reused():
+    store = EntityStore(Point.fields)
+    first, second = Point(store, 1, 1), Point(store, 2, 2)
+    first.release()
+    third = Point(store, 3, 3)
+    assert third.id == first.id and len(store) == 2
+    assert np.array_equal(third.position, (3, 3)) and np.array_equal(second.position, (2, 2))
+
+
+def test_pickle_keeps_the_rows_in_use():
+    store = EntityStore(Point.fields, capacity=1024)
+    points = [Point(store, i, i) for i in range(10)]
+    points[4].release()
+    copy = pickle.loads(pickle.dumps(store))
+    assert copy.capacity == 1024 and len(copy) == 9 and copy.allocate() == 4
+    assert np.array_equal(copy.position[:10], store.position[:10])
+    assert len(pickle.dumps(store)) < 4096
+
@@ -0,0 +1,50 @@
+from classes.event import EVENT_TYPES, EventRecord, event_record, RIDER_JOIN, RIDE_ACCEPT, TERMINATION
+from classes.simulation import Simulation
+from classes.event_handlers import EventHandlers
+from modules.factory import create_simulation
+
+
+class Entity:
+    def __init__(self, id):
+        self.id = id
+
+
+def test_event_records():
+    assert event_record(1.0, RIDER_JOIN, (Entity(4),)) == EventRecord(1.0, RIDER_JOIN, 4, -1)
+    assert event_record(2.0, RIDE_ACCEPT, (Entity(4), Entity(7))) == EventRecord(2.0, RIDE_ACCEPT, 4, 7)
+    assert event_record(3.0, TERMINATION, ()) == EventRecord(3.0, TERMINATION, -1, -1)
+    assert event_record(4.0, len(EVENT_TYPES) + 2, ("custom",)).rider == -1
+
+
+def test_new_event_types_get_the_next_kinds():
+    sim = Simulation(None)
+    assert sim.event_kind("rider join") == RIDER_JOIN
+    kind = sim.event_kind("surge")
+    assert kind == len(EVENT_TYPES) and sim.event_kind("surge") == kind
+    assert len(sim.dispatch) == len(sim.event_counts) == len(sim.event_types) == kind + 1
+
+
+class LegacyHandlers:
+    # the handle_ methods of EventHandlers without direct_handlers, like handlers written for register_event_handler
+    def __init__(self) -> None:
+        self.handlers = EventHandlers(None)
+
+    def __getattr__(self, name):
+        if name == "direct_handlers":
+            raise AttributeError(name)
+        return getattr(self.handlers, name)
+
+
+def test_event_data_handlers_run_the_same_simulation():
+    from classes.generate_random_alternative import Distributions
+    direct = create_simulation(24, 3 * 24 * 60, record_raw_output=False)
+    legacy = LegacyHandlers()
+    distributions = Distributions(None, seed=24)
+    wrapped = Simulation(legacy, distributions, simulation_length=3 * 24 * 60, record_raw_output=False)
+    legacy.handlers.simulation = distributions.simulation = wrapped
+    assert type(wrapped.dispatch[RIDER_JOIN]).__name__ == "EventDataHandler"
+    for sim in (direct, wrapped):
+        sim.show_progress = False
+        sim.run(report=False)
+    assert direct.event_counts == wrapped.event_counts
+    assert direct.collect_KPIs() == wrapped.collect_KPIs()
@@ -0,0 +1,101 @@
+import hashlib
+import numpy as np
+import pytest
+from classes.event_calendar import HeapEventCalendar, CalendarQueue
+from classes.simulation import Simulation
+from classes.generate_random_alternative import Distributions
+from classes.event_handlers import EventHandlers
+from modules.factory import create_simulation
+
+CALENDARS = [HeapEventCalendar, CalendarQueue]
+
+
+@pytest.mark.parametrize("calendar_class", CALENDARS)
+def test_equal_times_come_out_in_insertion_order(calendar_class):
+    calendar = calendar_class()
+    for i in range(50):
+        calendar.push(float(i % 5), i)
+    popped = [calendar.pop() for _ in range(50)]
+    assert popped == sorted(range(50), key=lambda i: (i % 5, i))
+    assert not calendar
+
+
+@pytest.mark.parametrize("calendar_class", CALENDARS)
+def test_matches_sorted_order(calendar_class):
+    rng = np.random.default_rng(1)
+    calendar = calendar_class()
+    times = rng.exponential(3.0, 2000).cumsum()
+    rng.shuffle(times)
+    for i, time in enumerate(times):
+        calendar.push(time, i)
+    popped = [calendar.pop() for _ in range(len(times))]
+    assert popped == list(np.argsort(times, kind="stable"))
+
+
+@pytest.mark.parametrize("calendar_class", CALENDARS)
+def test_cancelled_events_are_skipped(calendar_class):
+    calendar = calendar_class()
+    handles = [calendar.push(float(i), i) for i in range(100)]
+    for handle in handles[::3]:
+        calendar.cancel(handle)
+    # cancelling twice, or after the event was popped, does nothing
+    calendar.cancel(handles[0])
+    assert len(calendar) == 66
+    assert calendar.peek() == 1
+    first = calendar.pop()
+    calendar.cancel(handles[1])
+    rest = [calendar.pop() for _ in range(len(calendar))]
+    assert [first] + rest == [i for i in range(100) if i % 3]
+    assert not calendar
+
+
+@pytest.mark.parametrize("calendar_class", CALENDARS)
+def test_interleaved_push_pop_cancel(calendar_class):
+    # against the heap, with new events always scheduled after the last one popped, as in a simulation
+    rng = np.random.default_rng(2)
+    calendar, reference = calendar_class(), HeapEventCalendar()
+    handles, now = [], 0.0
+    for step in range(5000):
+        action = rng.random()
+        if action < 0.5 or not reference:
+            time = now + rng.exponential(10.0)
+            handles.append((calendar.push(time, (time, step)), reference.push(time, (time, step))))
+        elif action < 0.65:
+            handle, reference_handle = handles[rng.integers(len(handles))]
+            calendar.cancel(handle)
+            reference.cancel(reference_handle)
+        else:
+            event = reference.pop()
+            assert calendar.pop() == event
+            now = event[0]
+        assert len(calendar) == len(reference)
+
+
+def event_log(sim, events):
+    log = []
+    for _ in range(events):
+        event = sim.peek_event()
+        log.append((float(event[0]), sim.event_types[event[1]]))
+        sim.progress_time()
+    return log
+
+
+def test_calendar_queue_runs_the_same_simulation():
+    heap = create_simulation(7, 7 * 24 * 60, record_raw_output=False)
+    queue = create_simulation(7, 7 * 24 * 60, record_raw_output=False, event_calendar=CalendarQueue())
+    assert event_log(heap, 5000) == event_log(queue, 5000)
+    assert heap.event_counts == queue.event_counts
+
+
+def test_seeded_trace_regression():
+    # pins the current engine's event sequence for Distributions(seed=5): changes to the event loop, calendar
+    # or pools that should not change the model must leave it as it is
+    handlers = EventHandlers(None)
+    distributions = Distributions(None, seed=5)
+    sim = Simulation(handlers, distributions)
+    handlers.simulation = sim
+    distributions.simulation = sim
+    log = event_log(sim, 20000)
+    assert sim.event_counters == {"rider join": 4889, "rider abandon": 590, "driver join": 606, "driver leave": 577,
+                                  "ride accept": 4299, "ride pickup": 4281, "ride completion": 4271}
+    assert hashlib.md5(repr(log).encode()).hexdigest() == "d3a971d2ff9dd63211514dc791e66cfd"
@@ -0,0 +1,51 @@
+from classes.event import RIDER_ABANDON, DRIVER_LEAVE
+from classes.simulation import Simulation
+from modules.factory import create_simulation
+
+
+def test_cancelled_event_is_not_processed():
+    sim = Simulation(None, simulation_length=100)
+    processed = []
+    sim.register_direct_handler("ping", lambda sim, n: processed.append(n))
+    handles = [sim.add_event(float(n), "ping", (n,)) for n in range(10)]
+    sim.cancel_event(handles[3])
+    sim.cancel_event(handles[3])
+    sim.cancel_event(None)
+    sim.run_until(5.5)
+    # cancelling an event that has already happened does nothing
+    sim.cancel_event(handles[1])
+    sim.cancel_event(handles[7])
+    sim.run(report=False)
+    assert processed == [0, 1, 2, 4, 5, 6, 8, 9]
+
+
+def test_terminate_at_moves_the_termination_event():
+    sim = create_simulation(3, 7 * 24 * 60, record_raw_output=False)
+    sim.show_progress = False
+    sim.terminate_at(24 * 60)
+    sim.run(report=False)
+    assert sim.current_time == 24 * 60
+    assert sim.event_counters["termination"] == 1
+
+
+def test_accepted_riders_never_abandon_and_drivers_leave_once():
+    sim = create_simulation(11, 7 * 24 * 60, record_raw_output=False)
+    sim.show_progress = False
+    abandon, leave = sim.dispatch[RIDER_ABANDON], sim.dispatch[DRIVER_LEAVE]
+    left = set()
+
+    def checked_abandon(sim, rider):
+        assert not rider.assigned
+        abandon(sim, rider)
+
+    def checked_leave(sim, driver):
+        # a driver busy at their leave time is rescheduled to leave at dropoff through their handle
+        assert driver.leave_time - driver.available_length not in left
+        leave(sim, driver)
+        if driver.status == "left":
+            left.add(driver.leave_time - driver.available_length)
+
+    sim.dispatch[RIDER_ABANDON], sim.dispatch[DRIVER_LEAVE] = checked_abandon, checked_leave
+    sim.run(report=False)
+    assert sim.event_counts[RIDER_ABANDON] > 0
+    assert len(left) == sim.event_counts[DRIVER_LEAVE]
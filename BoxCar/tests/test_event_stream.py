@@ -0,0 +1,130 @@
+import asyncio
+import numpy as np
+import pytest
+from classes.event import TERMINATION
+from classes.event_trace import EventTraceRecorder, read_trace
+from modules.factory import create_simulation
+
+LENGTH = 2 * 24 * 60
+
+
+def simulation(**kwargs):
+    sim = create_simulation(21, LENGTH, record_raw_output=False, **kwargs)
+    sim.show_progress = False
+    return sim
+
+
+@pytest.fixture
+def traced_run(tmp_path):
+    # the events of a plain run, as (time, kind, rider, driver)
+    path = str(tmp_path / "run.trace")
+    sim = simulation(trace=EventTraceRecorder(path))
+    sim.run(report=False)
+    records = read_trace(path)
+    return sim, [tuple(record) for record in zip(records["time"], records["kind"], records["rider"], records["driver"])]
+
+
+def test_iter_events_is_the_run(traced_run):
+    run, expected = traced_run
+    sim = simulation()
+    records = list(sim.iter_events())
+    assert records == expected
+    assert records[-1].kind == TERMINATION
+    assert np.array_equal(sim.event_counts, run.event_counts)
+    assert sim.collect_KPIs() == run.collect_KPIs()
+
+
+def test_iter_events_stops_at_until_and_resumes(traced_run):
+    _, expected = traced_run
+    sim = simulation()
+    records = []
+    for until in (0.0, 600.0, 600.0, 1440.5, None):
+        part = list(sim.iter_events(until))
+        if until is not None:
+            assert all(record.time < until for record in part)
+            assert sim.peek_event()[0] >= until
+        records += part
+    assert records == expected
+    # after the termination event there is nothing left to run
+    assert list(sim.iter_events()) == []
+
+
+def test_iter_events_is_lazy():
+    sim = simulation()
+    events = sim.iter_events()
+    first = [next(events) for _ in range(10)]
+    assert sim.current_time == first[-1].time < LENGTH
+    events.close()
+    # closing the generator leaves the simulation where it was, to carry on with run
+    assert sim.current_time == first[-1].time
+    sim.run(report=False)
+    assert sim.current_time == LENGTH
+
+
+def test_aiter_events_is_iter_events(traced_run):
+    _, expected = traced_run
+
+    async def consume(sim):
+        return [record async for record in sim.aiter_events(maxsize=8)]
+    assert asyncio.run(consume(simulation())) == expected
+
+
+def test_aiter_events_until_and_early_close(traced_run):
+    _, expected = traced_run
+
+    async def consume(sim):
+        head = [record async for record in sim.aiter_events(until=720.0)]
+        taken = []
+        stream = sim.aiter_events()
+        async for record in stream:
+            taken.append(record)
+            if len(taken) == 5:
+                break
+        await stream.aclose()
+        # the producer stops where the consumer left off, give or take the records queued ahead
+        return head, taken, sim.current_time
+    head, taken, time = asyncio.run(consume(simulation()))
+    assert head == [record for record in expected if record[0] < 720.0]
+    assert taken == expected[len(head):len(head) + 5]
+    assert time < LENGTH
+
+
+def test_aiter_events_raises_simulation_errors():
+    sim = simulation()
+
+    def failing(sim, *data):
+        raise RuntimeError("handler failed")
+    sim.register_direct_handler("ride pickup", failing)
+
+    async def consume():
+        return [record async for record in sim.aiter_events()]
+    with pytest.raises(RuntimeError, match="handler failed"):
+        asyncio.run(consume())
+
+
+class Writer:
+    # an output writer that only notes whether it was closed
+    closed = False
+
+    def write_trip(self, *row):
+        pass
+
+    def write_driver(self, *row):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_the_run_is_closed_by_the_termination_record():
+    writer = Writer()
+    sim = simulation(output_writer=writer)
+    for record in sim.iter_events():
+        if record.kind == TERMINATION:
+            # a consumer that stops at the termination record never resumes the generator
+            assert writer.closed
+            break
+    assert writer.closed
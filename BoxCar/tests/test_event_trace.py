@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from classes.event import RIDER_JOIN, DRIVER_JOIN, DRIVER_LEAVE, TERMINATION
+from classes.event_trace import EventTraceRecorder, read_trace, OTHER_KIND
+from modules.factory import create_simulation
+
+
+@pytest.fixture
+def traced_run(tmp_path):
+    path = str(tmp_path / "run.trace")
+    sim = create_simulation(12, 3 * 24 * 60, record_raw_output=False, trace=EventTraceRecorder(path, buffer_records=100))
+    sim.show_progress = False
+    joins = []
+    join = sim.dispatch[RIDER_JOIN]
+
+    def recording_join(sim, rider):
+        joins.append((sim.current_time, rider.id, *rider.origin, *rider.destination))
+        join(sim, rider)
+    sim.dispatch[RIDER_JOIN] = recording_join
+    sim.run(report=False)
+    return sim, read_trace(path), joins
+
+
+def test_one_record_per_event(traced_run):
+    sim, records, joins = traced_run
+    counts = np.bincount(records["kind"], minlength=len(sim.event_counts))
+    # a driver busy at their leave time has a second leave event at dropoff, which event_counts does not count
+    assert counts[DRIVER_LEAVE] > sim.event_counts[DRIVER_LEAVE]
+    counts[DRIVER_LEAVE] = sim.event_counts[DRIVER_LEAVE]
+    assert np.array_equal(counts, sim.event_counts)
+    assert np.all(np.diff(records["time"]) >= 0) and records["kind"][-1] == TERMINATION
+
+
+def test_joins_carry_ids_and_coordinates(traced_run):
+    sim, records, joins = traced_run
+    rider_joins = records[records["kind"] == RIDER_JOIN]
+    expected = np.array(joins)
+    assert np.array_equal(rider_joins["time"], expected[:, 0])
+    assert np.array_equal(rider_joins["rider"], expected[:, 1])
+    assert np.allclose(np.column_stack([rider_joins[c] for c in ("x0", "y0", "x1", "y1")]), expected[:, 2:], atol=1e-5)
+    assert (records[records["kind"] == DRIVER_JOIN]["rider"] == -1).all()
+
+
+def test_replay_ends_in_the_simulation_state(traced_run):
+    from modules.replay import ReplayState
+    sim, records, _ = traced_run
+    state = ReplayState()
+    for record in records:
+        state.apply(record)
+    assert state.terminated
+    assert len(state.waiting) == len(sim.unmatched_riders)
+    assert len(state.drivers) == len(sim.driver_store)
+
+
+def test_other_event_types_and_bad_files(tmp_path):
+    path = str(tmp_path / "other.trace")
+    recorder = EventTraceRecorder(path)
+    recorder.record(1.0, 20, ("anything",))
+    recorder.close()
+    assert read_trace(path)["kind"].tolist() == [OTHER_KIND]
+    (tmp_path / "bad").write_bytes(b"not a trace")
+    with pytest.raises(ValueError):
+        read_trace(str(tmp_path / "bad"))
@@ -0,0 +1,87 @@
+import json
+import numpy as np
+import pytest
+from scipy import stats
+from classes.generate_random_alternative import Distributions
+from modules.input_modelling import chi_square_test, fit_family, fit_columns, build_spec
+
+
+def masked_chi_square(data, cdf):
+    # the input analysis notebook's original test: one mask over the data per bin [a_i, a_i+1)
+    n = len(data)
+    k = n // 5
+    edges = np.linspace(min(data), max(data), k + 1)
+    e = n * np.diff(cdf(edges))
+    o = np.array([np.sum((data >= edges[i]) & (data < edges[i + 1])) for i in range(k)], dtype=float)
+    return np.sum((o - e) ** 2 / e), k
+
+
+def test_chi_square_matches_the_masked_count():
+    data = np.random.default_rng(1).exponential(3, 400)
+    cdf = stats.expon(scale=3).cdf
+    result = chi_square_test(data, cdf, fitted_parameters=1, alpha=0.1)
+    statistic, k = masked_chi_square(data, cdf)
+    assert result["D"] == pytest.approx(statistic)
+    assert (result["k"], result["dof"]) == (k, k - 2)
+    assert result["chi_square"] == pytest.approx(stats.chi2.ppf(0.9, k - 2))
+    assert result["p_value"] == pytest.approx(stats.chi2.sf(statistic, k - 2))
+
+
+def test_fit_family_recovers_and_ranks():
+    data = np.random.default_rng(2).normal(10, 2, 2000)
+    normal = fit_family(data, "norm")
+    assert normal["params"]["loc"] == pytest.approx(10, abs=0.2)
+    assert normal["params"]["scale"] == pytest.approx(2, abs=0.1)
+    assert normal["aic"] == pytest.approx(4 - 2 * np.sum(stats.norm.logpdf(data, **normal["params"])))
+    # equal-width bins leave few expected observations in the tails of a normal sample, so the chi-square
+    # test is checked on a uniform one
+    data = np.random.default_rng(2).uniform(5, 8, 500)
+    assert not fit_family(data, "uniform")["rejected"]
+    assert fit_family(data, "expon")["rejected"]
+
+
+def test_fit_columns_ranks_by_aic_and_caches(tmp_path, capsys):
+    rng = np.random.default_rng(3)
+    columns = {"waits": rng.exponential(2, 300), "lengths": np.append(rng.uniform(5, 8, 300), np.nan)}
+    fits = fit_columns(columns, ("norm", "expon", "uniform"), processes=1, cache_dir=str(tmp_path))
+    assert [fit["family"] for fit in fits["waits"]][0] == "expon"
+    assert [fit["family"] for fit in fits["lengths"]][0] == "uniform"
+    assert all(np.diff([fit["aic"] for fit in fits["waits"]]) >= 0)
+    assert "0 of 6 fits cached" in capsys.readouterr().out
+    assert fit_columns(columns, ("norm", "expon", "uniform"), processes=1, cache_dir=str(tmp_path)) == fits
+    assert "6 of 6 fits cached" in capsys.readouterr().out
+
+
+def test_build_spec():
+    fit = {"family": "norm", "params": {"loc": 1.0, "scale": 2.0}, "p_value": 0.5}
+    fits = {"gaps": [{**fit, "family": "expon", "params": {"loc": 0.5, "scale": 1.5}}],
+            "x": [fit], "y": [{**fit, "family": "uniform"}, fit], "hours": [fit]}
+    spec = build_spec(fits, {"gaps": "rider_arrival_rate", "x": "rider origin coordinates.x",
+                             "y": "rider origin coordinates.y", "hours": "driver available length"})
+    assert spec["parameters"] == {"rider_arrival_rate": 0.5}
+    assert spec["samplers"]["rider origin coordinates"]["x"]["family"] == "norm"
+    assert spec["samplers"]["rider origin coordinates"]["y"]["family"] == "uniform"
+    assert spec["samplers"]["driver available length"] == {"family": "norm", "params": fit["params"], "column": "hours", "p_value": 0.5}
+
+
+def test_distributions_sample_a_spec(tmp_path):
+    normal = {"family": "norm", "params": {"loc": 6.0, "scale": 0.5}}
+    spec = {"parameters": {"rider_arrival_rate": 0.25, "driver_arrival_rate": 0.1},
+            "samplers": {"driver available length": normal,
+                         "rider origin coordinates": {"x": {"family": "uniform", "params": {"loc": 2.0, "scale": 1.0}}, "y": normal}}}
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(spec))
+    distributions = Distributions(None, 4, spec=str(path), driver_arrival_rate=0.2)
+    # keyword parameters override the spec's
+    assert (distributions.rider_arrival_rate, distributions.driver_arrival_rate) == (0.25, 0.2)
+    lengths = np.array([distributions.generate_driver_available_length() for _ in range(4000)])
+    assert np.mean(lengths) == pytest.approx(360, abs=2)
+    assert distributions.driver_available_length_mean == 6.0
+    origins = np.array([distributions.generate_rider_origin_coordinates() for _ in range(4000)])
+    assert np.all((origins[:, 0] >= 2) & (origins[:, 0] <= 3))
+    assert np.mean(origins[:, 1]) == pytest.approx(6, abs=0.05)
+    # the same spec as a dict draws the same variates
+    again = Distributions(None, 4, spec=spec, driver_arrival_rate=0.2)
+    assert np.array_equal(np.array([again.generate_driver_available_length() for _ in range(4000)]), lengths)
+    with pytest.raises(ValueError, match="rider patience"):
+        Distributions(None, 4, spec={"samplers": {"rider patience": normal}})
@@ -0,0 +1,49 @@
+import csv
+import json
+from classes.instrumentation import Instrumentation
+from modules.factory import create_simulation
+
+LENGTH = 3 * 24 * 60
+
+
+def run(seed, **options):
+    sim = create_simulation(seed, LENGTH, record_raw_output=False, **options)
+    sim.show_progress = False
+    sim.run(report=False)
+    return sim
+
+
+def test_instrumented_run_is_the_same_run(tmp_path):
+    instrumentation = Instrumentation(sample_interval=60, report_path=str(tmp_path / "profile.json"))
+    sim = run(19, instrumentation=instrumentation)
+    assert sim.event_counts == run(19).event_counts
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert report["events"] == sum(sim.event_counts)
+    calls = {event_type: stats["calls"] for event_type, stats in report["handlers"].items()}
+    # every processed event went through its timed handler (driver leaves at dropoff are counted once)
+    assert calls["rider join"] == sim.event_counters["rider join"]
+    assert calls["ride completion"] == sim.event_counters["ride completion"]
+    assert calls["driver leave"] >= sim.event_counters["driver leave"]
+    assert report["handlers"]["ride accept"]["handler"] == "execute_ride_accept"
+    assert 0 < report["engine_seconds"] < report["wall_time"]
+    # the first event starts the clock, then one sample per simulated hour
+    assert len(report["samples"]["time"]) == LENGTH // 60
+
+
+def test_csv_report(tmp_path):
+    run(20, instrumentation=Instrumentation(sample_interval=120, report_path=str(tmp_path / "profile.csv")))
+    rows = list(csv.reader(open(tmp_path / "profile.csv")))
+    assert rows[0][0] == "event_type" and rows[-1][0] == "(engine)"
+    samples = list(csv.reader(open(tmp_path / "profile_samples.csv")))
+    assert samples[0] == ["time", "calendar", "unmatched_riders", "unmatched_drivers", "events_per_second"]
+    assert len(samples) > 10
+
+
+def test_handlers_registered_later_are_timed():
+    instrumentation = Instrumentation()
+    sim = create_simulation(21, LENGTH, record_raw_output=False, instrumentation=instrumentation)
+    sim.register_direct_handler("ping", lambda sim: None)
+    sim.add_event(10.0, "ping")
+    sim.show_progress = False
+    sim.run(report=False)
+    assert instrumentation.handlers["ping"].calls == 1
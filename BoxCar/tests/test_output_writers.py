@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from classes.output_writers import ColumnarWriter, NpzWriter, create_output_writer, load_output, TABLES
+from modules.factory import create_simulation
+
+
+def column(tables, table, name):
+    data = tables[table]
+    return np.asarray(data[name]) if isinstance(data, dict) else data.column(name).to_numpy()
+
+
+@pytest.mark.parametrize("output_format", ["npz", "arrow", "parquet"])
+def test_tables_hold_the_kpi_observations(tmp_path, output_format):
+    writer = create_output_writer(str(tmp_path), output_format, chunk_size=100)
+    sim = create_simulation(8, 3 * 24 * 60, output_writer=writer)
+    sim.show_progress = False
+    sim.run(report=False)
+    tables = load_output(str(tmp_path))
+    assert set(tables) == set(TABLES)
+    assert np.array_equal(column(tables, "trips", "dropoff_wait"), sim.rider_wait_time_dropoffs)
+    assert np.array_equal(column(tables, "trips", "profit"), sim.driver_single_trip_profit)
+    assert np.array_equal(column(tables, "drivers", "total_idle_time"), sim.driver_total_idle_times)
+    assert np.array_equal(column(tables, "drivers", "total_rides"), sim.driver_total_rides)
+    assert column(tables, "drivers", "total_rides").dtype == np.int64
+
+
+def test_npz_chunks(tmp_path):
+    writer = create_output_writer(str(tmp_path), "npz", chunk_size=10)
+    rider = type("Rider", (), dict(join_time=1.0, assignment_time=2.0, pickup_time=3.0, first_leg_time=1.0, second_leg_time=4.0))()
+    driver = type("Driver", (), dict(this_ride_first_leg_distance=1.0, this_ride_second_leg_distance=2.0, this_ride_earnings=9.0,
+                                     this_ride_costs=0.6, this_ride_idle_time=np.nan))()
+    for time in range(25):
+        writer.write_trip(float(time), rider, driver)
+    assert len(list(tmp_path.glob("trips-*.npz"))) == 2
+    writer.close()
+    trips = load_output(str(tmp_path))["trips"]
+    assert len(list(tmp_path.glob("trips-*.npz"))) == 3
+    assert np.array_equal(trips["dropoff_wait"], np.arange(25) - 1.0)
+    assert np.isnan(trips["driver_idle_time"]).all() and len(load_output(str(tmp_path))["drivers"]["leave_time"]) == 0
+
+
+def test_writer_backends_must_write_chunks(tmp_path):
+    with pytest.raises(TypeError):
+        ColumnarWriter(str(tmp_path))
+
+    class Incomplete(ColumnarWriter):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete(str(tmp_path))
+    NpzWriter(str(tmp_path)).close()
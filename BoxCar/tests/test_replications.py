@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from scipy import stats
+from modules.replications import run_replications, summarise_replications, confidence_interval, control_variate_interval
+
+
+def test_confidence_interval_is_the_t_interval():
+    samples = np.random.default_rng(1).normal(10, 2, 12)
+    mean, half_width = confidence_interval(samples, 0.9)
+    low, high = stats.t.interval(0.9, len(samples) - 1, loc=np.mean(samples), scale=stats.sem(samples))
+    assert mean == pytest.approx((low + high) / 2)
+    assert half_width == pytest.approx((high - low) / 2)
+    assert confidence_interval(samples[:1]) == (samples[0], np.inf)
+
+
+def test_confidence_interval_coverage():
+    rng = np.random.default_rng(2)
+    covered = [abs(mean - 5) <= half_width for mean, half_width in (confidence_interval(rng.exponential(5, 10)) for _ in range(2000))]
+    # the exponential is skewed, so coverage is a little below nominal
+    assert 0.88 < np.mean(covered) < 0.97
+
+
+def test_control_variates_remove_the_control_noise():
+    rng = np.random.default_rng(3)
+    controls = rng.normal(1, 1, (40, 1))
+    samples = 2 + 3 * (controls[:, 0] - 1) + rng.normal(0, 0.1, 40)
+    estimate, half_width = control_variate_interval(samples, controls, np.array([1.0]))
+    assert abs(estimate - 2) < half_width < confidence_interval(samples)[1] / 5
+
+
+def test_replications_give_one_result_each():
+    results = run_replications(3, seed=4, simulation_length=2 * 24 * 60, processes=1)
+    assert len(results) == 3
+    assert len({result["kpis"]["Rider"]["Rider assignment wait time (minutes)"][2] for result in results}) == 3
+    summary = summarise_replications(results)
+    mean, half_width = summary["Rider"]["Rider assignment wait time (minutes)"][2]
+    assert mean == pytest.approx(np.mean([result["kpis"]["Rider"]["Rider assignment wait time (minutes)"][2] for result in results]))
+    assert 0 < half_width < np.inf
+
+
+@pytest.mark.parametrize("replications", [0, 1, 3])
+def test_antithetic_replications_come_in_pairs(replications):
+    with pytest.raises(ValueError):
+        run_replications(replications, seed=4, simulation_length=24 * 60, processes=1, antithetic=True)
+
+
+def test_antithetic_pair_averages_a_run_and_its_twin():
+    from modules.replications import run_replication
+    pair = run_replications(2, seed=4, simulation_length=24 * 60, processes=1, antithetic=True)
+    seed = np.random.SeedSequence(4, spawn_key=(0,))
+    run, twin = (run_replication(seed, 24 * 60, antithetic) for antithetic in (False, True))
+    assert len(pair) == 1
+    metric = "Rider assignment wait time (minutes)"
+    assert pair[0]["kpis"]["Rider"][metric][2] == pytest.approx((run["kpis"]["Rider"][metric][2] + twin["kpis"]["Rider"][metric][2]) / 2)
+    assert run["controls"]["rider patience"][0] != twin["controls"]["rider patience"][0]
+
+
+def test_a_seed_sequence_can_be_reused():
+    from modules.factory import create_simulation
+    seed = np.random.SeedSequence(3)
+    runs = []
+    for _ in range(2):
+        sim = create_simulation(seed, 24 * 60, record_raw_output=False)
+        sim.show_progress = False
+        sim.run(report=False)
+        runs.append(sim)
+    assert runs[0].event_counters == runs[1].event_counters
+    assert runs[0].collect_KPIs() == runs[1].collect_KPIs()
+    # the same streams as from an int seed
+    assert create_simulation(3, 24 * 60, record_raw_output=False).input_distributions.rider_patience() == \
+        create_simulation(seed, 24 * 60, record_raw_output=False).input_distributions.rider_patience()
+    assert seed.n_children_spawned == 0
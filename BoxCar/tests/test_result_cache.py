@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# the output analysis helpers live with their notebooks, outside BoxCar/src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Distribution Analysis", "Output Analysis"))
+pytest.importorskip("pyarrow")
+from result_cache import typed, integer_rows, batch_means  # noqa: E402
+
+
+@pytest.fixture
+def workbook():
+    # result columns as pd.read_excel gives them: whole numbers as ints, with fractional, blank and " " cells
+    return pd.DataFrame({
+        "laptop_num": [1, 2, 3, 4.5, " ", 6, np.nan, 8, 9],
+        "order_num": [10, 11, " ", 13, 14, 15, 16, 17.0, 18],
+        "time": [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, " "],
+    }, dtype=object)
+
+
+def test_integer_rows_on_the_workbook(workbook):
+    mask = integer_rows(workbook, "laptop_num", "order_num")
+    # a whole number stored as a float (order_num 17.0) counts as a whole number
+    assert mask.tolist() == [True, True, False, False, False, True, False, True, True]
+
+
+def test_integer_rows_is_the_isinstance_filter(workbook):
+    # read_excel gives ints for whole-number cells, where the notebooks filtered with isinstance(x, int)
+    as_read = workbook.apply(lambda column: column.map(lambda x: int(x) if isinstance(x, float) and x.is_integer() else x))
+    expected = as_read["laptop_num"].apply(lambda x: isinstance(x, int)) & as_read["order_num"].apply(lambda x: isinstance(x, int))
+    assert integer_rows(as_read, "laptop_num", "order_num").equals(expected)
+
+
+def test_integer_rows_on_the_cached_copy(workbook):
+    cached = typed(workbook.copy())
+    assert cached["laptop_num"].dtype == float
+    assert integer_rows(cached, "laptop_num", "order_num").equals(integer_rows(workbook, "laptop_num", "order_num"))
+    assert not integer_rows(cached, "time").any()
+
+
+def test_batch_means_are_the_pandas_batches():
+    values = np.random.default_rng(1).normal(size=103)
+    values[[7, 50, 51]] = np.nan
+    df = pd.DataFrame({"value": values})
+    expected = [df.iloc[i:i + 10]["value"].mean() for i in range(5, len(df), 10)]
+    assert np.allclose(batch_means(values, 5, 10), expected)
+    assert len(batch_means(values, 200, 10)) == 0
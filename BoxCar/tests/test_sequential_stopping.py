@@ -0,0 +1,53 @@
+import numpy as np
+from classes.sequential_stopping import SequentialStopping, mser_truncation
+from modules.factory import create_simulation
+
+
+def test_mser_finds_the_transient():
+    rng = np.random.default_rng(1)
+    series = np.concatenate((np.linspace(20, 10, 100), np.full(900, 10.0))) + rng.normal(0, 1, 1000)
+    truncation = mser_truncation(series)
+    assert 60 <= truncation <= 120
+    assert mser_truncation(rng.normal(0, 1, 1000)) < 100
+    # too short to tell
+    assert mser_truncation(series[:15]) is None
+
+
+class Clock:
+    # the parts of a Simulation the stopping rule uses
+    def __init__(self):
+        self.current_time = 0.0
+        self.waits = []
+        self.terminated_at = None
+
+    def terminate_at(self, time):
+        self.terminated_at = time
+
+
+def test_warm_up_is_measured_in_time_when_periods_are_empty():
+    rule = SequentialStopping(kpis=("waits",), period=60, target=1e-9)
+    sim = Clock()
+    rng = np.random.default_rng(2)
+    for hour in range(1, 1001):
+        sim.current_time = hour * 60.0 + 1
+        # observations only every other hour; a transient over the first 200 hours
+        if hour % 2:
+            sim.waits.append((30.0 if hour <= 200 else 10.0) + rng.normal(0, 1))
+        rule.check(sim)
+    assert len(rule.observations["waits"]) == 500
+    assert rule.observation_times["waits"][:2] == [60.0, 180.0]
+    # about 100 observations are discarded, which took about 200 hours, not 100
+    assert 190 * 60 <= rule.warm_up["waits"] <= 215 * 60
+    assert sim.terminated_at is None
+
+
+def test_run_stops_once_precise_enough():
+    rule = SequentialStopping(target=0.2, min_observations=50)
+    sim = create_simulation(18, 60 * 8766, record_raw_output=False, stopping_rule=rule)
+    sim.show_progress = False
+    sim.run(report=False)
+    assert rule.stopped_at is not None and sim.current_time == rule.stopped_at < 60 * 8766
+    for kpi in rule.kpis:
+        mean, half_width = rule.estimates[kpi]
+        assert half_width <= 0.2 * abs(mean)
+        assert rule.warm_up[kpi] in [0.0, *rule.observation_times[kpi]]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from classes.spatial_index import GridIndex
+
+
+class Item:
+    def __init__(self, position):
+        self.position = np.asarray(position, dtype=float)
+
+
+def brute_force(items, point, k):
+    # the linear scan GridIndex replaces: np.linalg.norm distances, ties to the item added first
+    distances = [(np.linalg.norm(item.position - point), n, item) for n, item in enumerate(items)]
+    distances.sort(key=lambda entry: (entry[0], entry[1]))
+    return [(item, distance) for distance, _, item in distances[:k]]
+
+
+@pytest.mark.parametrize("size", [5, 32, 33, 400])
+@pytest.mark.parametrize("k", [1, 3])
+def test_nearest_matches_brute_force(size, k):
+    rng = np.random.default_rng(size)
+    index = GridIndex(lambda item: item.position)
+    items = [Item(rng.uniform(-2, 22, 2)) for _ in range(size)]
+    for item in items:
+        index.add(item)
+    # remove some and add them back, so insertion order differs from creation order
+    for item in items[::4]:
+        index.remove(item)
+    live = [item for item in items if item not in items[::4]] + items[::4]
+    for item in items[::4]:
+        index.add(item)
+    assert len(index) == size
+    for point in rng.uniform(-5, 25, (200, 2)):
+        assert index.nearest(point, k) == brute_force(live, point, k)
+
+
+def test_ties_go_to_the_first_added():
+    index = GridIndex(lambda item: item.position)
+    items = [Item((10 + dx, 10 + dy)) for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)] * 10]
+    for item in items:
+        index.add(item)
+    assert index.nearest((10, 10))[0][0] is items[0]
+    index.remove(items[0])
+    assert index.nearest((10, 10))[0][0] is items[1]
+
+
+def test_position_is_read_when_added():
+    index = GridIndex(lambda item: item.position)
+    near, far = Item((1, 1)), Item((15, 15))
+    index.add(near)
+    index.add(far)
+    near.position[:] = (19, 19)
+    assert index.nearest((0, 0))[0][0] is near
+    index.remove(near)
+    index.remove(far)
+    assert index.nearest((0, 0)) == [] and not index
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from classes.state_statistics import StateStatistics
+from modules.factory import create_simulation
+
+LENGTH = 3 * 24 * 60
+
+
+def test_time_averages_match_a_step_function_integral():
+    statistics = StateStatistics(snapshot_interval=60, capacity=24)
+    sim = create_simulation(22, LENGTH, record_raw_output=False, state_statistics=statistics)
+    sim.show_progress = False
+    times, states = [0.0], [StateStatistics.state(sim)]
+    for record in sim.iter_events():
+        times.append(record.time)
+        states.append(StateStatistics.state(sim))
+    # the state after each event is held until the next one
+    times, states = np.array(times), np.array(states[:-1], dtype=float)
+    integrals = (states * np.diff(times)[:, None]).sum(axis=0)
+    expected = dict(zip(StateStatistics.variables, integrals / LENGTH))
+    assert statistics.time_averages() == pytest.approx(expected)
+    assert statistics.utilisation == pytest.approx(expected["busy drivers"] / expected["drivers on duty"])
+
+    # the last day of hourly snapshots, each the state in force at that time
+    snapshots = statistics.snapshots()
+    assert snapshots.shape == (24, 5)
+    assert np.array_equal(snapshots[:, 0], np.arange(LENGTH - 23 * 60, LENGTH + 1, 60))
+    for row in snapshots:
+        held = states[np.searchsorted(times, row[0], side="left") - 1]
+        assert np.array_equal(row[1:], held)
+
+
+def test_summary_layout():
+    statistics = StateStatistics()
+    sim = create_simulation(23, 24 * 60, record_raw_output=False, state_statistics=statistics)
+    sim.show_progress = False
+    sim.run(report=False)
+    summary = statistics.summary()
+    assert list(summary)[-1] == "Driver utilisation (%)"
+    assert all(values[0] is None and values[2] >= 0 for values in summary.values())
+    assert statistics.snapshots().shape == (0, 5)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from classes.streaming_stats import RunningStatistics, TDigest, StreamingSummary
+
+SAMPLES = {
+    "exponential": np.random.default_rng(1).exponential(10, 100_000),
+    "normal": np.random.default_rng(2).normal(50, 5, 100_000),
+    "lognormal": np.random.default_rng(3).lognormal(0, 1, 100_000),
+}
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_running_statistics_match_numpy(name):
+    values = SAMPLES[name]
+    statistics = RunningStatistics()
+    for batch in np.array_split(values, 37):
+        statistics.update(batch)
+    assert statistics.count == len(values)
+    assert statistics.mean == pytest.approx(np.mean(values))
+    assert statistics.variance == pytest.approx(np.var(values, ddof=1))
+    assert (statistics.min, statistics.max) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_digest_quantiles_match_np_percentile(name):
+    values = SAMPLES[name]
+    summary = StreamingSummary()
+    summary.extend(values.tolist())
+    assert len(summary) == len(values)
+    assert summary.mean == pytest.approx(np.mean(values))
+    assert summary.total == pytest.approx(np.sum(values))
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        exact = np.percentile(values, 100 * q)
+        # within a small fraction of a rank, measured on the empirical distribution
+        rank = np.searchsorted(np.sort(values), summary.quantile(q)) / len(values)
+        assert rank == pytest.approx(q, abs=0.002), (q, summary.quantile(q), exact)
+    assert (summary.quantile(0), summary.quantile(1)) == (values.min(), values.max())
+
+
+def test_digest_stays_small():
+    digest = TDigest(compression=100)
+    for batch in np.array_split(SAMPLES["exponential"], 100):
+        digest.update(batch)
+    assert len(digest._means) <= 100
+    assert digest.count == len(SAMPLES["exponential"])
+
+
+def test_merged_summaries_equal_one_summary():
+    values = SAMPLES["lognormal"]
+    whole, parts = StreamingSummary(), [StreamingSummary() for _ in range(4)]
+    whole.extend(values.tolist())
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        part.extend(chunk.tolist())
+    for part in parts[1:]:
+        parts[0].merge(part)
+    merged = parts[0]
+    assert len(merged) == len(values)
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    for q in (0.05, 0.5, 0.95):
+        assert merged.quantile(q) == pytest.approx(np.percentile(values, 100 * q), rel=0.01)
+
+
+def test_empty_summary():
+    summary = StreamingSummary()
+    assert len(summary) == 0 and np.isnan(summary.quantile(0.5))
+    summary.append(3.0)
+    assert summary.mean == 3.0 and summary.quantile(0.5) == 3.0 and summary.variance == 0.0
+
+
+def test_streaming_kpis_match_raw_output():
+    from modules.factory import create_simulation
+    raw, streaming = (create_simulation(6, 7 * 24 * 60, record_raw_output=flag) for flag in (True, False))
+    for sim in (raw, streaming):
+        sim.show_progress = False
+        sim.run(report=False)
+    for table, metrics in raw.collect_KPIs().items():
+        for metric, values in metrics.items():
+            streamed = streaming.collect_KPIs()[table][metric]
+            for statistic, (exact, estimate) in enumerate(zip(values, streamed)):
+                if exact is None:
+                    assert estimate is None
+                elif statistic in (0, 2, 4):
+                    assert estimate == pytest.approx(exact), (table, metric)
+                else:
+                    assert estimate == pytest.approx(exact, rel=0.05, abs=0.05), (table, metric)
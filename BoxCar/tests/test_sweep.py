@@ -0,0 +1,40 @@
+import os
+import pytest
+from classes.driver import Driver
+from modules.sweep import grid_design, latin_hypercube_design, run_sweep, run_scenario, summarise_sweep, DEFAULT_METRICS
+
+LENGTH = 24 * 60
+
+
+def test_designs():
+    assert grid_design({"initial_fare": [3, 4], "costs_per_mile": [0.2, 0.3, 0.4]})[1] == {"initial_fare": 3, "costs_per_mile": 0.3}
+    assert len(grid_design({"initial_fare": [3, 4], "costs_per_mile": [0.2, 0.3, 0.4]})) == 6
+    design = latin_hypercube_design({"initial_fare": (2, 4), "driver_arrival_rate": (0.05, 0.1)}, 8, seed=1)
+    fares = sorted(point["initial_fare"] for point in design)
+    # one scenario in each eighth of every range
+    assert [int((fare - 2) / 2 * 8) for fare in fares] == list(range(8))
+
+
+def test_scenario_restores_driver_constants():
+    run_scenario({"initial_fare": 10.0}, 1, 0, LENGTH)
+    assert Driver.initial_fare == 3
+    with pytest.raises(ValueError):
+        run_scenario({"not_a_parameter": 1.0}, 1, 0, LENGTH)
+
+
+def test_sweep_is_cached_and_uses_common_random_numbers(tmp_path):
+    design = grid_design({"initial_fare": [3.0, 6.0]})
+    first = run_sweep(design, 2, seed=5, simulation_length=LENGTH, processes=1, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 4
+    # replication i sees the same arrivals in every scenario
+    assert first[0]["event_counters"]["rider join"] == first[2]["event_counters"]["rider join"]
+    assert first[0]["event_counters"]["rider join"] != first[1]["event_counters"]["rider join"]
+    # a wider sweep only runs the new cells, and the cached ones come back unchanged
+    files = {name: os.path.getmtime(tmp_path / name) for name in os.listdir(tmp_path)}
+    second = run_sweep(grid_design({"initial_fare": [3.0, 6.0, 9.0]}), 2, seed=5, simulation_length=LENGTH, processes=1, cache_dir=str(tmp_path))
+    assert second[:4] == first
+    assert len(os.listdir(tmp_path)) == 6
+    assert all(os.path.getmtime(tmp_path / name) == mtime for name, mtime in files.items())
+    summary = summarise_sweep(second, DEFAULT_METRICS)
+    assert [row["parameters"]["initial_fare"] for row in summary] == [3.0, 6.0, 9.0]
+    assert all(row["replications"] == 2 for row in summary)
@@ -0,0 +1,70 @@
+from itertools import count
+import numpy as np
+from classes.waiting_pool import WaitingPool
+from classes.simulation import Simulation
+
+
+class Waiting:
+    def __init__(self, name, deadline, origin=(1.0, 1.0)):
+        self.name = name
+        self.abandonment_time = deadline
+        self.origin = np.array(origin)
+
+
+def pool(sequence=None):
+    return WaitingPool(lambda item: item.origin, lambda item: item.abandonment_time, sequence or count().__next__)
+
+
+def test_deadlines_come_out_in_order_skipping_removed_items():
+    waiting = pool()
+    rng = np.random.default_rng(1)
+    items = [Waiting(n, float(deadline)) for n, deadline in enumerate(rng.integers(0, 50, 200))]
+    for item in items:
+        waiting.add(item)
+    for item in items[::3]:
+        waiting.remove(item)
+    expired = []
+    while waiting.next_deadline() is not None:
+        _, _, item = waiting.pop_deadline()
+        expired.append(item)
+        waiting.remove(item)
+    kept = [item for item in items if item not in items[::3]]
+    # equal deadlines in the order the items were added
+    assert expired == sorted(kept, key=lambda item: item.abandonment_time)
+    assert not waiting
+
+
+def test_deadlines_interleave_with_calendar_events():
+    sim = Simulation(None, simulation_length=100)
+    log = []
+    sim.register_direct_handler("rider abandon", lambda sim, item: (log.append(item.name), sim.unmatched_riders.remove(item)))
+    sim.register_direct_handler("ping", lambda sim, name: log.append(name))
+    # scheduled before the rider was added, so it comes first at the same time, and the other way round
+    sim.add_event(10.0, "ping", ("event before",))
+    sim.unmatched_riders.add(Waiting("rider at 10", 10.0))
+    sim.add_event(10.0, "ping", ("event after",))
+    sim.unmatched_riders.add(Waiting("rider at 5", 5.0))
+    matched = Waiting("matched rider", 7.0)
+    sim.unmatched_riders.add(matched)
+    sim.add_event(6.0, "ping", ("match",))
+    sim.run_until(6.5)
+    sim.unmatched_riders.remove(matched)
+    sim.run(report=False)
+    assert log == ["rider at 5", "match", "event before", "rider at 10", "event after"]
+    assert sim.current_time == 100
+
+
+def test_simulation_abandonments_are_riders_out_of_patience():
+    from modules.factory import create_simulation
+    from classes.event import RIDER_ABANDON
+    sim = create_simulation(13, 3 * 24 * 60, record_raw_output=False)
+    sim.show_progress = False
+    abandon = sim.dispatch[RIDER_ABANDON]
+    expired = []
+
+    def checked(sim, rider):
+        expired.append(sim.current_time == rider.abandonment_time)
+        abandon(sim, rider)
+    sim.dispatch[RIDER_ABANDON] = checked
+    sim.run(report=False)
+    assert expired and all(expired)
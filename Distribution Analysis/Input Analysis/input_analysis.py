@@ -4,8 +4,13 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import scipy.stats as stats
-from fitter import Fitter
+import os
+import sys
 # import xlrd
+# fitting and the chi-square test come from the simulator's input modelling (BoxCar/src/modules/input_modelling.py);
+# like data.xls below, the path is relative to this folder
+sys.path.insert(0, os.path.abspath('../../BoxCar/src'))
+from modules import input_modelling
 #%%
 # Read the data from the Excel file
 df : pd.DataFrame = pd.read_excel('data.xls').T
@@ -21,6 +26,19 @@ def plot_hist(data, title : str, x_label : str, y_label : str, bins : int = 40):
     plt.xlabel(x_label)
     plt.ylabel(y_label)
     plt.show()
+
+def plot_fits(data, fits, title : str, x_label : str, bins : int = 40):
+    # histogram of the data with the pdf of each fit from input_modelling.fit_columns
+    plt.figure(figsize=(10, 6))
+    plt.hist(data, bins=bins, density=True, color='lightgrey')
+    x = np.linspace(min(data), max(data), 400)
+    for fit in fits:
+        plt.plot(x, getattr(stats, fit['family']).pdf(x, **fit['params']), label=fit['family'])
+    plt.title(title)
+    plt.xlabel(x_label)
+    plt.ylabel('Density')
+    plt.legend()
+    plt.show()
 #%% md
 # We assume that the interarrival times follow an exponential distribution.
 # We will test the hypothesis that the service times for the initial phase,
@@ -55,28 +73,15 @@ def plot_hist(data, title : str, x_label : str, y_label : str, bins : int = 40):
 #   Reject H0 if D > chi-square(k-1, 1 - \alpha)
 #%%
 def chi_square_test(data, cdf, alpha=0.05):
-    n = len(data)
-    # Determine the number of bins
-    k = int(np.floor(n/ 5))
-    # Determine the bin edges
-    bin_edges = np.linspace(min(data), max(data), k + 1)
-    # Determine the expected number of observations in each bin
-    p = np.zeros(k)
-    e = np.zeros(k)
-    o = np.zeros(k)
-    for i in range(k):
-        p[i] = cdf(bin_edges[i+1]) - cdf(bin_edges[i])
-        e[i] = n*p[i]
-        o[i] = np.sum((data >= bin_edges[i]) & (data < bin_edges[i + 1]))
-    test_statistic = np.sum((o - e)**2/e)
-    chi_square = stats.chi2.ppf(1 - alpha, k - 1)
+    # k = n // 5 bins [a_i, a_i+1) between the smallest and largest observation, k - 1 degrees of freedom
+    result = input_modelling.chi_square_test(data, cdf, alpha=alpha)
     # Display the results
-    print(f'Test statistic = {test_statistic:.2f}, chi-square = {chi_square:.2f}')
-    if test_statistic > chi_square:
+    print(f'Test statistic = {result["D"]:.2f}, chi-square = {result["chi_square"]:.2f}')
+    if result['D'] > result['chi_square']:
         print('Reject H0')
     else:
         print('Do not reject H0')
-    return {'D': test_statistic, 'chi_square': chi_square, 'k': k, 'p': p, 'E': e, 'O': o}
+    return result
 #%%
 # Testing the hypothesis that the interarrival times follow an exponential distribution
 def exponential_cdf(x_, lambda_):
@@ -125,13 +130,15 @@ _ = chi_square_test(keyboard_mouse, normal_cdf_) # reject H0
 
 print(f'Testing the hypothesis that the service times for placing the \nkeyboard and mouse follow a Weibull distribution with shape = {mu:.2f} and scale = {sigma:.2f}')
 #%%
+# Maximum likelihood fits, ranked by AIC, each with its chi-square test
 distributions = ['norm', 'weibull_min']
-f = Fitter(keyboard_mouse, distributions=distributions)
-f.fit()
-f.summary()
-print(f.get_best())
-f.hist()
-plt.show()
+fits = input_modelling.fit_columns({'keyboard_mouse': keyboard_mouse}, distributions)['keyboard_mouse']
+for fit in fits:
+    print(f"{fit['family']}: AIC = {fit['aic']:.1f}, D = {fit['D']:.2f}, chi-square = {fit['chi_square']:.2f}, {fit['params']}")
+print(f"Best fit: {fits[0]['family']}")
+plot_fits(keyboard_mouse, fits,
+    'Service Times for Placing Keyboard and Mouse',
+    'Service Time')
 #%%
 # Testing the hypothesis that the service times for assembling the case (aluminum plates) are exponentially distributed
 assembling_case = df['Service Times for Assembling the Case (Aluminum Plates)']
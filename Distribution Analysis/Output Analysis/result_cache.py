@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Cached columnar copies of the Excel result sets, for the output analysis notebooks. Each workbook is
+# parsed once with pd.read_excel (openpyxl) and saved as an uncompressed Feather (Arrow IPC) file under
+# .cache, which later sessions memory-map instead of parsing the workbook again. A cached copy is used
+# while the workbook's modification time and size are unchanged; if they changed but the contents hash
+# is the same (e.g. the file was copied) the cache is kept, otherwise the workbook is converted again.
+#
+# Columns are typed on conversion: a column of numbers with blank or text cells (such as the " " row at
+# the end of the exported sheets) becomes a float column with NaN in those rows.
+
+OUTPUT_ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(OUTPUT_ANALYSIS_DIR, '.cache')
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(path: str, cache_dir: str = CACHE_DIR) -> tuple:
+    # the Feather file and its metadata for a workbook, e.g. 150_weeks/laptop_timings.xlsx -> 150_weeks__laptop_timings
+    name = os.path.splitext(os.path.relpath(os.path.abspath(path), OUTPUT_ANALYSIS_DIR))[0].replace(os.sep, '__')
+    return os.path.join(cache_dir, name + '.feather'), os.path.join(cache_dir, name + '.json')
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    # object columns of numbers become numeric (text cells become NaN); columns of text stay text
+    for column in df.columns[df.dtypes == object]:
+        numbers = pd.to_numeric(df[column], errors='coerce')
+        df[column] = numbers if numbers.notna().any() else df[column].astype(str)
+    df.columns = [str(column) for column in df.columns]
+    return df
+
+
+def convert(path: str, cache_dir: str = CACHE_DIR) -> str:
+    # parse the workbook and write its cached copy; returns the Feather file
+    table_path, meta_path = cache_paths(path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    df = typed(pd.read_excel(path))
+    feather.write_feather(df, table_path + '.tmp', compression='uncompressed')
+    os.replace(table_path + '.tmp', table_path)
+    stat = os.stat(path)
+    with open(meta_path, 'w') as file:
+        json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_hash(path)}, file)
+    return table_path
+
+
+def cached_table(path: str, cache_dir: str = CACHE_DIR) -> str:
+    # the Feather file of a workbook, converting it first if there is no valid cached copy
+    table_path, meta_path = cache_paths(path, cache_dir)
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return convert(path, cache_dir)
+    with open(meta_path) as file:
+        meta = json.load(file)
+    stat = os.stat(path)
+    if (meta['mtime_ns'], meta['size']) == (stat.st_mtime_ns, stat.st_size):
+        return table_path
+    if meta['sha256'] != file_hash(path):
+        return convert(path, cache_dir)
+    meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    with open(meta_path, 'w') as file:
+        json.dump(meta, file)
+    return table_path
+
+
+def read_table(path: str, columns: list = None, cache_dir: str = CACHE_DIR) -> pa.Table:
+    # the workbook as a memory-mapped Arrow table
+    return feather.read_table(cached_table(path, cache_dir), columns=columns, memory_map=True)
+
+
+def read_results(path: str, columns: list = None, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """
+    Drop-in replacement for pd.read_excel(path) on the result workbooks, from the cached copy.
+    """
+    return read_table(path, columns, cache_dir).to_pandas(split_blocks=True)
+
+
+def read_columns(path: str, columns: list, cache_dir: str = CACHE_DIR) -> dict:
+    # numpy arrays of the given columns; without missing values these are views of the memory-mapped file
+    table = read_table(path, columns, cache_dir)
+    return {column: table.column(column).to_numpy() for column in columns}
+
+
+def integer_rows(df: pd.DataFrame, *columns: str) -> pd.Series:
+    """
+    Rows whose cells in all the given columns hold whole numbers, whether as ints or as whole floats; rows
+    with a fractional, missing, infinite or text cell (such as " ") are dropped. pd.read_excel reads whole
+    numbers as ints, so on a workbook read that way this keeps the rows that
+    df[df[column].apply(lambda x: isinstance(x, int))] keeps. In the cached copy (read_results) those
+    columns are floats with NaN for the text cells, and the same rows are kept.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column in columns:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        mask &= np.isfinite(values) & (values == np.floor(values))
+    return mask
+
+
+def batch_means(values: np.ndarray, warm_up: int, batch_size: int) -> np.ndarray:
+    """
+    Means of consecutive batches of `batch_size` values after the first `warm_up` values, the last batch
+    possibly shorter, ignoring NaN as pandas does: the same as taking .mean() of each
+    df.iloc[i:i + batch_size] for i in range(warm_up, len(df), batch_size).
+    """
+    values = np.asarray(values, dtype=float)[warm_up:]
+    if len(values) == 0:
+        return np.empty(0)
+    starts = np.arange(0, len(values), batch_size)
+    present = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        return np.add.reduceat(np.where(present, values, 0.0), starts) / np.add.reduceat(present, starts)
+
+
+def main():
+    # convert every workbook under the output analysis folders (or the given ones) ahead of time
+    paths = sys.argv[1:] or sorted(
+        os.path.join(folder, name)
+        for folder, _, names in os.walk(OUTPUT_ANALYSIS_DIR) if '.cache' not in folder
+        for name in names if name.endswith('.xlsx'))
+    for path in paths:
+        start = time.perf_counter()
+        table_path = cached_table(path)
+        print(f'{os.path.relpath(path, OUTPUT_ANALYSIS_DIR)}: {time.perf_counter() - start:.2f}s -> {os.path.relpath(table_path, OUTPUT_ANALYSIS_DIR)}')
+
+
+if __name__ == '__main__':
+    main()